@@ -0,0 +1,189 @@
+"""
+Offline extraction benchmark over the saved product pages in benchmarks/pages.
+
+For every page and parser backend it reports parse time, DOM index build
+time, time per get_* extractor, end-to-end get_all_details time and peak
+traced memory. Timings are medians over --repeat runs. Real product pages
+are 1-2 MB, so by default each fixture is padded with --pad blocks of inert
+navigation markup to a realistic size.
+
+--fields restricts the end-to-end run to some product fields, e.g.
+--fields price,ratings for a price monitoring pass.
+
+Results can be saved with --save and compared against an earlier run with
+--compare. The run fails if any end-to-end time regresses by more than
+--threshold.
+
+Usage:
+    python benchmarks/bench.py
+    python benchmarks/bench.py --backend lxml --backend selectolax --save bench.json
+    python benchmarks/bench.py --compare bench.json --threshold 0.15
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dibkb_scraper.amazon import AmazonScraper
+from dibkb_scraper.parsers import BACKENDS
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+
+# Extractors in the order get_all_details calls them
+EXTRACTORS = (
+    "get_product_title",
+    "get_product_images",
+    "get_selling_price",
+    "get_tags",
+    "get_about",
+    "get_technical_info",
+    "get_additional_info",
+    "get_product_details",
+    "get_ratings",
+    "get_all_reviews",
+    "get_related_products",
+)
+
+PAD_BLOCK = (
+    '<div class="nav-flyout"><ul class="nav-list">'
+    '<li><a class="nav-link" href="/b?node=1">Category</a></li>'
+    '<li><a class="nav-link" href="/b?node=2">Deals</a></li></ul>'
+    '<style>.nav-flyout{display:none}</style><span class="nav-sprite"></span></div>'
+)
+
+
+def load_pages(pad):
+    for name in sorted(os.listdir(PAGES_DIR)):
+        if not name.endswith(".html"):
+            continue
+        with open(os.path.join(PAGES_DIR, name), encoding="utf-8") as f:
+            html = f.read()
+        if pad:
+            html = html.replace("</body>", PAD_BLOCK * pad + "</body>")
+        yield name, html
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run_once(html, backend, lean, fields):
+    gc.collect()
+    timings = {}
+    scraper = AmazonScraper.from_html("BENCH", html, backend, lean=lean)
+    timings["parse"] = timed(lambda: scraper.soup)
+    timings["index"] = timed(lambda: scraper.index)
+    for name in EXTRACTORS:
+        timings[name] = timed(getattr(scraper, name))
+
+    start = time.perf_counter()
+    AmazonScraper.from_html("BENCH", html, backend, lean=lean).get_all_details(fields)
+    timings["end_to_end"] = time.perf_counter() - start
+    return timings
+
+
+def peak_memory(html, backend, lean, fields):
+    gc.collect()
+    tracemalloc.start()
+    AmazonScraper.from_html("BENCH", html, backend, lean=lean).get_all_details(fields)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def bench(html, backend, lean, repeat, fields=None):
+    runs = [run_once(html, backend, lean, fields) for _ in range(repeat)]
+    result = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+    result["peak_bytes"] = peak_memory(html, backend, lean, fields)
+    return result
+
+
+def print_table(results):
+    header = f"{'page':<28} {'backend':<18} {'parse':>8} {'index':>8} {'extract':>8} {'total':>8} {'peak MB':>8}"
+    print(header)
+    print("-" * len(header))
+    for key, r in results.items():
+        page, backend = key.split("|")
+        extract = sum(r[name] for name in EXTRACTORS)
+        print(
+            f"{page:<28} {backend:<18} {r['parse'] * 1000:8.2f} {r['index'] * 1000:8.2f} "
+            f"{extract * 1000:8.2f} {r['end_to_end'] * 1000:8.2f} {r['peak_bytes'] / 2 ** 20:8.2f}"
+        )
+    print("\n(times in ms, medians)\n")
+
+    backends = list(dict.fromkeys(key.split("|")[1] for key in results))
+    print(f"{'extractor':<24}" + "".join(f"{backend:>18}" for backend in backends))
+    for name in EXTRACTORS:
+        totals = dict.fromkeys(backends, 0.0)
+        for key, r in results.items():
+            totals[key.split("|")[1]] += r[name]
+        print(f"{name:<24}" + "".join(f"{totals[backend] * 1000:18.3f}" for backend in backends))
+    print("\n(ms per extractor, summed over pages)")
+
+
+def compare(results, baseline, threshold):
+    regressions = 0
+    for key, r in results.items():
+        if key not in baseline:
+            continue
+        before, after = baseline[key]["end_to_end"], r["end_to_end"]
+        change = (after - before) / before if before else 0.0
+        flag = "REGRESSION" if change > threshold else ""
+        regressions += bool(flag)
+        print(f"{key:<48} {before * 1000:8.2f} -> {after * 1000:8.2f} ms  {change:+7.1%} {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", action="append", help="Parser backend(s), default: all installed")
+    parser.add_argument("--lean", action="store_true", help="Also benchmark lean parsing")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--pad", type=int, default=4000, help="Padding blocks appended to each page")
+    parser.add_argument("--fields", help="Comma separated product fields for the end-to-end run")
+    parser.add_argument("--save", help="Write results as JSON")
+    parser.add_argument("--compare", help="Baseline JSON written by --save")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed end-to-end slowdown")
+    args = parser.parse_args()
+
+    variants = []
+    for backend in args.backend or list(BACKENDS):
+        variants.append((backend, False))
+        if args.lean:
+            variants.append((backend, True))
+
+    fields = args.fields.split(",") if args.fields else None
+    results = {}
+    for name, html in load_pages(args.pad):
+        for backend, lean in variants:
+            label = f"{backend}+lean" if lean else backend
+            try:
+                results[f"{name}|{label}"] = bench(html, backend, lean, args.repeat, fields)
+            except ImportError as e:
+                print(f"SKIP {label}: {e}", file=sys.stderr)
+
+    print_table(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print()
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Memory per product held as AmazonProductResponse models versus CompactProduct records.
+
+Every product is extracted from a fresh parse of one of the saved pages, so
+no strings are shared between products by accident, and then kept in a
+list, the way dedup and diffing jobs hold results. Memory is measured with
+tracemalloc.
+
+Usage:
+    python benchmarks/compact_memory.py --count 2000
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dibkb_scraper import AmazonProductResponse, AmazonScraper, CompactProduct
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+
+
+def load_pages():
+    pages = []
+    for name in sorted(os.listdir(PAGES_DIR)):
+        if name.endswith(".html"):
+            with open(os.path.join(PAGES_DIR, name), encoding="utf-8") as f:
+                pages.append(f.read())
+    return pages
+
+
+def measure(build, count, pages):
+    gc.collect()
+    tracemalloc.start()
+    kept = []
+    for i in range(count):
+        asin = f"B{i:09d}"
+        details = AmazonScraper.from_html(asin, pages[i % len(pages)], keep_tree=False).get_all_details()
+        kept.append(build(asin, details))
+        del details
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return current / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args()
+    pages = load_pages()
+
+    results = {
+        "get_all_details dict": measure(lambda asin, details: details, args.count, pages),
+        "AmazonProductResponse": measure(
+            lambda asin, details: AmazonProductResponse(asin=asin, **details), args.count, pages
+        ),
+        "CompactProduct": measure(CompactProduct.from_details, args.count, pages),
+    }
+    for name, per_product in results.items():
+        print(f"{name:<24} {per_product:10.0f} bytes/product")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Checks that every parser backend, with and without lean parsing, produces
+identical get_all_details output on the saved product pages in benchmarks/pages.
+
+Usage:
+    python benchmarks/conformance.py [backend ...]
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dibkb_scraper.amazon import AmazonScraper
+from dibkb_scraper.parsers import BACKENDS
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+REFERENCE_BACKEND = "html.parser"
+
+
+def load_pages():
+    for name in sorted(os.listdir(PAGES_DIR)):
+        if name.endswith(".html"):
+            with open(os.path.join(PAGES_DIR, name), encoding="utf-8") as f:
+                yield name, f.read()
+
+
+def details(html, backend, lean=False):
+    scraper = AmazonScraper.from_html("FIXTURE", html, backend, lean=lean)
+    return json.dumps(scraper.get_all_details(), sort_keys=True)
+
+
+def main(backends):
+    failures = 0
+    for name, html in load_pages():
+        expected = details(html, REFERENCE_BACKEND)
+        for backend in backends:
+            for lean in (False, True):
+                label = f"{backend}, lean" if lean else backend
+                try:
+                    actual = details(html, backend, lean)
+                except ImportError as e:
+                    print(f"SKIP {label}: {e}")
+                    continue
+                if actual == expected:
+                    print(f"ok   {name} [{label}]")
+                    continue
+                failures += 1
+                print(f"FAIL {name} [{label}]")
+                print(f"  expected: {expected}")
+                print(f"  actual:   {actual}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:] or list(BACKENDS)))
@@ -0,0 +1,108 @@
+"""
+Cold-start budget check: measures, in fresh interpreters, how long
+`import dibkb_scraper` takes, that the browser stack and the optional
+subsystems are not imported until they are used, and the latency of the
+first extraction and the first set of request headers. Exits non-zero when
+a budget is exceeded.
+
+tests/test_startup.py always checks the deferred imports, and asserts the
+same budgets when pytest runs with --run-benchmarks.
+
+Usage:
+    python benchmarks/startup.py [--runs N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE = os.path.join(ROOT, "benchmarks", "pages", "desktop.html")
+
+# Budgets in milliseconds, for the median of the runs
+BUDGETS = {
+    "import_ms": 400,
+    "first_extract_ms": 150,
+    "first_headers_ms": 250,
+    "next_headers_ms": 1,
+}
+
+# Modules that must stay unimported until a browser is actually used
+DEFERRED_MODULES = ("playwright", "playwright_stealth", "fake_useragent")
+
+# Package subsystems that `import dibkb_scraper` must leave to first use
+LAZY_MODULES = (
+    "dibkb_scraper.crawler",
+    "dibkb_scraper.jobs",
+    "dibkb_scraper.pipeline",
+    "dibkb_scraper.reviews",
+    "dibkb_scraper.serialization",
+    "dibkb_scraper.store",
+    "asyncio",
+)
+
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import dibkb_scraper
+lazy = [m for m in %(lazy)r if m in sys.modules]
+import dibkb_scraper.playwright
+t1 = time.perf_counter()
+deferred = [m for m in %(deferred)r if m in sys.modules]
+html = open(%(page)r, encoding="utf-8").read()
+t2 = time.perf_counter()
+dibkb_scraper.AmazonScraper.from_html("FIXTURE", html).get_all_details()
+t3 = time.perf_counter()
+from dibkb_scraper.utils import make_headers
+make_headers()
+t4 = time.perf_counter()
+make_headers()
+t5 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "first_extract_ms": (t3 - t2) * 1000,
+    "first_headers_ms": (t4 - t3) * 1000,
+    "next_headers_ms": (t5 - t4) * 1000,
+    "imported_early": deferred + lazy,
+}))
+"""
+
+
+def probe():
+    code = PROBE % {"deferred": DEFERRED_MODULES, "lazy": LAZY_MODULES, "page": PAGE}
+    out = subprocess.check_output([sys.executable, "-c", code], cwd=ROOT, stderr=subprocess.DEVNULL)
+    return json.loads(out.decode().strip().splitlines()[-1])
+
+
+def medians(runs):
+    """Median of every budgeted metric over `runs` fresh interpreters, and the modules imported early."""
+    results = [probe() for _ in range(runs)]
+    values = {metric: sorted(r[metric] for r in results) for metric in BUDGETS}
+    imported_early = sorted({m for r in results for m in r["imported_early"]})
+    return {metric: v[len(v) // 2] for metric, v in values.items()}, imported_early
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results, imported_early = medians(args.runs)
+    failures = 0
+    for metric, budget in BUDGETS.items():
+        median = results[metric]
+        status = "ok  " if median <= budget else "FAIL"
+        failures += median > budget
+        print(f"{status} {metric:<18} {median:8.1f} ms  (budget {budget} ms)")
+
+    if imported_early:
+        failures += 1
+        print(f"FAIL imported on package import: {', '.join(imported_early)}")
+    else:
+        print(f"ok   deferred imports: {', '.join(DEFERRED_MODULES + LAZY_MODULES)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
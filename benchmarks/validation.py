@@ -0,0 +1,75 @@
+"""
+Per-object versus batch validation and serialization of AmazonProductResponse.
+
+The per-object path builds each model with AmazonProductResponse(**details),
+serializes it with model_dump_json and reads it back with json.loads plus a
+model per line. The batch path uses validate_many, dumps_many and
+loads_many. The run also checks that the batch path round-trips
+byte-for-byte.
+
+Usage:
+    python benchmarks/validation.py --count 20000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dibkb_scraper import AmazonProductResponse, AmazonScraper, dumps_many, loads_many, validate_many
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+
+
+def load_items(count):
+    details = []
+    for name in sorted(os.listdir(PAGES_DIR)):
+        if name.endswith(".html"):
+            with open(os.path.join(PAGES_DIR, name), encoding="utf-8") as f:
+                details.append(AmazonScraper.from_html("FIXTURE", f.read()).get_all_details())
+    return [{"asin": f"B{i:09d}", **details[i % len(details)]} for i in range(count)]
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    items = load_items(args.count)
+
+    validate_one, responses = best_of(lambda: [AmazonProductResponse(**item) for item in items], args.repeat)
+    validate_batch, batch = best_of(lambda: validate_many(items), args.repeat)
+    dump_one, lines = best_of(lambda: "\n".join(r.model_dump_json() for r in responses), args.repeat)
+    dump_batch, data = best_of(lambda: dumps_many(batch), args.repeat)
+    load_one, _ = best_of(
+        lambda: [AmazonProductResponse(**json.loads(line)) for line in lines.split("\n")], args.repeat
+    )
+    load_batch, loaded = best_of(lambda: loads_many(data), args.repeat)
+
+    print(f"{args.count} products, best of {args.repeat}")
+    print(f"{'stage':<12} {'per-object':>12} {'batch':>12} {'speedup':>9}")
+    for stage, one, many in (
+        ("validate", validate_one, validate_batch),
+        ("serialize", dump_one, dump_batch),
+        ("parse", load_one, load_batch),
+    ):
+        print(f"{stage:<12} {one * 1000:10.1f}ms {many * 1000:10.1f}ms {one / many:8.1f}x")
+
+    identical = loaded == batch == responses and dumps_many(loaded) == data
+    print(f"round trip identical: {identical}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,59 @@
+import importlib
+
 from .amazon import AmazonScraper
 from .models import (
     AmazonProductResponse, Description, 
-    Product, Ratings, Specifications, Competitor
+    Product, Ratings, Review, Specifications, Competitor
 )
 
-__version__ = "0.2.9"
\ No newline at end of file
+__version__ = "0.2.9"
+
+# Everything else is imported on first use, so `import dibkb_scraper` costs
+# no more than AmazonScraper needs
+_LAZY = {
+    "AsyncAmazonScraper": "async_amazon",
+    "scrape_many": "async_amazon",
+    "ResponseCache": "cache",
+    "CompactCompetitor": "compact",
+    "CompactProduct": "compact",
+    "BloomFilter": "crawler",
+    "CrawlFrontier": "crawler",
+    "RelatedProductsCrawler": "crawler",
+    "FetchResult": "fetcher",
+    "TieredFetcher": "fetcher",
+    "Job": "jobs",
+    "JobQueue": "jobs",
+    "QueueWorker": "jobs",
+    "RedisJobQueue": "jobs",
+    "SqliteJobQueue": "jobs",
+    "LayoutStats": "layouts",
+    "PageLayout": "layouts",
+    "CallbackCollector": "metrics",
+    "InMemoryCollector": "metrics",
+    "MetricsCollector": "metrics",
+    "PrometheusCollector": "metrics",
+    "JsonlSink": "pipeline",
+    "Pipeline": "pipeline",
+    "read_asins": "pipeline",
+    "ProcessPoolExtractor": "process_pool",
+    "AdaptiveRateLimiter": "ratelimit",
+    "ReviewScraper": "reviews",
+    "parse_review_page": "reviews",
+    "dumps_many": "serialization",
+    "loads_many": "serialization",
+    "validate_many": "serialization",
+    "ProductStore": "store",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -1,61 +1,318 @@
+import functools
+import logging
 import math
-from .utils import extract_text, filter_unicode, make_headers,extract_image_id
+import time
+from .utils import extract_text, filter_unicode, make_headers,extract_image_id,detect_block
+from .compact import CompactProduct
+from .dom_index import DomIndex
+from .embedded import UNKNOWN, EmbeddedJson, bracketed, loads
+from .parsers import ParserBackend, get_backend
+from .cache import ResponseCache
+from .ratelimit import AdaptiveRateLimiter
+from .metrics import MetricsCollector, instrumented
+from .layouts import STRATEGIES, LayoutStats, PageLayout
 import httpx
 from bs4 import BeautifulSoup
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Union
 import json
 
+logger = logging.getLogger(__name__)
+
+
+def product_url(asin: str) -> str:
+    return f"https://www.amazon.in/dp/{asin}"
+
+
+# Top-level product fields of get_all_details, in output order
+DETAIL_FIELDS = (
+    "title",
+    "image",
+    "price",
+    "categories",
+    "description",
+    "specifications",
+    "ratings",
+    "reviews",
+    "related_products",
+)
+
+# Memoized getters each DETAIL_FIELDS entry is built from
+FIELD_GETTERS = {
+    "title": ("get_product_title",),
+    "image": ("get_product_images",),
+    "price": ("get_selling_price",),
+    "categories": ("get_tags",),
+    "description": ("get_about",),
+    "specifications": ("get_technical_info", "get_additional_info", "get_product_details"),
+    "ratings": ("get_ratings",),
+    "reviews": ("get_all_reviews",),
+    "related_products": ("get_related_products",),
+}
+
+
+def memoized(method):
+    """Run a getter at most once per scraper; later calls return the stored result"""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self):
+        memo = self._memo
+        if name not in memo:
+            if self._released:
+                raise RuntimeError(f"{name} was not run before the page was released (keep_tree=False)")
+            memo[name] = method(self)
+        return memo[name]
+
+    return wrapper
+
+
+def failed_page_details(error: str = "Failed to fetch page") -> Dict[str, Any]:
+    """Details returned when no page content could be fetched"""
+    return {
+        "error":error,
+        "product":{
+            "pricing":None,
+            "description":None,
+            "specifications":None,
+            "ratings":None,
+            "reviews":[]
+        }
+        
+    }
 
 
 class AmazonScraper:
-    def __init__(self, asin: str, soup: Optional[BeautifulSoup]=None):
+    def __init__(
+        self,
+        asin: str,
+        soup: Optional[BeautifulSoup]=None,
+        html: Optional[str]=None,
+        parser: Union[str, ParserBackend, None]=None,
+        lean: bool=False,
+        keep_tree: bool=True,
+        cache: Optional[ResponseCache]=None,
+        cache_ttl: Optional[float]=None,
+        limiter: Optional[AdaptiveRateLimiter]=None,
+        metrics: Optional[MetricsCollector]=None,
+        layouts: Optional[LayoutStats]=None
+    ):
+        """
+        Args:
+            asin: The product ASIN
+            soup: An already parsed page; any document from a ParserBackend works
+            html: Page HTML to use instead of fetching the page; it is only parsed
+                once a field that needs the page tree is requested
+            parser: Parser backend name ("html.parser", "lxml", "selectolax") or instance
+            lean: Only materialize the page regions the extractors read
+            keep_tree: If False, the page tree is released once get_all_details has run;
+                getters called before that keep returning their stored results, any
+                other getter raises RuntimeError
+            cache: Response cache consulted before fetching the page
+            cache_ttl: Maximum age in seconds of a cached page, defaults to the cache's TTL
+            limiter: Shared rate limiter the page fetch waits on and reports back to
+            metrics: Collector for fetch, parse and per-extractor timings and fallback paths
+            layouts: Shared per-layout strategy statistics the page's fingerprint and
+                winning strategies are reported to
+        """
         self.asin = asin
-        self.url = f"https://www.amazon.in/dp/{self.asin}"
-        self.headers = make_headers()
-        self.soup = soup if soup else self._get_soup()
+        self.url = product_url(self.asin)
+        self._headers: Optional[Dict[str, str]] = None
+        self.parser = get_backend(parser, lean=lean)
+        self.keep_tree = keep_tree
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.limiter = limiter
+        self.metrics = metrics
+        self.layouts = layouts
+        self._index: Optional[DomIndex] = None
+        self._layout: Optional[PageLayout] = None
+        self._embedded: Optional[EmbeddedJson] = None
+        self._owns_tree = False
+        self._memo: Dict[str, Any] = {}
+        self._released = False
+        self._soup: Optional[BeautifulSoup] = None
+        self._html: Optional[str] = None
+        if soup:
+            self._soup = soup
+        elif html is not None:
+            self._html = html
+        else:
+            self._html = self._fetch_html()
+
+    @classmethod
+    def from_html(
+        cls, asin: str, html: str, parser: Union[str, ParserBackend, None]=None, **options
+    ) -> "AmazonScraper":
+        """Build a scraper over already fetched page HTML, without any network access"""
+        return cls(asin, html=html, parser=parser, **options)
     
     
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Request headers, only built when the page is actually fetched"""
+        if self._headers is None:
+            self._headers = make_headers()
+        return self._headers
+
+    @property
+    def soup(self) -> Optional[BeautifulSoup]:
+        """The parsed page, parsed on first use"""
+        if self._soup is None and self._html is not None:
+            self._soup = self._parse(self._html)
+        return self._soup
+
+    @soup.setter
+    def soup(self, soup: Optional[BeautifulSoup]):
+        self._soup = soup
+
+    @property
+    def embedded(self) -> Optional[EmbeddedJson]:
+        """Reader for the JSON embedded in the page HTML, None without the HTML"""
+        if self._embedded is None and self._html is not None:
+            self._embedded = EmbeddedJson(self._html)
+        return self._embedded
+
+    @property
+    def index(self) -> DomIndex:
+        """Lookup tables over the page, built on first use in a single tree walk"""
+        if self._index is None:
+            self._index = DomIndex(self.soup)
+        return self._index
+
+    @property
+    def layout(self) -> PageLayout:
+        """Landmarks and fingerprint of the page, built from the index on first use"""
+        if self._layout is None:
+            self._layout = PageLayout(self.index)
+            if self.layouts is not None:
+                new = self.layouts.observe(self._layout)
+                if self.metrics is not None:
+                    self.metrics.increment("layout", fingerprint=self._layout.fingerprint)
+                    if new:
+                        self.metrics.increment("layout_drift", kind="new_layout")
+        return self._layout
+
     def page_html_to_text(self,name:Optional[str]=None):
         if not name:
             name = self.asin
         with open(f"{name}.txt", "w") as f:
             f.write(self.soup.prettify())
 
-    def _get_soup(self) -> Optional[BeautifulSoup]:
+    def _fetch_html(self) -> Optional[str]:
+        if self.cache is not None:
+            start = time.perf_counter()
+            html = self.cache.get(self.url, ttl=self.cache_ttl)
+            if html is not None:
+                self._record_fetch("cache", "ok", start)
+                return html
         try:
+            if self.limiter:
+                self.limiter.acquire(self.url)
+            start = time.perf_counter()
             response = httpx.get(self.url, headers=self.headers, timeout=10)
+            blocked = detect_block(response.status_code, str(response.url), response.text)
+            if self.limiter:
+                self.limiter.record(self.url, blocked=blocked is not None)
+            if blocked:
+                self._record_fetch("http", "blocked", start)
+                if self.metrics is not None:
+                    self.metrics.increment("blocked", source="http", reason=blocked)
+                logger.warning("Error fetching the page: blocked (%s)", blocked)
+                return None
             response.raise_for_status()  # Raise exception for bad status codes
-            return BeautifulSoup(response.text, 'html.parser')
+            self._record_fetch("http", "ok", start)
+            if self.cache is not None:
+                self.cache.set(self.url, response.text)
+            return response.text
         except (httpx.RequestError, httpx.HTTPStatusError) as e:
-            print(f"Error fetching the page: {str(e)}")
+            self._record_fetch("http", "error", start)
+            logger.warning("Error fetching the page: %s", e)
             return None
 
+    def _parse(self, html: str) -> BeautifulSoup:
+        self._owns_tree = True
+        if self.metrics is None:
+            return self.parser.parse(html)
+        start = time.perf_counter()
+        soup = self.parser.parse(html)
+        self.metrics.observe("parse", time.perf_counter() - start, backend=self.parser.name)
+        return soup
+
+    def _record_fetch(self, source: str, outcome: str, start: float):
+        if self.metrics is not None:
+            self.metrics.observe("fetch", time.perf_counter() - start, source=source)
+            self.metrics.increment("fetch", source=source, outcome=outcome)
+
+    def _path(self, extractor: str, path: str):
+        """Count which fallback branch an extractor took"""
+        if self.metrics is not None:
+            self.metrics.increment("extractor_path", extractor=extractor, path=path)
+        if self.layouts is not None and extractor in STRATEGIES:
+            if self.layouts.record(self.layout.fingerprint, extractor, path) and self.metrics is not None:
+                self.metrics.increment("layout_drift", kind="strategy", extractor=extractor)
+
+    def _dom_fallback(self, extractor: str):
+        """Count an extractor that had to read embedded JSON from the page tree"""
+        if self.metrics is not None:
+            self.metrics.increment("embedded_fallbacks", extractor=extractor)
+
+    def _error(self, extractor: str, message: str, error: Exception):
+        """Log and count an exception an extractor swallowed"""
+        logger.debug("%s: %s", message, error)
+        if self.metrics is not None:
+            self.metrics.increment("extractor_errors", extractor=extractor)
+
+    def release(self):
+        """Drop the page HTML, tree and index to free memory"""
+        if self._owns_tree and hasattr(self._soup, "decompose"):
+            # BeautifulSoup trees are full of reference cycles; break them now
+            # instead of waiting for the garbage collector
+            self._soup.decompose()
+        self._soup = None
+        self._html = None
+        self._embedded = None
+        self._index = None
+        self._layout = None
+        self._released = True
+
+    @memoized
+    @instrumented
     def get_product_title(self) -> Optional[str]:
         try:
-            title_elem = self.soup.find('span', {'id': 'productTitle'})
+            title_elem = self.index.find('span', id='productTitle')
             title = title_elem.text.strip() if title_elem else None
             if title:
+                self._path("get_product_title", "productTitle")
                 return title
     
-            title = self.soup.find('span', {'id': 'title', 'class': 'a-size-small'})
+            title = self.index.find('span', id='title', class_='a-size-small')
             title = title.text.strip() if title else None
 
+            self._path("get_product_title", "title" if title else "none")
             return title
         except AttributeError:
             return None
 
+    @memoized
+    @instrumented
     def get_selling_price(self) -> Optional[float]:
         try:
-            price_elem = self.soup.find("div", {"class": "a-section aok-hidden twister-plus-buying-options-price-data"})
-            if price_elem:
-                price_data = json.loads(price_elem.text.strip())
+            price_text = self.embedded.price_text() if self.embedded else UNKNOWN
+            if price_text is UNKNOWN:
+                self._dom_fallback("get_selling_price")
+                price_elem = self.index.find("div", class_="a-section aok-hidden twister-plus-buying-options-price-data")
+                price_text = price_elem.text if price_elem else None
+            if price_text is not None:
+                price_data = loads(price_text.strip())
                 display_price = None
+                path = "desktop_buybox"
                 try:
                     display_price = price_data["desktop_buybox_group_1"][0]["displayPrice"]
                 except (KeyError, IndexError):
                     pass
                 
                 if not display_price:
+                    path = "mobile_buybox"
                     try:
                         display_price = price_data["mobile_buybox_group_1"][0]["displayPrice"]
                     except (KeyError, IndexError):
@@ -63,33 +320,44 @@ class AmazonScraper:
                 
                 if display_price:
                     price = float(display_price.replace("₹", "").replace(",", ""))
+                    self._path("get_selling_price", path)
                     return price
             
+            self._path("get_selling_price", "none")
             return None
             
             
         except (AttributeError, json.JSONDecodeError, KeyError):
             return None
 
+    @memoized
+    @instrumented
     def get_tags(self) -> List[str]:
         try:
-            breadcrumbs = self.soup.find("ul", {"class": "a-unordered-list a-horizontal a-size-small"})
+            breadcrumbs = self.index.find("ul", class_="a-unordered-list a-horizontal a-size-small")
             if breadcrumbs:
+                self._path("get_tags", "breadcrumbs")
                 return [x.text.strip() for x in breadcrumbs.find_all("a")]
-            cates = self.soup.find_all("div", {"class": "a-expander-content a-expander-partial-collapse-content", "data-expanded": "false"})
+            cates = []
+            # Without any breadcrumb link class the expander scan can't match
+            if self.layout.viable("mobile_breadcrumbs"):
+                cates = self.index.find_all("div", class_="a-expander-content a-expander-partial-collapse-content", attrs={"data-expanded": "false"})
 
             breadcrumbs = []
             for cate in cates:
                 # Find all links that contain the breadcrumb class, regardless of normal/child class
                 childs = cate.find_all("a", {"class": lambda c: c and "_seo-breadcrumb-mobile-card_style_breadcrumbInlineLinks__KBCjn" in c})
                 breadcrumbs.extend([x.text.strip() for x in childs])
+            self._path("get_tags", "mobile_breadcrumbs" if breadcrumbs else "none")
             return breadcrumbs
         except AttributeError:
             return []
 
+    @memoized
+    @instrumented
     def get_technical_info(self) -> Dict[str, str]:
         try:
-            table = self.soup.find("table", {"class": "prodDetTable", "id":"productDetails_techSpec_section_1"})
+            table = self.index.find("table", id="productDetails_techSpec_section_1", class_="prodDetTable")
 
             if not table:
                 return {}
@@ -106,9 +374,11 @@ class AmazonScraper:
         except AttributeError:
             return {}
         
+    @memoized
+    @instrumented
     def get_additional_info(self)->Dict[str,str]:
         try:
-            table = self.soup.find("table", {"class": "prodDetTable", "id":"productDetails_detailBullets_sections1"})
+            table = self.index.find("table", id="productDetails_detailBullets_sections1", class_="prodDetTable")
 
             if not table:
                 return {}
@@ -125,12 +395,14 @@ class AmazonScraper:
         except AttributeError:
             return {}
 
+    @memoized
+    @instrumented
     def get_product_details(self)->Dict[str,str]:
         try:
             info = {}
             
             # Try first approach - detail bullets feature div
-            div = self.soup.find("div", {"id": "detailBullets_feature_div"})
+            div = self.index.find("div", id="detailBullets_feature_div")
             if div:
                 for li in div.find_all("span", {"class": "a-list-item"}):
                     spans = li.find_all("span")
@@ -141,10 +413,11 @@ class AmazonScraper:
                             info[key] = value
                 
                 if info:  # If we found details, return them
+                    self._path("get_product_details", "detail_bullets")
                     return info
             
             # Try second approach - unordered lists with a-list-item spans
-            uls = self.soup.find_all("ul", {"class": "a-unordered-list a-nostyle a-vertical a-spacing-none"})
+            uls = self.index.find_all("ul", class_="a-unordered-list a-nostyle a-vertical a-spacing-none")
             for ul in uls:
                 for li in ul.find_all("span", {"class": "a-list-item"}):
                     spans = li.find_all("span")
@@ -153,10 +426,13 @@ class AmazonScraper:
                         value = extract_text(spans[1].text.strip())
                         if key and value:  # Only add if both key and value exist
                             info[key] = value
+            if info:
+                self._path("get_product_details", "list_items")
             
             # Try third approach - detail sections table
-            detail_table = self.soup.find("table", {"id": "productDetails_detailBullets_sections1"})
+            detail_table = self.index.find("table", id="productDetails_detailBullets_sections1")
             if detail_table and not info:
+                self._path("get_product_details", "detail_table")
                 for row in detail_table.find_all("tr"):
                     try:
                         key_elem = row.find("th")
@@ -168,16 +444,20 @@ class AmazonScraper:
                                 info[key] = value
                     except AttributeError:
                         continue
+            if not info and not detail_table:
+                self._path("get_product_details", "none")
             
             return info
             
         except Exception as e:
-            print(f"Error extracting product details: {str(e)}")
+            self._error("get_product_details", "Error extracting product details", e)
             return {}
 
+    @memoized
+    @instrumented
     def get_rating_percentage(self):
         try:
-            rating_percentage = self.soup.find_all("span", {"class": "_cr-ratings-histogram_style_histogram-column-space__RKUAd"})[5:10]
+            rating_percentage = self.index.find_all("span", class_="_cr-ratings-histogram_style_histogram-column-space__RKUAd")[5:10]
             
             if not rating_percentage:
                 return {
@@ -219,6 +499,7 @@ class AmazonScraper:
 
         
         except Exception as e:
+            self._error("get_rating_percentage", "Error extracting rating percentages", e)
             return {
                 "one_star":None,
                 "two_star":None,
@@ -227,33 +508,36 @@ class AmazonScraper:
                 "five_star":None
             }
 
+    @memoized
+    @instrumented
     def get_ratings(self)->Dict[str,Any]:
         try:
             result = {}
             
             # Get rating
-            rating_elem = self.soup.find("span", {"data-hook": "rating-out-of-text"})
-            if rating_elem:
-                ratings_text = rating_elem.text.strip().split()
+            rating_out_of_elem = self.index.find("span", hook="rating-out-of-text")
+            if rating_out_of_elem:
+                ratings_text = rating_out_of_elem.text.strip().split()
                 if ratings_text and len(ratings_text) >= 1:
                     try:
                         result["rating"] = float(ratings_text[0])
+                        self._path("get_ratings", "rating_out_of")
                     except (ValueError, TypeError):
                         pass
             # alternate rating element
-            rating_elem = None
-            rating_elem = self.soup.find("span", {"data-hook": "average-stars-rating-text"})
+            rating_elem = self.index.find("span", hook="average-stars-rating-text")
             if rating_elem is None:
-                rating_elem = self.soup.find("span", {"data-hook": "rating-out-of-text"})
+                rating_elem = rating_out_of_elem
             ratings_text = rating_elem.text.strip() if rating_elem else None
             if ratings_text:
                 try:
                     result["rating"] = float(ratings_text.split()[0])
+                    self._path("get_ratings", "average_stars")
                 except (ValueError, TypeError):
                     pass
 
             # Get review count
-            review_elem = self.soup.find("span", {"data-hook": "total-review-count"})
+            review_elem = self.index.find("span", hook="total-review-count")
             if review_elem:
                 review_text = review_elem.text.strip().replace(',', '') 
                 try:
@@ -262,11 +546,12 @@ class AmazonScraper:
                     pass
 
             # Try alternative rating source if main one failed
-            if result["rating"] is None:
+            if result.get("rating") is None:
                 try:
-                    alt_review_elem = self.soup.find("span", {"class": "reviewCountTextLinkedHistogram"})
+                    alt_review_elem = self.index.find("span", class_="reviewCountTextLinkedHistogram")
                     if alt_review_elem and alt_review_elem.get("title"):
                         result['rating'] = float(alt_review_elem["title"].strip().split()[0])
+                        self._path("get_ratings", "histogram_title")
                 except (ValueError, TypeError, AttributeError):
                     pass
             
@@ -276,9 +561,9 @@ class AmazonScraper:
                 number_to_word = {1: 'one', 2: 'two', 3: 'three', 4: 'four', 5: 'five'}
                 star_ratings = {}
                 for stars in range(1, 6):
-                    percentage = getattr(rating_percentage, f"{number_to_word[stars]}_star")
+                    percentage = rating_percentage[f"{number_to_word[stars]}_star"]
 
-                    count = math.floor(percentage * result["review_count"] / 100) if percentage and result["review_count"] else None
+                    count = math.floor(percentage * result["review_count"] / 100) if percentage and result.get("review_count") else None
 
                     star_ratings[f"{number_to_word[stars]}_star"] = {"count":count, "percentage":percentage}
 
@@ -286,33 +571,30 @@ class AmazonScraper:
             return result
             
         except Exception as e:
+            self._error("get_ratings", "Error extracting ratings", e)
             return {}
 
+    @memoized
+    @instrumented
     def get_product_images(self) -> Optional[List[str]]:
         try:
             # Find the script that contains the image data
-            script = self.soup.find("script", text=lambda t: t and "ImageBlockATF" in t)
-            
+            script_text = self.embedded.image_block_script() if self.embedded else UNKNOWN
+            if script_text is UNKNOWN:
+                self._dom_fallback("get_product_images")
+                script = next(
+                    (x for x in self.index.find_all("script") if x.string and "ImageBlockATF" in x.string),
+                    None
+                )
+                script_text = script.text if script else None
+
             # Extract the colorImages data using string manipulation
-            script_text = script.text if script else None
             if script_text:
                 start_idx = script_text.find("'colorImages': { 'initial': ")
                 if start_idx != -1:
                     start_idx += len("'colorImages': { 'initial': ")
-                    bracket_count = 0
-                    end_idx = start_idx
-                    
-                    for i in range(start_idx, len(script_text)):
-                        if script_text[i] == '[':
-                            bracket_count += 1
-                        elif script_text[i] == ']':
-                            bracket_count -= 1
-                            if bracket_count == 0:
-                                end_idx = i + 1
-                                break
-                    
-                    json_str = script_text[start_idx:end_idx]
-                    image_data = json.loads(json_str)
+                    json_str = bracketed(script_text, start_idx)
+                    image_data = loads(json_str)
                     
                     # Extract hiRes URLs from the image data
                     images = [img["hiRes"] for img in image_data if "hiRes" in img]
@@ -320,28 +602,30 @@ class AmazonScraper:
                     # Extract image IDs as before
                     valid_ids = extract_image_id(images)
                     if valid_ids:
+                        self._path("get_product_images", "image_block")
                         return valid_ids
 
             images = []
-            imgs = self.soup.find_all("img", attrs={"data-a-dynamic-image": True})
+            imgs = self.index.find_all("img", attrs={"data-a-dynamic-image": True})
             valid_images = [img.get("src") for img in imgs]
             valid_ids = extract_image_id(valid_images)
             if valid_ids:
+                self._path("get_product_images", "dynamic_image")
                 return valid_ids
-            
-
-                
+            self._path("get_product_images", "none")
 
         except Exception as e:
-            print(f"Error extracting product images: {str(e)}")
+            self._error("get_product_images", "Error extracting product images", e)
             return None
 
+    @memoized
+    @instrumented
     def get_about(self) -> Union[List[str], Dict[str, str]]:
         try:
             if not self.soup:
                 return {"error": "No page content available"}
 
-            about_elem = self.soup.find("div", {"id": "feature-bullets"})
+            about_elem = self.index.find("div", id="feature-bullets")
             if not about_elem:
                 return []
 
@@ -359,10 +643,14 @@ class AmazonScraper:
             return about_list
 
         except AttributeError as e:
+            self._error("get_about", "Error extracting highlights", e)
             return {"error": f"Failed to parse page structure: {str(e)}"}
         except Exception as e:
+            self._error("get_about", "Error extracting highlights", e)
             return {"error": f"Unexpected error: {str(e)}"}
 
+    @memoized
+    @instrumented
     def get_all_reviews(self) -> List[str]:
         """
         Retrieves all reviews from the product page.
@@ -373,11 +661,12 @@ class AmazonScraper:
         reviews = []
         try:
             review_elem = None
-            review_elem = self.soup.find_all("div", {"class": "review-text-content"})
-            if review_elem is None or len(review_elem) == 0:
-                review_elem = self.soup.find_all("span", {"data-hook": "review-body"})
-                for x in review_elem:
-                    print(x.text.strip())
+            review_elem = self.index.find_all("div", class_="review-text-content")
+            if review_elem:
+                self._path("get_all_reviews", "review_text")
+            else:
+                review_elem = self.index.find_all("span", hook="review-body")
+                self._path("get_all_reviews", "review_body" if review_elem else "none")
 
             for x in review_elem:
                 reviews.append(x.text.strip())
@@ -385,62 +674,97 @@ class AmazonScraper:
             return reviews
             
         except Exception as e:
-            print(f"Error fetching reviews: {str(e)}")
+            self._error("get_all_reviews", "Error extracting reviews", e)
             return []
             
             
             
-    def get_all_details(self):
-        """Get all product details in a single dictionary"""
-        if not self.soup:
+    def get_all_details(self, fields: Optional[Iterable[str]] = None):
+        """
+        Get product details in a single dictionary.
+
+        Args:
+            fields: Product fields to extract (see DETAIL_FIELDS), e.g. ["price", "ratings"].
+                Only the getters those fields need are run. Defaults to every field.
+
+        Returns:
+            {"product": {...}} with the requested fields, in DETAIL_FIELDS order
+        """
+        if fields is None:
+            fields = DETAIL_FIELDS
+        else:
+            requested = set(fields)
+            unknown = requested.difference(DETAIL_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown fields {sorted(unknown)}, expected some of {list(DETAIL_FIELDS)}")
+            fields = [field for field in DETAIL_FIELDS if field in requested]
+
+        if self._released:
+            missing = [field for field in fields if any(name not in self._memo for name in FIELD_GETTERS[field])]
+            if missing:
+                raise RuntimeError(
+                    f"Fields {missing} were not extracted before the page was released (keep_tree=False); "
+                    "request every field in the first get_all_details call"
+                )
+        elif not self._soup and self._html is None:
+            return failed_page_details()
+        details = {
+            "product":{field: self._detail(field) for field in fields}
+        }
+        if not self.keep_tree:
+            self.release()
+        return details
+
+    def get_compact_details(self, fields: Optional[Iterable[str]] = None) -> CompactProduct:
+        """get_all_details packed into a CompactProduct record, for keeping many products in memory"""
+        return CompactProduct.from_details(self.asin, self.get_all_details(fields))
+
+    def _detail(self, field: str) -> Any:
+        if field == "title":
+            return self.get_product_title()
+        if field == "image":
+            return self.get_product_images()
+        if field == "price":
+            return self.get_selling_price()
+        if field == "categories":
+            return self.get_tags()
+        if field == "description":
             return {
-                "error":"Failed to fetch page",
-                "product":{
-                    "pricing":None,
-                    "description":None,
-                    "specifications":None,
-                    "ratings":None,
-                    "reviews":[]
-                }
-                
+                "highlights":self.get_about()
             }
-        return {
-            "product":{
-                "title":self.get_product_title(),
-                "image":self.get_product_images(),
-                "price":self.get_selling_price(),
-                "categories":self.get_tags(),
-                "description":{
-                    "highlights":self.get_about()
-                },
-                "specifications":{
-                    "technical":self.get_technical_info(),
-                    "additional":self.get_additional_info(),
-                    "details":self.get_product_details()
-                },
-                "ratings":self.get_ratings(),
-                "reviews":self.get_all_reviews(),
-                "related_products":self.get_related_products()
+        if field == "specifications":
+            return {
+                "technical":self.get_technical_info(),
+                "additional":self.get_additional_info(),
+                "details":self.get_product_details()
             }
-        }
+        if field == "ratings":
+            return self.get_ratings()
+        if field == "reviews":
+            return self.get_all_reviews()
+        return self.get_related_products()
     
     def get_html(self) -> str:
         return self.soup.prettify()
     
+    @memoized
+    @instrumented
     def get_related_products(self):
         try:
             competitors: List[Dict[str, Any]] = []
-            carousel_items = self.soup.find_all("li", {"class": "a-carousel-card"}) or []
-            
-            for item in carousel_items:
-                try:
+            payloads = self.embedded.ad_feedback_details() if self.embedded else UNKNOWN
+            if payloads is UNKNOWN:
+                self._dom_fallback("get_related_products")
+                payloads = []
+                for item in self.index.find_all("li", class_="a-carousel-card") or []:
                     # Find div and safely get data
                     div = item.find("div", {"data-adfeedbackdetails": True})
-                    if not div or not div.get("data-adfeedbackdetails"):
-                        continue
-                        
-                    data = div.get("data-adfeedbackdetails", "{}")
-                    competitor_data = json.loads(data)
+                    if div and div.get("data-adfeedbackdetails"):
+                        payloads.append(div.get("data-adfeedbackdetails"))
+            
+            for data in payloads:
+                try:
+                    competitor_data = loads(data)
                     
                     # Skip if missing required data
                     if not isinstance(competitor_data, dict):
@@ -449,7 +773,7 @@ class AmazonScraper:
                     competitors.append(competitor_data)
                     
                 except (json.JSONDecodeError, AttributeError) as e:
-                    print(f"Error parsing carousel item: {str(e)}")
+                    self._error("get_related_products", "Error parsing carousel item", e)
                     continue
 
             results = []
@@ -473,20 +797,20 @@ class AmazonScraper:
                                 if "/" in img_url and "._" in img_url:
                                     result["img_id"] = img_url.split("/I/")[-1].split("._")[0]
                     except (AttributeError, IndexError) as e:
-                        print(f"Error extracting image ID: {str(e)}")
+                        self._error("get_related_products", "Error extracting image ID", e)
                     
                     # Only add if we have minimum required data
                     if result["asin"] and result["title"]:
                         results.append(result)
                         
                 except Exception as e:
-                    print(f"Error processing competitor data: {str(e)}")
+                    self._error("get_related_products", "Error processing competitor data", e)
                     continue
 
             return results
             
         except Exception as e:
-            print(f"Error in get_related_products: {str(e)}")
+            self._error("get_related_products", "Error in get_related_products", e)
             return []
 
 
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Optional, Set, Union
+
+import httpx
+from pydantic import ValidationError
+
+from .amazon import AmazonScraper, failed_page_details, product_url
+from .cache import ResponseCache
+from .fetcher import FetchResult, TieredFetcher
+from .ratelimit import AdaptiveRateLimiter
+from .layouts import LayoutStats
+from .metrics import MetricsCollector
+from .models import AmazonProductResponse
+from .parsers import ParserBackend
+from .process_pool import ProcessPoolExtractor
+from .utils import asin_reader, make_headers
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAmazonScraper:
+    """
+    Scrapes many ASINs concurrently over one shared, long-lived httpx.AsyncClient.
+
+    The client keeps connections alive (and speaks HTTP/2 when available), so
+    consecutive products reuse the same TCP+TLS session instead of paying a new
+    handshake per ASIN. Pages are fetched through a TieredFetcher: pass a
+    PlaywrightScraper as `browser` and only blocked pages are rendered in it,
+    or pass a ready-made TieredFetcher as `fetcher` in place of the cache,
+    limiter and browser options. Pass a ProcessPoolExtractor as `extractor`
+    to parse in worker processes instead of on the event loop. A MetricsCollector passed as `metrics`
+    receives parse and per-extractor timings for pages extracted in process,
+    and a LayoutStats passed as `layouts` learns their layouts.
+
+    Usage:
+        async with AsyncAmazonScraper(concurrency=20) as scraper:
+            async for response in scraper.scrape_many(asins):
+                print(response.asin, response.product.price)
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 10,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        timeout: float = 10.0,
+        client: Optional[httpx.AsyncClient] = None,
+        parser: Union[str, ParserBackend, None] = None,
+        lean: bool = False,
+        cache: Optional[ResponseCache] = None,
+        cache_ttl: Optional[float] = None,
+        limiter: Optional[AdaptiveRateLimiter] = None,
+        browser: Optional[Any] = None,
+        fetcher: Optional[TieredFetcher] = None,
+        extractor: Optional[ProcessPoolExtractor] = None,
+        metrics: Optional[MetricsCollector] = None,
+        layouts: Optional[LayoutStats] = None,
+    ):
+        if fetcher is not None:
+            options = {"cache": cache, "cache_ttl": cache_ttl, "limiter": limiter, "browser": browser}
+            ignored = [name for name, value in options.items() if value is not None]
+            if ignored:
+                raise ValueError(f"{', '.join(ignored)} would be ignored with fetcher=; pass them to the TieredFetcher")
+        self.concurrency = concurrency
+        self.parser = parser
+        self.lean = lean
+        self.extractor = extractor
+        self.metrics = metrics
+        self.layouts = layouts
+        self.fetching = 0
+        self.max_fetching = 0
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            http2=http2,
+            headers=make_headers(),
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+        self.fetcher = fetcher or TieredFetcher(
+            client=self.client,
+            browser=browser,
+            cache=cache,
+            cache_ttl=cache_ttl,
+            limiter=limiter,
+        )
+
+    async def __aenter__(self) -> "AsyncAmazonScraper":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the underlying client if it was created by this scraper."""
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def fetch(self, asin: str) -> FetchResult:
+        """Fetch the product page of an ASIN through the tiered fetcher."""
+        self.fetching += 1
+        self.max_fetching = max(self.max_fetching, self.fetching)
+        try:
+            result = await self.fetcher.fetch(product_url(asin))
+        finally:
+            self.fetching -= 1
+        if result.html is None:
+            logger.warning("Error fetching the page: %s", result.error)
+        return result
+
+    async def fetch_html(self, asin: str) -> Optional[str]:
+        """
+        Fetch the product page HTML for an ASIN through the tiered fetcher.
+
+        Returns:
+            The page HTML, or None if the request failed
+        """
+        return (await self.fetch(asin)).html
+
+    async def scrape(self, asin: str) -> AmazonProductResponse:
+        """Fetch and extract a single product."""
+        result = await self.fetch(asin)
+        html = result.html
+        if html is None:
+            return AmazonProductResponse(asin=asin, **failed_page_details(f"Failed to fetch page: {result.error}"))
+
+        if self.extractor is not None:
+            details = await self.extractor.extract(asin, html, self.parser, self.lean)
+        else:
+            details = AmazonScraper.from_html(
+                asin, html, self.parser, lean=self.lean, keep_tree=False, metrics=self.metrics, layouts=self.layouts
+            ).get_all_details()
+        try:
+            return AmazonProductResponse(asin=asin, **details)
+        except ValidationError as e:
+            return AmazonProductResponse(asin=asin, **failed_page_details(f"Invalid product data: {str(e)}"))
+
+    def stage_metrics(self) -> Dict[str, Any]:
+        """Current and peak queue depths of the fetch and parse stages."""
+        metrics: Dict[str, Any] = {"fetching": self.fetching, "fetch_max_depth": self.max_fetching}
+        if self.extractor is not None:
+            metrics.update(self.extractor.metrics())
+        return metrics
+
+    async def scrape_many(
+        self,
+        asins: Union[Iterable[str], AsyncIterable[str]],
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[AmazonProductResponse]:
+        """
+        Scrape ASINs concurrently, yielding one response per ASIN as each finishes.
+
+        ASINs are pulled from the (async) iterable lazily, and a new one is only
+        pulled once a finished response has been consumed, so at most
+        `concurrency` products are in flight or waiting regardless of the input size.
+
+        Args:
+            asins: ASINs to scrape
+            concurrency: Maximum number of products in flight, defaults to the scraper's setting
+        """
+        limit = max(1, concurrency or self.concurrency)
+        pending: Set[asyncio.Task] = set()
+        next_asin = asin_reader(asins)
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(pending) < limit:
+                    asin = await next_asin()
+                    if asin is None:
+                        exhausted = True
+                        break
+                    pending.add(asyncio.ensure_future(self.scrape(asin)))
+
+                if not pending:
+                    return
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+async def scrape_many(
+    asins: Union[Iterable[str], AsyncIterable[str]], concurrency: int = 10, **client_options
+) -> AsyncIterator[AmazonProductResponse]:
+    """
+    Scrape ASINs concurrently with a temporary AsyncAmazonScraper.
+
+    Args:
+        asins: ASINs to scrape
+        concurrency: Maximum number of products in flight
+        **client_options: Connection pool options forwarded to AsyncAmazonScraper
+    """
+    async with AsyncAmazonScraper(concurrency=concurrency, **client_options) as scraper:
+        async for response in scraper.scrape_many(asins):
+            yield response
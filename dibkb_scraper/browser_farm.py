@@ -0,0 +1,469 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from .cache import ResponseCache
+from .playwright import PlaywrightScraper
+
+logger = logging.getLogger(__name__)
+
+
+def _tree_rss(pids: List[int]) -> Optional[int]:
+    """Resident memory in bytes of processes and all their descendants, None without psutil."""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    total = 0
+    for pid in pids:
+        try:
+            process = psutil.Process(pid)
+            for member in [process, *process.children(recursive=True)]:
+                total += member.memory_info().rss
+        except psutil.Error:
+            continue
+    return total
+
+
+def _playwright_children() -> Set[int]:
+    """PIDs of this process's Playwright driver children."""
+    try:
+        import psutil
+    except ImportError:
+        return set()
+    pids = set()
+    for child in psutil.Process().children():
+        try:
+            if "playwright" in " ".join(child.cmdline()):
+                pids.add(child.pid)
+        except psutil.Error:
+            continue
+    return pids
+
+
+class _Browser:
+    """One browser of a farm, with its load and lifetime counters."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.in_flight = 0
+        self.renders = 0
+        self.failures = 0
+        self.restarts = 0
+        self.renders_since_start = 0
+        self.busy_seconds = 0.0
+        self.started_at = time.monotonic()
+        self.memory_bytes: Optional[int] = None
+        self.memory_checked_at = 0.0
+        self.draining = False
+        self.ready = False
+        self.restarting = False
+
+    def pids(self) -> List[int]:
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        raise NotImplementedError
+
+    def alive(self) -> bool:
+        raise NotImplementedError
+
+    async def render(self, url: str, max_retries: int) -> Optional[str]:
+        raise NotImplementedError
+
+
+class _LocalBrowser(_Browser):
+    """A standalone PlaywrightScraper driven by the farm's event loop."""
+
+    def __init__(self, index: int, options: Dict[str, Any], start_lock: asyncio.Lock):
+        super().__init__(index)
+        self.options = options
+        self.start_lock = start_lock
+        self.scraper: Optional[PlaywrightScraper] = None
+        self._pids: List[int] = []
+
+    def pids(self) -> List[int]:
+        return self._pids
+
+    async def start(self) -> None:
+        # Starts are serialized so the new driver process can be told apart
+        async with self.start_lock:
+            before = _playwright_children()
+            self.scraper = PlaywrightScraper.standalone()
+            await self.scraper.initialize(**self.options)
+            self._pids = sorted(_playwright_children() - before)
+
+    async def stop(self) -> None:
+        if self.scraper is not None:
+            await self.scraper.close()
+
+    def alive(self) -> bool:
+        return self.scraper is not None and self.scraper.is_connected()
+
+    async def render(self, url: str, max_retries: int) -> Optional[str]:
+        return await self.scraper.get_html_content(url, max_retries)
+
+
+def _serve(conn: Any, options: Dict[str, Any]) -> None:
+    """Worker process: render URLs received on `conn` with this process's PlaywrightScraper."""
+    asyncio.run(_serve_async(conn, options))
+
+
+async def _serve_async(conn: Any, options: Dict[str, Any]) -> None:
+    loop = asyncio.get_running_loop()
+    scraper = PlaywrightScraper()
+    await scraper.initialize(**options)
+    conn.send(("ready", scraper.is_connected()))
+
+    async def handle(request_id: int, url: str, max_retries: int) -> None:
+        html = await scraper.get_html_content(url, max_retries)
+        conn.send((request_id, html))
+
+    tasks: Set[asyncio.Task] = set()
+    while True:
+        try:
+            message = await loop.run_in_executor(None, conn.recv)
+        except EOFError:
+            break
+        if message is None:
+            break
+        task = asyncio.ensure_future(handle(*message))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    await scraper.close()
+
+
+class _ProcessBrowser(_Browser):
+    """A PlaywrightScraper owned by its own worker process, with its own event loop."""
+
+    def __init__(self, index: int, options: Dict[str, Any], mp_context: Any):
+        super().__init__(index)
+        self.options = options
+        self.mp_context = mp_context or multiprocessing.get_context("spawn")
+        self.process: Optional[Any] = None
+        self._conn: Optional[Any] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Whether the worker's browser is up and its pipe still open
+        self._connected = False
+
+    def pids(self) -> List[int]:
+        return [self.process.pid] if self.process is not None else []
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        parent, child = self.mp_context.Pipe()
+        self.process = self.mp_context.Process(target=_serve, args=(child, self.options), daemon=True)
+        self.process.start()
+        child.close()
+        self._conn = parent
+        try:
+            _, connected = await self._loop.run_in_executor(None, parent.recv)
+        except EOFError:
+            connected = False
+        self._connected = connected
+        if not connected:
+            logger.error("Browser worker %d failed to start its browser", self.index)
+        threading.Thread(target=self._read, args=(parent,), daemon=True).start()
+
+    def _read(self, conn: Any) -> None:
+        while True:
+            try:
+                request_id, html = conn.recv()
+            except (EOFError, OSError):
+                break
+            self._loop.call_soon_threadsafe(self._resolve, request_id, html)
+        # The worker exited or crashed: fail whatever it still had
+        self._loop.call_soon_threadsafe(self._fail_pending, conn)
+
+    def _resolve(self, request_id: int, html: Optional[str]) -> None:
+        future = self._pending.pop(request_id, None)
+        if future is not None and not future.done():
+            future.set_result(html)
+
+    def _fail_pending(self, conn: Any) -> None:
+        if conn is not self._conn:
+            return
+        self._connected = False
+        for future in self._pending.values():
+            if not future.done():
+                future.set_result(None)
+        self._pending.clear()
+
+    async def stop(self) -> None:
+        if self.process is None:
+            return
+        try:
+            self._conn.send(None)
+        except (OSError, ValueError):
+            pass
+        await self._loop.run_in_executor(None, self.process.join, 30)
+        if self.process.is_alive():
+            self.process.kill()
+        self._conn.close()
+
+    def alive(self) -> bool:
+        return self._connected and self.process is not None and self.process.is_alive()
+
+    async def render(self, url: str, max_retries: int) -> Optional[str]:
+        request_id = next(self._ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        try:
+            self._conn.send((request_id, url, max_retries))
+        except (OSError, ValueError):
+            self._pending.pop(request_id, None)
+            return None
+        return await future
+
+
+class BrowserFarm:
+    """
+    Renders pages across several independent headless browsers.
+
+    PlaywrightScraper() is a process-wide singleton, so on its own every
+    render goes through one Chromium. A farm launches `size` browsers,
+    either in this process (each a PlaywrightScraper.standalone()) or, with
+    `processes=True`, each in its own worker process with its own event
+    loop, so rendering also scales past one core of Python. Every
+    get_html_content call goes to the browser with the fewest renders in
+    flight. A browser is drained and restarted after `restart_after`
+    renders, when its process tree uses more than `max_memory_mb` (needs
+    psutil), or straight away if it crashed; a render lost to a crash is
+    retried once on another browser. `stats()` reports per-browser load
+    and utilisation.
+
+    A farm can be used wherever a PlaywrightScraper is, e.g. as the
+    `browser` of an AsyncAmazonScraper or TieredFetcher.
+
+    Usage:
+        farm = BrowserFarm(size=4, processes=True, restart_after=500, max_memory_mb=1500)
+        await farm.initialize(concurrency=4)
+        async with AsyncAmazonScraper(browser=farm) as scraper:
+            ...
+        print(farm.stats())
+        await farm.close()
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        processes: bool = False,
+        restart_after: Optional[int] = 1000,
+        max_memory_mb: Optional[float] = None,
+        memory_check_interval: float = 10.0,
+        mp_context: Any = None,
+    ):
+        """
+        Args:
+            size: Number of browsers
+            processes: Run each browser in its own worker process
+            restart_after: Renders after which a browser is restarted, None for never
+            max_memory_mb: Memory of a browser's process tree above which it is restarted
+            memory_check_interval: Minimum seconds between memory checks of a browser
+            mp_context: multiprocessing context for worker processes, defaults to "spawn"
+        """
+        self.size = max(1, size)
+        self.processes = processes
+        self.restart_after = restart_after
+        self.max_memory_mb = max_memory_mb
+        self.memory_check_interval = memory_check_interval
+        self.mp_context = mp_context
+        self.browsers: List[_Browser] = []
+        self.concurrency = 4
+        self._available: Optional[asyncio.Condition] = None
+        self._restarts: Set[asyncio.Task] = set()
+        self._initialized = False
+
+    async def initialize(self, concurrency: int = 4, **options: Any) -> None:
+        """
+        Launch every browser.
+
+        Args:
+            concurrency: Renders at once per browser
+            **options: Further PlaywrightScraper.initialize options (max_page_uses, blocked_domains, ...)
+        """
+        if self._initialized:
+            return
+        if self.max_memory_mb is not None:
+            try:
+                import psutil  # noqa: F401
+            except ImportError:
+                raise ImportError("BrowserFarm max_memory_mb requires psutil: pip install psutil")
+        if self.processes and options.get("limiter") is not None:
+            # A limiter can't be shared across processes; each worker would get a copy
+            raise ValueError("A shared limiter only works with processes=False")
+        if self.processes and options.get("metrics") is not None:
+            raise ValueError("metrics only work with processes=False")
+
+        self.concurrency = max(1, concurrency)
+        options = dict(options, concurrency=self.concurrency)
+        self._available = asyncio.Condition()
+        start_lock = asyncio.Lock()
+        for index in range(self.size):
+            if self.processes:
+                self.browsers.append(_ProcessBrowser(index, options, self.mp_context))
+            else:
+                self.browsers.append(_LocalBrowser(index, options, start_lock))
+        await asyncio.gather(*(self._start(browser) for browser in self.browsers))
+        self._initialized = True
+        logger.info("Browser farm started with %d browsers", self.size)
+
+    async def _start(self, browser: _Browser) -> None:
+        await browser.start()
+        browser.started_at = time.monotonic()
+        browser.renders_since_start = 0
+        browser.busy_seconds = 0.0
+        browser.draining = False
+        browser.ready = browser.alive()
+        if not browser.ready:
+            logger.error("Browser %d is not running", browser.index)
+        async with self._available:
+            self._available.notify_all()
+
+    async def _pick(self) -> Optional[_Browser]:
+        """
+        The ready browser with the fewest renders in flight, waiting while all
+        are busy or restarting. None if no browser is running or coming back.
+        """
+        async with self._available:
+            while True:
+                candidates = [
+                    b for b in self.browsers if b.ready and not b.draining and b.in_flight < self.concurrency
+                ]
+                if candidates:
+                    browser = min(candidates, key=lambda b: (b.in_flight, b.renders_since_start))
+                    browser.in_flight += 1
+                    return browser
+                if not any(b.ready or b.restarting for b in self.browsers):
+                    return None
+                await self._available.wait()
+
+    async def _done(self, browser: _Browser) -> None:
+        browser.in_flight -= 1
+        if not browser.alive():
+            browser.ready = False
+        elif self._needs_restart(browser):
+            browser.draining = True
+        if (not browser.ready or browser.draining) and browser.in_flight == 0 and not browser.restarting:
+            browser.restarting = True
+            task = asyncio.ensure_future(self._restart(browser))
+            self._restarts.add(task)
+            task.add_done_callback(self._restarts.discard)
+        async with self._available:
+            self._available.notify_all()
+
+    def _needs_restart(self, browser: _Browser) -> bool:
+        if self.restart_after is not None and browser.renders_since_start >= self.restart_after:
+            return True
+        if self.max_memory_mb is None:
+            return False
+        now = time.monotonic()
+        if now - browser.memory_checked_at < self.memory_check_interval:
+            return False
+        browser.memory_checked_at = now
+        browser.memory_bytes = _tree_rss(browser.pids())
+        return browser.memory_bytes is not None and browser.memory_bytes > self.max_memory_mb * 2 ** 20
+
+    async def _restart(self, browser: _Browser) -> None:
+        reason = "crashed" if not browser.alive() else "recycled"
+        logger.info("Restarting browser %d (%s after %d renders)", browser.index, reason, browser.renders_since_start)
+        browser.ready = False
+        try:
+            await browser.stop()
+        except Exception as e:
+            logger.warning("Error stopping browser %d: %s", browser.index, e)
+        browser.restarts += 1
+        try:
+            await self._start(browser)
+        except Exception as e:
+            logger.error("Error restarting browser %d: %s", browser.index, e)
+        finally:
+            browser.restarting = False
+            async with self._available:
+                self._available.notify_all()
+
+    async def get_html_content(
+        self,
+        url: str,
+        max_retries: int = 3,
+        cache: Optional[ResponseCache] = None,
+        cache_ttl: Optional[float] = None
+    ) -> Optional[str]:
+        """Render a URL on the least-loaded browser, like PlaywrightScraper.get_html_content."""
+        if cache is not None:
+            html_content = cache.get(url, ttl=cache_ttl)
+            if html_content is not None:
+                return html_content
+        if not self._initialized:
+            await self.initialize()
+
+        html_content = None
+        for attempt in range(2):
+            browser = await self._pick()
+            if browser is None:
+                logger.error("No browser of the farm is running")
+                break
+            start = time.perf_counter()
+            try:
+                html_content = await browser.render(url, max_retries)
+            except Exception as e:
+                logger.warning("Error rendering on browser %d: %s", browser.index, e)
+                html_content = None
+            finally:
+                browser.busy_seconds += time.perf_counter() - start
+                browser.renders += 1
+                browser.renders_since_start += 1
+                crashed = not browser.alive()
+                if html_content is None:
+                    browser.failures += 1
+                await self._done(browser)
+            if html_content is not None or not crashed:
+                break
+            logger.warning("Browser %d crashed rendering %s, retrying on another browser", browser.index, url)
+
+        if html_content is not None and cache is not None:
+            cache.set(url, html_content)
+        return html_content
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Per-browser load and health. `utilisation` is the share of the
+        browser's render slots that were busy since it last (re)started.
+        """
+        now = time.monotonic()
+        stats = []
+        for browser in self.browsers:
+            elapsed = max(now - browser.started_at, 1e-9)
+            stats.append({
+                "browser": browser.index,
+                "pids": browser.pids(),
+                "ready": browser.ready,
+                "in_flight": browser.in_flight,
+                "renders": browser.renders,
+                "failures": browser.failures,
+                "restarts": browser.restarts,
+                "renders_since_start": browser.renders_since_start,
+                "utilisation": min(1.0, browser.busy_seconds / (elapsed * self.concurrency)),
+                "memory_mb": None if browser.memory_bytes is None else browser.memory_bytes / 2 ** 20,
+            })
+        return stats
+
+    async def close(self) -> None:
+        """Stop every browser and worker process."""
+        for task in list(self._restarts):
+            task.cancel()
+        await asyncio.gather(*(browser.stop() for browser in self.browsers), return_exceptions=True)
+        self.browsers = []
+        self._initialized = False
+        logger.info("Browser farm closed")
@@ -0,0 +1,189 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+
+class ResponseCache:
+    """
+    On-disk cache of page bodies keyed by URL.
+
+    Bodies are zlib-compressed and kept in a SQLite database in WAL mode, so
+    any number of threads and worker processes can share one cache directory.
+    Entries older than the TTL are treated as misses, and once the compressed
+    size exceeds `max_bytes` the least recently used entries are evicted.
+
+    Reads stay off the write lock: a hit only records its access time in
+    memory, and those times are written in batches of `touch_batch` (and
+    by every `set`). The total size is summed when a process opens the
+    cache and then tracked from its own writes; it is re-summed every
+    `size_check_every` writes to catch other processes' writes, so the
+    cache can briefly overshoot `max_bytes` by that many entries.
+
+    Usage:
+        cache = ResponseCache(".dibkb_cache", ttl=600)
+        scraper = AmazonScraper(asin, cache=cache)
+    """
+
+    def __init__(
+        self,
+        directory: str = ".dibkb_cache",
+        ttl: Optional[float] = 3600,
+        max_bytes: int = 512 * 1024 * 1024,
+        compression_level: int = 6,
+        touch_batch: int = 64,
+        size_check_every: int = 64,
+    ):
+        """
+        Args:
+            directory: Directory holding the cache database
+            ttl: Default maximum age in seconds of a usable entry, None for no expiry
+            max_bytes: Maximum total compressed size before LRU eviction
+            compression_level: zlib compression level (1-9)
+            touch_batch: Cache hits whose access times are written in one transaction
+            size_check_every: Writes between exact recounts of the total size
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, "responses.sqlite3")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self.touch_batch = max(1, touch_batch)
+        self.size_check_every = max(1, size_check_every)
+        # Access times of hits not yet written, by URL
+        self._touches: Dict[str, float] = {}
+        # Total size as of the last count, plus what this process wrote since
+        self._total = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not cross a fork, so each process opens its own
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL, "
+                "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+            self._conn = conn
+            self._pid = os.getpid()
+            self._touches = {}
+            self._total = self._count(conn)
+            self._writes = 0
+        return self._conn
+
+    def get(self, url: str, ttl: Optional[float] = None) -> Optional[str]:
+        """
+        Return the cached body for a URL, or None on a miss.
+
+        Args:
+            url: The page URL
+            ttl: Maximum age in seconds for this lookup, defaults to the cache's TTL
+        """
+        max_age = self.ttl if ttl is None else ttl
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT body, stored_at FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            body, stored_at = row
+            if max_age is not None and now - stored_at > max_age:
+                return None
+            self._touches[url] = now
+            if len(self._touches) >= self.touch_batch:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._write_touches(conn)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+        return zlib.decompress(body).decode("utf-8")
+
+    def set(self, url: str, body: str) -> None:
+        """Store a page body, evicting least recently used entries if over max_bytes."""
+        data = zlib.compress(body.encode("utf-8"), self.compression_level)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # A replaced entry's size no longer counts towards the total
+                replaced = conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (url, body, size, stored_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (url, data, len(data), now, now),
+                )
+                self._touches.pop(url, None)
+                self._write_touches(conn)
+                self._total += len(data) - (replaced[0] if replaced else 0)
+                self._writes += 1
+                if self._writes >= self.size_check_every or self._total > self.max_bytes:
+                    self._evict(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _count(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _write_touches(self, conn: sqlite3.Connection) -> None:
+        if self._touches:
+            touches, self._touches = self._touches, {}
+            conn.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE url = ?", [(at, url) for url, at in touches.items()]
+            )
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = self._count(conn)
+        self._writes = 0
+        while total > self.max_bytes:
+            rows = conn.execute("SELECT url, size FROM responses ORDER BY accessed_at LIMIT 64").fetchall()
+            if not rows:
+                break
+            for url, size in rows:
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                total -= size
+        self._total = total
+
+    def delete(self, url: str) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM responses")
+            self._touches = {}
+            self._total = 0
+
+    def size_bytes(self) -> int:
+        """Total compressed size of all entries."""
+        with self._lock:
+            return self._count(self._connection())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                if self._touches:
+                    self._write_touches(self._conn)
+                self._conn.close()
+            self._conn = None
@@ -0,0 +1,250 @@
+"""
+Scrape ASINs in bulk from a file or stdin.
+
+Completed ASINs are recorded in a checkpoint file next to the output, so an
+interrupted run picks up where it stopped when the same command is run
+again. Failed ASINs are not checkpointed and are retried on the next run;
+JSONL output only gets successful products, so a retry never adds a second
+line for an ASIN, while SQLite output records the error on the product row,
+which the retry then replaces. Progress (pages/sec, error rate, latency percentiles) is printed to
+stderr while the run goes on.
+
+Usage:
+    dibkb-scraper asins.txt -o products.jsonl --concurrency 20
+    cat asins.txt | dibkb-scraper - --format sqlite -o products.sqlite3
+    dibkb-scraper asins.txt --tier browser --cache .dibkb_cache
+"""
+import argparse
+import asyncio
+import collections
+import contextlib
+import logging
+import math
+import os
+import sys
+import time
+from typing import Deque, Iterable, Iterator, List, Optional, Set, TextIO
+
+from .async_amazon import AsyncAmazonScraper
+from .cache import ResponseCache
+from .models import AmazonProductResponse
+from .pipeline import JsonlSink, Pipeline, read_asins
+from .process_pool import ProcessPoolExtractor
+from .ratelimit import AdaptiveRateLimiter
+from .store import ProductStore
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"jsonl": "products.jsonl", "sqlite": "products.sqlite3"}
+
+
+class Checkpoint:
+    """
+    Append-only file of completed ASINs, one per line.
+
+    ASINs are only written out by `flush`, which the caller runs right after
+    flushing the output, so the checkpoint never claims a product the
+    output doesn't have.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Set[str] = set(read_asins(path)) if os.path.exists(path) else set()
+        self._pending: List[str] = []
+        self._file = open(path, "a", encoding="utf-8")
+
+    def add(self, asin: str) -> None:
+        self._pending.append(asin)
+
+    def flush(self) -> None:
+        if self._pending:
+            self._file.write("".join(f"{asin}\n" for asin in self._pending))
+            self._file.flush()
+            self.done.update(self._pending)
+            self._pending = []
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values, 0.0 when empty."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))]
+
+
+class RunStats:
+    """Throughput, error rate and latency of recent products."""
+
+    def __init__(self, window: int = 10000):
+        self.started = time.monotonic()
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        self.latencies: Deque[float] = collections.deque(maxlen=window)
+        self._last_report = (self.started, 0)
+
+    def record(self, seconds: float, error: Optional[str]) -> None:
+        self.done += 1
+        self.failed += bool(error)
+        self.latencies.append(seconds)
+
+    def line(self, final: bool = False) -> str:
+        now = time.monotonic()
+        if final:
+            since, done_before = self.started, 0
+        else:
+            since, done_before = self._last_report
+            self._last_report = (now, self.done)
+        rate = (self.done - done_before) / (now - since) if now > since else 0.0
+        errors = self.failed / self.done if self.done else 0.0
+        latencies = sorted(self.latencies)
+        return (
+            f"{self.done} done ({self.skipped} resumed)  {rate:.1f} pages/s  errors {errors:.1%}  "
+            f"latency p50 {percentile(latencies, 50):.2f}s p95 {percentile(latencies, 95):.2f}s "
+            f"p99 {percentile(latencies, 99):.2f}s"
+        )
+
+
+class _TimedScraper(AsyncAmazonScraper):
+    def __init__(self, stats: RunStats, **options):
+        super().__init__(**options)
+        self.stats = stats
+
+    async def scrape(self, asin: str) -> AmazonProductResponse:
+        start = time.perf_counter()
+        response = await super().scrape(asin)
+        self.stats.record(time.perf_counter() - start, response.error)
+        return response
+
+
+def _remaining(asins: Iterable[str], checkpoint: Checkpoint, stats: RunStats) -> Iterator[str]:
+    for asin in asins:
+        if asin in checkpoint.done:
+            stats.skipped += 1
+        else:
+            yield asin
+
+
+async def _report(stats: RunStats, interval: float, stream: TextIO) -> None:
+    end = "\r" if stream.isatty() else "\n"
+    while True:
+        await asyncio.sleep(interval)
+        stream.write(stats.line() + end)
+        stream.flush()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="dibkb-scraper", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("input", nargs="?", default="-", help="File with one ASIN per line, or - for stdin")
+    parser.add_argument("-o", "--output", help="Output file, default products.jsonl or products.sqlite3")
+    parser.add_argument("-f", "--format", choices=sorted(FORMATS), default="jsonl", help="Output format")
+    parser.add_argument("-c", "--concurrency", type=int, default=10, help="Products in flight at once")
+    parser.add_argument(
+        "--tier", choices=("http", "browser"), default="http",
+        help="http: httpx only; browser: also render blocked pages in headless Chromium",
+    )
+    parser.add_argument("--browser-concurrency", type=int, default=4, help="Pages rendering at once per browser")
+    parser.add_argument("--browsers", type=int, default=1, help="Browsers in the render farm (--tier browser)")
+    parser.add_argument("--parser", help="Parser backend: html.parser, lxml or selectolax")
+    parser.add_argument("--lean", action="store_true", help="Only build the page regions extractors read")
+    parser.add_argument("--workers", type=int, default=0, help="Extract in this many processes (0: in process)")
+    parser.add_argument("--cache", help="Response cache directory")
+    parser.add_argument("--rate", type=float, help="Initial requests/sec per host (adaptive rate limiting)")
+    parser.add_argument("--checkpoint", help="Completed ASINs file, default <output>.done")
+    parser.add_argument("--flush-every", type=int, default=100, help="Products between output flushes")
+    parser.add_argument("--stats-interval", type=float, default=2.0, help="Seconds between progress lines")
+    parser.add_argument("-q", "--quiet", action="store_true", help="No progress output")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every fetch error")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> int:
+    output = args.output or FORMATS[args.format]
+    stats = RunStats()
+    flush_every = max(1, args.flush_every)
+
+    # Everything opened below is closed in reverse order however the run
+    # ends, including a failure while the browser or extractor starts up;
+    # the sink closes before the checkpoint, so the checkpoint never claims
+    # a product that isn't in the output
+    async with contextlib.AsyncExitStack() as stack:
+        if not args.quiet:
+            stack.callback(lambda: sys.stderr.write(stats.line(final=True) + "\n"))
+        checkpoint = Checkpoint(args.checkpoint or f"{output}.done")
+        stack.callback(checkpoint.close)
+        if args.format == "sqlite":
+            sink = ProductStore(output, batch_size=flush_every)
+        else:
+            sink = JsonlSink(output, flush_every=flush_every)
+        stack.callback(sink.close)
+        # A store keeps one row per ASIN, so a retry replaces a recorded failure;
+        # an appended JSONL line can't be replaced, so failures stay out of it
+        records_failures = isinstance(sink, ProductStore)
+
+        cache = None
+        if args.cache:
+            cache = ResponseCache(args.cache)
+            stack.callback(cache.close)
+        browser = None
+        limiter = AdaptiveRateLimiter(initial_rate=args.rate) if args.rate else None
+        if args.tier == "browser":
+            if args.browsers > 1:
+                from .browser_farm import BrowserFarm
+                browser = BrowserFarm(size=args.browsers)
+            else:
+                from .playwright import PlaywrightScraper
+                browser = PlaywrightScraper()
+            stack.push_async_callback(browser.close)
+            await browser.initialize(concurrency=args.browser_concurrency, limiter=limiter)
+        extractor = None
+        if args.workers:
+            extractor = ProcessPoolExtractor(workers=args.workers)
+            stack.callback(extractor.close)
+
+        if not args.quiet:
+            reporter = asyncio.ensure_future(_report(stats, args.stats_interval, sys.stderr))
+            stack.callback(reporter.cancel)
+        source = read_asins(sys.stdin if args.input == "-" else args.input)
+        scraper = await stack.enter_async_context(
+            _TimedScraper(
+                stats,
+                concurrency=args.concurrency,
+                max_connections=max(args.concurrency, 20),
+                parser=args.parser,
+                lean=args.lean,
+                cache=cache,
+                limiter=limiter,
+                browser=browser,
+                extractor=extractor,
+            )
+        )
+        pipeline = Pipeline(scraper)
+        async for response in pipeline.stream(_remaining(source, checkpoint, stats)):
+            if not response.error:
+                sink.write(response)
+                checkpoint.add(response.asin)
+            elif records_failures:
+                sink.write(response)
+            if pipeline.processed % flush_every == 0:
+                sink.flush()
+                checkpoint.flush()
+    return 1 if stats.done and stats.failed == stats.done else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR, format="%(levelname)s %(message)s")
+    try:
+        return asyncio.run(run(args))
+    except KeyboardInterrupt:
+        sys.stderr.write("Interrupted; run the same command again to resume\n")
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+import functools
+import math
+import sys
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .models import AmazonProductResponse
+
+# rating_stats keys, in the order get_ratings writes them
+STARS = ("one_star", "two_star", "three_star", "four_star", "five_star")
+
+# Byte stored for a missing star percentage
+_NO_PERCENTAGE = 255
+
+_HAS_DESCRIPTION = 1
+_HAS_SPECIFICATIONS = 2
+_HAS_RATINGS = 4
+
+# Distinct category paths and spec key layouts remembered for sharing
+SHARED_TUPLES = 4096
+
+
+@functools.lru_cache(maxsize=SHARED_TUPLES)
+def _canonical(packed: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    return packed
+
+
+def _share(values: Iterable[Any]) -> Tuple[Any, ...]:
+    """
+    Tuple of interned strings, shared with earlier equal tuples.
+
+    Category paths and spec key layouts repeat across products, so the
+    recently used ones are stored once; the cache is bounded so a long run
+    over ever new layouts doesn't grow it without limit.
+    """
+    return _canonical(tuple(sys.intern(v) if type(v) is str else v for v in values))
+
+
+def _tuple(values: Optional[Iterable[Any]]) -> Optional[Tuple[Any, ...]]:
+    return None if values is None else tuple(values)
+
+
+def _list(values: Optional[Tuple[Any, ...]]) -> Optional[List[Any]]:
+    return None if values is None else list(values)
+
+
+def _pack_mapping(mapping: Optional[Dict[str, str]]) -> Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    if mapping is None:
+        return None
+    return _share(mapping.keys()), tuple(mapping.values())
+
+
+def _unpack_mapping(packed: Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]) -> Optional[Dict[str, str]]:
+    if packed is None:
+        return None
+    return dict(zip(*packed))
+
+
+def _derived_count(percentage: Optional[int], review_count: Optional[int]) -> Optional[int]:
+    # Same formula as get_ratings
+    return math.floor(percentage * review_count / 100) if percentage and review_count else None
+
+
+def _pack_stars(stats: Any, review_count: Optional[int]) -> Optional[Tuple[bytes, Optional[Tuple[Any, ...]]]]:
+    """Star percentages as five bytes, plus counts only when they can't be recomputed."""
+    if not isinstance(stats, dict) or list(stats) != list(STARS):
+        return None
+    percentages = bytearray()
+    counts = []
+    for star in STARS:
+        entry = stats[star]
+        if not isinstance(entry, dict) or set(entry) != {"count", "percentage"}:
+            return None
+        percentage = entry["percentage"]
+        if percentage is None:
+            percentages.append(_NO_PERCENTAGE)
+        elif type(percentage) is int and 0 <= percentage < _NO_PERCENTAGE:
+            percentages.append(percentage)
+        else:
+            return None
+        counts.append(entry["count"])
+    derived = [_derived_count(p if p != _NO_PERCENTAGE else None, review_count) for p in percentages]
+    return bytes(percentages), None if counts == derived else tuple(counts)
+
+
+class CompactCompetitor(NamedTuple):
+    asin: str
+    title: str
+    img_id: str
+    price: Optional[float]
+
+
+class CompactProduct(NamedTuple):
+    """
+    One scraped product as a flat, immutable tuple.
+
+    Lists become tuples, specification tables become a shared tuple of
+    interned keys plus a tuple of values, categories are a shared tuple of
+    interned strings, and the star histogram is packed into five bytes
+    (counts are recomputed from the percentages and review count, and only
+    stored when they differ). Records compare by value and, unless ratings
+    had to be kept as a raw dictionary, are hashable, so they can go
+    straight into sets and dicts for dedup and diffing.
+
+    Converting to and from AmazonProductResponse is lossless.
+
+    Usage:
+        compact = CompactProduct.from_response(response)
+        assert compact.to_response() == response
+        compact = AmazonScraper(asin).get_compact_details()
+    """
+    asin: Optional[str]
+    error: Optional[str]
+    title: Optional[str]
+    image: Optional[Tuple[str, ...]]
+    price: Optional[float]
+    categories: Optional[Tuple[str, ...]]
+    highlights: Optional[Tuple[str, ...]]
+    technical: Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]
+    additional: Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]
+    details: Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]
+    rating: Optional[float]
+    review_count: Optional[int]
+    star_percentages: Optional[bytes]
+    star_counts: Optional[Tuple[Optional[int], ...]]
+    reviews: Optional[Tuple[str, ...]]
+    related_products: Optional[Tuple[CompactCompetitor, ...]]
+    flags: int
+    # Ratings that don't have the shape of the Ratings model, kept as given
+    raw_ratings: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_details(cls, asin: Optional[str], details: Dict[str, Any]) -> "CompactProduct":
+        """Pack a get_all_details dictionary, without building pydantic models."""
+        product = details.get("product") or {}
+        flags = 0
+
+        description = product.get("description")
+        highlights = None
+        if description is not None:
+            flags |= _HAS_DESCRIPTION
+            highlights = _tuple(description.get("highlights"))
+
+        specifications = product.get("specifications")
+        technical = additional = specs = None
+        if specifications is not None:
+            flags |= _HAS_SPECIFICATIONS
+            technical = _pack_mapping(specifications.get("technical"))
+            additional = _pack_mapping(specifications.get("additional"))
+            specs = _pack_mapping(specifications.get("details"))
+
+        ratings = product.get("ratings")
+        rating = review_count = star_percentages = star_counts = raw_ratings = None
+        if ratings is not None:
+            flags |= _HAS_RATINGS
+            rating = ratings.get("rating")
+            review_count = ratings.get("review_count")
+            stats = ratings.get("rating_stats")
+            stars = _pack_stars(stats, review_count) if stats is not None else None
+            canonical = (
+                set(ratings) <= {"rating", "review_count", "rating_stats"}
+                and (stats is None or stars is not None)
+            )
+            if canonical:
+                if stars is not None:
+                    star_percentages, star_counts = stars
+            else:
+                raw_ratings = ratings
+                rating = review_count = None
+
+        related = product.get("related_products")
+        if related is not None:
+            related = tuple(
+                CompactCompetitor(r["asin"], r["title"], r["img_id"], r["price"]) for r in related
+            )
+
+        categories = product.get("categories")
+        return cls(
+            asin=asin,
+            error=details.get("error"),
+            title=product.get("title"),
+            image=_tuple(product.get("image")),
+            price=product.get("price"),
+            categories=None if categories is None else _share(categories),
+            highlights=highlights,
+            technical=technical,
+            additional=additional,
+            details=specs,
+            rating=rating,
+            review_count=review_count,
+            star_percentages=star_percentages,
+            star_counts=star_counts,
+            reviews=_tuple(product.get("reviews")),
+            related_products=related,
+            flags=flags,
+            raw_ratings=raw_ratings,
+        )
+
+    @classmethod
+    def from_response(cls, response: AmazonProductResponse) -> "CompactProduct":
+        dump = response.model_dump() if hasattr(response, "model_dump") else response.dict()
+        return cls.from_details(response.asin, dump)
+
+    def ratings(self) -> Optional[Dict[str, Any]]:
+        """The ratings dictionary, as get_ratings returned it."""
+        if self.raw_ratings is not None:
+            return self.raw_ratings
+        if not self.flags & _HAS_RATINGS:
+            return None
+        ratings: Dict[str, Any] = {}
+        if self.rating is not None:
+            ratings["rating"] = self.rating
+        if self.review_count is not None:
+            ratings["review_count"] = self.review_count
+        if self.star_percentages is not None:
+            stats = {}
+            for i, star in enumerate(STARS):
+                percentage = self.star_percentages[i]
+                percentage = None if percentage == _NO_PERCENTAGE else percentage
+                count = (
+                    self.star_counts[i] if self.star_counts is not None
+                    else _derived_count(percentage, self.review_count)
+                )
+                stats[star] = {"count": count, "percentage": percentage}
+            ratings["rating_stats"] = stats
+        return ratings
+
+    def to_details(self) -> Dict[str, Any]:
+        """Unpack into the dictionary shape get_all_details returns."""
+        product: Dict[str, Any] = {
+            "title": self.title,
+            "image": _list(self.image),
+            "price": self.price,
+            "categories": _list(self.categories),
+            "description": {"highlights": _list(self.highlights)} if self.flags & _HAS_DESCRIPTION else None,
+            "specifications": {
+                "technical": _unpack_mapping(self.technical),
+                "additional": _unpack_mapping(self.additional),
+                "details": _unpack_mapping(self.details),
+            } if self.flags & _HAS_SPECIFICATIONS else None,
+            "ratings": self.ratings(),
+            "reviews": _list(self.reviews),
+            "related_products": None if self.related_products is None else [
+                competitor._asdict() for competitor in self.related_products
+            ],
+        }
+        return {"product": product, "error": self.error}
+
+    def to_response(self) -> AmazonProductResponse:
+        return AmazonProductResponse(asin=self.asin, **self.to_details())
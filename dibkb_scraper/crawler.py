@@ -0,0 +1,302 @@
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from .async_amazon import AsyncAmazonScraper
+from .models import AmazonProductResponse, Competitor
+
+logger = logging.getLogger(__name__)
+
+PENDING, CLAIMED, DONE, FAILED = 0, 1, 2, 3
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Membership tests can return false positives but never false negatives.
+    The bit array is sized for `capacity` items at `error_rate`; adding more
+    only raises the false positive rate.
+
+    Usage:
+        bloom = BloomFilter(capacity=1_000_000)
+        bloom.add("B0EXAMPLE1")
+        "B0EXAMPLE1" in bloom  # True
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        """
+        Args:
+            capacity: Number of items the filter is sized for
+            error_rate: False positive rate at capacity
+        """
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class CrawlFrontier:
+    """
+    Persistent, deduplicated crawl frontier kept in SQLite.
+
+    Every ASIN ever queued is a row, so the table is both the exact seen-set
+    and the queue: pending rows are claimed in priority order, then marked
+    done or failed. An in-memory Bloom filter sits in front of the table, so
+    ASINs that were never seen are recognised without a lookup and only
+    Bloom hits are checked exactly. Opening an existing database resumes
+    the crawl: ASINs claimed by a run that died are queued again, and done
+    ones are never handed out twice.
+
+    Usage:
+        frontier = CrawlFrontier("crawl.sqlite3")
+        frontier.add(["B0EXAMPLE1"])
+        asin, depth = frontier.claim()
+        frontier.complete(asin)
+    """
+
+    def __init__(self, path: str = "crawl.sqlite3", capacity: int = 1_000_000, error_rate: float = 0.01):
+        """
+        Args:
+            path: SQLite database holding the frontier, created if missing
+            capacity: Expected number of distinct ASINs, sizes the Bloom filter
+            error_rate: Bloom filter false positive rate at capacity
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS frontier ("
+            "asin TEXT PRIMARY KEY, depth INTEGER NOT NULL, priority REAL NOT NULL, "
+            "state INTEGER NOT NULL, seq INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS frontier_queue ON frontier (state, priority DESC, seq)")
+        self._conn.execute("UPDATE frontier SET state = ? WHERE state = ?", (PENDING, CLAIMED))
+
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.bloom_hits = 0
+        self.bloom_false_positives = 0
+        seq = 0
+        for asin, row_seq in self._conn.execute("SELECT asin, seq FROM frontier"):
+            self.bloom.add(asin)
+            seq = max(seq, row_seq)
+        self._seq = seq
+
+    def __contains__(self, asin: str) -> bool:
+        if asin not in self.bloom:
+            return False
+        self.bloom_hits += 1
+        if self._conn.execute("SELECT 1 FROM frontier WHERE asin = ?", (asin,)).fetchone() is None:
+            self.bloom_false_positives += 1
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM frontier").fetchone()[0]
+
+    def add(self, asins: Iterable[str], depth: int = 0, priority: Optional[float] = None) -> int:
+        """
+        Queue ASINs that have never been seen; known ones are ignored.
+
+        Args:
+            asins: ASINs to queue
+            depth: Link distance from the seeds
+            priority: Higher is claimed first; defaults to -depth (breadth-first)
+
+        Returns:
+            Number of ASINs actually queued
+        """
+        return self.add_many((asin, depth, priority) for asin in asins)
+
+    def add_many(self, entries: Iterable[Tuple[str, int, Optional[float]]]) -> int:
+        """Queue (asin, depth, priority) entries in one transaction, skipping seen ASINs."""
+        rows = []
+        batch = set()
+        for asin, depth, priority in entries:
+            if asin in batch or asin in self:
+                continue
+            batch.add(asin)
+            self._seq += 1
+            rows.append((asin, depth, -depth if priority is None else priority, PENDING, self._seq))
+        if not rows:
+            return 0
+        with self._transaction():
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO frontier (asin, depth, priority, state, seq) VALUES (?, ?, ?, ?, ?)", rows
+            )
+        for row in rows:
+            self.bloom.add(row[0])
+        return len(rows)
+
+    def claim(self) -> Optional[Tuple[str, int]]:
+        """Take the highest-priority pending ASIN, returning (asin, depth) or None if none is pending."""
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT asin, depth FROM frontier WHERE state = ? ORDER BY priority DESC, seq LIMIT 1", (PENDING,)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE frontier SET state = ? WHERE asin = ?", (CLAIMED, row[0]))
+        return row
+
+    def complete(self, asin: str, failed: bool = False) -> None:
+        """Mark a claimed ASIN as done, or failed."""
+        self._conn.execute("UPDATE frontier SET state = ? WHERE asin = ?", (FAILED if failed else DONE, asin))
+
+    def retry_failed(self) -> int:
+        """Queue every failed ASIN again and return how many there were."""
+        return self._conn.execute("UPDATE frontier SET state = ? WHERE state = ?", (PENDING, FAILED)).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Number of ASINs in each state."""
+        names = {PENDING: "pending", CLAIMED: "claimed", DONE: "done", FAILED: "failed"}
+        counts = dict.fromkeys(names.values(), 0)
+        for state, count in self._conn.execute("SELECT state, COUNT(*) FROM frontier GROUP BY state"):
+            counts[names[state]] = count
+        return counts
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+
+class RelatedProductsCrawler:
+    """
+    Discovers products by following related-product links from seed ASINs.
+
+    Claimed ASINs are fed to the scraper's scrape_many, and the related
+    products of every successful response are queued one level deeper, up
+    to `max_depth`. By default the crawl is breadth-first; pass `priority`
+    to order it by a score instead. All state lives in the CrawlFrontier, so
+    a crawl stopped at any point resumes from the same database without
+    fetching any finished product again.
+
+    Usage:
+        async with AsyncAmazonScraper(concurrency=20) as scraper:
+            crawler = RelatedProductsCrawler(scraper, CrawlFrontier("crawl.sqlite3"), max_depth=2)
+            crawler.seed(["B0EXAMPLE1"])
+            async for response in crawler.crawl():
+                sink.write(response)
+    """
+
+    def __init__(
+        self,
+        scraper: AsyncAmazonScraper,
+        frontier: CrawlFrontier,
+        max_depth: int = 2,
+        max_products: Optional[int] = None,
+        priority: Optional[Callable[[AmazonProductResponse, Competitor, int], float]] = None,
+        concurrency: Optional[int] = None,
+    ):
+        """
+        Args:
+            scraper: Scraper whose scrape_many fetches and extracts products
+            frontier: Seen-set and queue, shared across restarts
+            max_depth: Deepest link distance from the seeds that is fetched
+            max_products: Stop after this many products have been fetched in total, including earlier runs
+            priority: Called as priority(parent, competitor, depth) for each discovered product; higher is fetched first
+            concurrency: Maximum products in flight, defaults to the scraper's setting
+        """
+        self.scraper = scraper
+        self.frontier = frontier
+        self.max_depth = max_depth
+        self.max_products = max_products
+        self.priority = priority
+        self.concurrency = concurrency
+        counts = frontier.counts()
+        self.fetched = counts["done"] + counts["failed"]
+        self.discovered = 0
+        self._depths: Dict[str, int] = {}
+
+    def seed(self, asins: Iterable[str], priority: Optional[float] = None) -> int:
+        """Queue seed ASINs at depth 0 and return how many were new."""
+        return self.frontier.add(asins, depth=0, priority=priority)
+
+    def _budget_left(self) -> bool:
+        return self.max_products is None or self.fetched + len(self._depths) < self.max_products
+
+    def _claims(self) -> Iterator[str]:
+        while self._budget_left():
+            claimed = self.frontier.claim()
+            if claimed is None:
+                return
+            asin, depth = claimed
+            self._depths[asin] = depth
+            yield asin
+
+    def _record(self, response: AmazonProductResponse) -> None:
+        depth = self._depths.pop(response.asin)
+        self.fetched += 1
+        self.frontier.complete(response.asin, failed=bool(response.error))
+        related = response.product.related_products if response.product else None
+        if not related or depth >= self.max_depth:
+            return
+        child = depth + 1
+        self.discovered += self.frontier.add_many(
+            (
+                competitor.asin,
+                child,
+                None if self.priority is None else self.priority(response, competitor, child),
+            )
+            for competitor in related
+        )
+
+    async def crawl(self) -> AsyncIterator[AmazonProductResponse]:
+        """
+        Fetch queued products until the frontier is empty or the budget is spent,
+        yielding each response as it finishes.
+        """
+        while True:
+            async for response in self.scraper.scrape_many(self._claims(), concurrency=self.concurrency):
+                self._record(response)
+                yield response
+            # The frontier can run dry while the last products of a round are
+            # in flight; their related products start the next round
+            if not self._budget_left() or not self.frontier.counts()["pending"]:
+                logger.info("Crawl finished: %d fetched, %d discovered", self.fetched, self.discovered)
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        """Frontier counts plus Bloom filter effectiveness."""
+        return {
+            **self.frontier.counts(),
+            "fetched": self.fetched,
+            "discovered": self.discovered,
+            "bloom_hits": self.frontier.bloom_hits,
+            "bloom_false_positives": self.frontier.bloom_false_positives,
+        }
@@ -0,0 +1,109 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+
+class DomIndex:
+    """
+    Lookup tables over a parsed page, built in a single walk of the tree.
+
+    Elements are indexed by tag name, id, data-hook and class. A multi-class
+    element is indexed under each of its classes and under the full class
+    string, which mirrors how BeautifulSoup matches `{"class": "a b"}`.
+    Every table keeps elements in document order, so `find` returns the same
+    element a full-tree `soup.find` would.
+    """
+
+    def __init__(self, soup: Any):
+        self.by_name: Dict[str, List[Any]] = defaultdict(list)
+        self.by_id: Dict[str, List[Any]] = defaultdict(list)
+        self.by_class: Dict[str, List[Any]] = defaultdict(list)
+        self.by_hook: Dict[str, List[Any]] = defaultdict(list)
+
+        if soup is None:
+            return
+
+        for tag in soup.find_all(True):
+            self.by_name[tag.name].append(tag)
+
+            tag_id = tag.get("id")
+            if tag_id:
+                self.by_id[tag_id].append(tag)
+
+            hook = tag.get("data-hook")
+            if hook:
+                self.by_hook[hook].append(tag)
+
+            classes = tag.get("class")
+            if classes:
+                for cls in dict.fromkeys(classes):
+                    self.by_class[cls].append(tag)
+                if len(classes) > 1:
+                    self.by_class[" ".join(classes)].append(tag)
+
+    def find_all(
+        self,
+        name: Optional[str] = None,
+        id: Optional[str] = None,
+        class_: Optional[str] = None,
+        hook: Optional[str] = None,
+        attrs: Optional[Dict[str, Any]] = None,
+    ) -> List[Any]:
+        """
+        Return all elements matching the given criteria, in document order.
+
+        Args:
+            name: Tag name
+            id: Exact id
+            class_: A single class, or a full space separated class string
+            hook: Exact data-hook value
+            attrs: Extra attributes; a string must match exactly, True means
+                present and None means absent
+        """
+        if id is not None:
+            candidates = self.by_id.get(id, [])
+        elif hook is not None:
+            candidates = self.by_hook.get(hook, [])
+        elif class_ is not None:
+            candidates = self.by_class.get(class_, [])
+        else:
+            candidates = self.by_name.get(name, [])
+
+        return [
+            tag for tag in candidates
+            if self._matches(tag, name, id, class_, hook, attrs)
+        ]
+
+    def find(
+        self,
+        name: Optional[str] = None,
+        id: Optional[str] = None,
+        class_: Optional[str] = None,
+        hook: Optional[str] = None,
+        attrs: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Any]:
+        """Return the first element matching the given criteria, or None."""
+        matches = self.find_all(name, id, class_, hook, attrs)
+        return matches[0] if matches else None
+
+    def _matches(self, tag, name, id, class_, hook, attrs) -> bool:
+        if name is not None and tag.name != name:
+            return False
+        if id is not None and tag.get("id") != id:
+            return False
+        if hook is not None and tag.get("data-hook") != hook:
+            return False
+        if class_ is not None:
+            classes = tag.get("class") or []
+            if class_ not in classes and " ".join(classes) != class_:
+                return False
+        for key, expected in (attrs or {}).items():
+            value = tag.get(key)
+            if expected is True:
+                if value is None:
+                    return False
+            elif expected is None:
+                if value is not None:
+                    return False
+            elif value != expected:
+                return False
+        return True
@@ -0,0 +1,205 @@
+import bisect
+import html as html_lib
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional accelerator, json is used without it
+    orjson = None
+
+
+class _Unknown:
+    def __repr__(self) -> str:
+        return "UNKNOWN"
+
+
+# Returned when the raw HTML is ambiguous and the parsed page has to decide
+UNKNOWN: Any = _Unknown()
+
+PRICE_DATA_CLASS = "a-section aok-hidden twister-plus-buying-options-price-data"
+IMAGE_BLOCK_MARKER = "ImageBlockATF"
+CAROUSEL_CARD_CLASS = "a-carousel-card"
+AD_FEEDBACK_ATTR = "data-adfeedbackdetails"
+
+_START_TAG = re.compile(
+    r"""<([a-zA-Z][^\s/>]*)((?:\s*[^\s"'>/=]+(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'=<>`]+))?)*)\s*/?>"""
+)
+_ATTR = re.compile(r"""([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?""")
+_SCRIPT = re.compile(r"<script\b[^>]*>(.*?)</script\s*>", re.S | re.I)
+_BRACKETS = re.compile(r"[\[\]]")
+
+
+def loads(text: str) -> Any:
+    """Decode JSON with orjson when it is installed, with json's results and errors otherwise."""
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            # Let json decide, so inputs only it accepts (NaN, huge ints) still work
+            pass
+    return json.loads(text)
+
+
+def bracketed(text: str, start: int) -> str:
+    """
+    Return text from `start` up to and including the bracket that closes the first array.
+
+    Brackets are counted without regard to JSON strings, exactly like the
+    character loop get_product_images used to run, but only the bracket
+    characters are visited. Returns "" if the brackets never balance.
+    """
+    depth = 0
+    for match in _BRACKETS.finditer(text, start):
+        if match.group() == "[":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return text[start:match.end()]
+    return ""
+
+
+def _attributes(raw: str) -> Optional[Dict[str, str]]:
+    """Unescaped attributes of a start tag, or None if an attribute repeats."""
+    attrs: Dict[str, str] = {}
+    for match in _ATTR.finditer(raw):
+        name = match.group(1).lower()
+        if name in attrs:
+            return None
+        value = next((v for v in match.group(2, 3, 4) if v is not None), "")
+        attrs[name] = html_lib.unescape(value) if "&" in value else value
+    return attrs
+
+
+class EmbeddedJson:
+    """
+    Reads the JSON blobs embedded in a product page straight from its HTML.
+
+    The buy-box price data, the `colorImages` array of the ImageBlockATF
+    script and the carousel's `data-adfeedbackdetails` attributes are found
+    with substring searches and a few regular expressions over the raw
+    markup, so these fields need no parsed tree. Each method returns what
+    the DOM-based extractor would have read, or UNKNOWN when the markup is
+    unusual enough (nested or unclosed tags, repeated attributes, matches
+    inside comments or scripts) that only a parser can tell; callers then
+    fall back to the DOM.
+
+    Usage:
+        embedded = EmbeddedJson(html)
+        price_text = embedded.price_text()
+    """
+
+    def __init__(self, html: str):
+        self.html = html
+        self._scripts: Optional[List[Tuple[int, int, int, int]]] = None
+        self._script_starts: List[int] = []
+
+    def _script_spans(self) -> List[Tuple[int, int, int, int]]:
+        """(start, end, content start, content end) of every script element."""
+        if self._scripts is None:
+            self._scripts = [(m.start(), m.end(), m.start(1), m.end(1)) for m in _SCRIPT.finditer(self.html)]
+            self._script_starts = [span[0] for span in self._scripts]
+        return self._scripts
+
+    def _in_comment(self, pos: int) -> bool:
+        opened = self.html.rfind("<!--", 0, pos)
+        return opened != -1 and self.html.find("-->", opened + 4, pos) == -1
+
+    def _in_script(self, pos: int) -> bool:
+        spans = self._script_spans()
+        i = bisect.bisect_right(self._script_starts, pos) - 1
+        return i >= 0 and spans[i][0] < pos < spans[i][1]
+
+    def _tag_around(self, pos: int) -> Optional[Tuple[str, Dict[str, str], int, int]]:
+        """The start tag containing position `pos`, as (name, attributes, start, end)."""
+        start = self.html.rfind("<", 0, pos)
+        if start == -1:
+            return None
+        match = _START_TAG.match(self.html, start)
+        if match is None or match.end() <= pos:
+            return None
+        attrs = _attributes(match.group(2))
+        if attrs is None:
+            return UNKNOWN
+        return match.group(1).lower(), attrs, start, match.end()
+
+    def _is_live(self, pos: int) -> bool:
+        return not self._in_comment(pos) and not self._in_script(pos)
+
+    def price_text(self) -> Any:
+        """
+        Text of the first buy-box price data div, None if the page has none.
+        """
+        html = self.html
+        pos = html.find("twister-plus-buying-options-price-data")
+        while pos != -1:
+            tag = self._tag_around(pos)
+            if tag is UNKNOWN:
+                return UNKNOWN
+            if tag is not None:
+                name, attrs, start, end = tag
+                if name == "div" and " ".join(attrs.get("class", "").split()) == PRICE_DATA_CLASS:
+                    if not self._is_live(start):
+                        return UNKNOWN
+                    close = html.find("</div", end)
+                    if close == -1 or "<" in html[end:close]:
+                        return UNKNOWN
+                    text = html[end:close]
+                    return html_lib.unescape(text) if "&" in text else text
+            pos = html.find("twister-plus-buying-options-price-data", pos + 1)
+        return None
+
+    def image_block_script(self) -> Any:
+        """Content of the first script mentioning ImageBlockATF, None if there is none."""
+        if IMAGE_BLOCK_MARKER not in self.html:
+            return None
+        for start, _, content_start, content_end in self._script_spans():
+            content = self.html[content_start:content_end]
+            if IMAGE_BLOCK_MARKER in content:
+                if self._in_comment(start):
+                    return UNKNOWN
+                return content
+        return UNKNOWN
+
+    def ad_feedback_details(self) -> Any:
+        """
+        The non-empty data-adfeedbackdetails value of the first such div in
+        every carousel card, in document order.
+        """
+        html = self.html
+        payloads: List[str] = []
+        pos = html.find(CAROUSEL_CARD_CLASS)
+        while pos != -1:
+            tag = self._tag_around(pos)
+            if tag is UNKNOWN:
+                return UNKNOWN
+            if tag is not None:
+                name, attrs, start, end = tag
+                if name == "li" and CAROUSEL_CARD_CLASS in attrs.get("class", "").split():
+                    if not self._is_live(start):
+                        return UNKNOWN
+                    close = html.find("</li", end)
+                    if close == -1 or "<li" in html[end:close]:
+                        return UNKNOWN
+                    payload = self._first_div_attr(end, close)
+                    if payload is UNKNOWN:
+                        return UNKNOWN
+                    if payload:
+                        payloads.append(payload)
+                    pos = close
+            pos = html.find(CAROUSEL_CARD_CLASS, pos + 1)
+        return payloads
+
+    def _first_div_attr(self, start: int, end: int) -> Any:
+        html = self.html
+        pos = html.find(AD_FEEDBACK_ATTR, start, end)
+        while pos != -1:
+            tag = self._tag_around(pos)
+            if tag is UNKNOWN:
+                return UNKNOWN
+            if tag is not None and tag[0] == "div" and AD_FEEDBACK_ATTR in tag[1]:
+                return tag[1][AD_FEEDBACK_ATTR]
+            pos = html.find(AD_FEEDBACK_ATTR, pos + 1, end)
+        return None
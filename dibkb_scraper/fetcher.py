@@ -0,0 +1,167 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .cache import ResponseCache
+from .ratelimit import AdaptiveRateLimiter
+from .utils import detect_block, make_headers
+
+HTTP_TIER = "http"
+BROWSER_TIER = "browser"
+CACHE_TIER = "cache"
+
+
+@dataclass
+class FetchResult:
+    url: str
+    html: Optional[str] = None
+    tier: Optional[str] = None
+    blocked: Optional[str] = None
+    error: Optional[str] = None
+
+
+class TierStats:
+    """Request counts and latency of one fetch tier."""
+    __slots__ = ("requests", "ok", "blocked", "errors", "total_latency", "max_latency")
+
+    def __init__(self):
+        self.requests = 0
+        self.ok = 0
+        self.blocked = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record(self, latency: float, outcome: str) -> None:
+        self.requests += 1
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "ok": self.ok,
+            "blocked": self.blocked,
+            "errors": self.errors,
+            "mean_latency": self.total_latency / self.requests if self.requests else 0.0,
+            "max_latency": self.max_latency,
+        }
+
+
+class TieredFetcher:
+    """
+    Fetches pages over plain HTTP first and escalates to the headless browser
+    only when the HTTP response is blocked.
+
+    Every response goes through utils.detect_block. A 404 or a network error
+    is returned as is, because a browser would not do any better. Only 503/429,
+    CAPTCHA redirects and bot-detection bodies are retried through
+    PlaywrightScraper, which is roughly 50x more expensive per page.
+    Per-tier counts and latency are available from `stats()`.
+
+    Usage:
+        fetcher = TieredFetcher(browser=PlaywrightScraper())
+        result = await fetcher.fetch("https://www.amazon.in/dp/B00935MGKK")
+        print(result.tier, fetcher.stats())
+    """
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        browser: Optional[Any] = None,
+        cache: Optional[ResponseCache] = None,
+        cache_ttl: Optional[float] = None,
+        limiter: Optional[AdaptiveRateLimiter] = None,
+        timeout: float = 10.0,
+    ):
+        """
+        Args:
+            client: Client for the HTTP tier; one with default settings is created if omitted
+            browser: PlaywrightScraper for the browser tier; without it blocked pages are not retried
+            cache: Response cache consulted before either tier
+            cache_ttl: Maximum age in seconds of a cached page, defaults to the cache's TTL
+            limiter: Shared rate limiter for the HTTP tier (configure the browser's own at initialize)
+            timeout: HTTP timeout in seconds when the client is created here
+        """
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            headers=make_headers(), timeout=timeout, follow_redirects=True
+        )
+        self.browser = browser
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.limiter = limiter
+        self.escalations = 0
+        self._stats: Dict[str, TierStats] = {
+            CACHE_TIER: TierStats(),
+            HTTP_TIER: TierStats(),
+            BROWSER_TIER: TierStats(),
+        }
+
+    async def close(self) -> None:
+        if self._owns_client:
+            await self.client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-tier request counts and latency (seconds), plus the number of escalations."""
+        stats: Dict[str, Any] = {tier: s.as_dict() for tier, s in self._stats.items()}
+        stats["escalations"] = self.escalations
+        return stats
+
+    async def fetch(self, url: str) -> FetchResult:
+        """Fetch a page from the cache, over HTTP, or through the browser when blocked."""
+        if self.cache is not None:
+            start = time.perf_counter()
+            html = self.cache.get(url, ttl=self.cache_ttl)
+            if html is not None:
+                self._stats[CACHE_TIER].record(time.perf_counter() - start, "ok")
+                return FetchResult(url, html, CACHE_TIER)
+
+        result = await self._fetch_http(url)
+        if result.blocked and self.browser is not None:
+            self.escalations += 1
+            result = await self._fetch_browser(url)
+
+        if result.html is not None and self.cache is not None:
+            self.cache.set(url, result.html)
+        return result
+
+    async def _fetch_http(self, url: str) -> FetchResult:
+        stats = self._stats[HTTP_TIER]
+        start = time.perf_counter()
+        try:
+            if self.limiter:
+                await self.limiter.acquire_async(url)
+                start = time.perf_counter()
+            response = await self.client.get(url)
+        except httpx.RequestError as e:
+            stats.record(time.perf_counter() - start, "errors")
+            # Timeouts often carry no message, so fall back to the exception type
+            return FetchResult(url, tier=HTTP_TIER, error=str(e) or type(e).__name__)
+
+        blocked = detect_block(response.status_code, str(response.url), response.text)
+        if self.limiter:
+            self.limiter.record(url, blocked=blocked is not None)
+        if blocked:
+            stats.record(time.perf_counter() - start, "blocked")
+            return FetchResult(url, tier=HTTP_TIER, blocked=blocked, error=f"blocked ({blocked})")
+        if response.is_error:
+            stats.record(time.perf_counter() - start, "errors")
+            return FetchResult(url, tier=HTTP_TIER, error=f"status {response.status_code}")
+
+        stats.record(time.perf_counter() - start, "ok")
+        return FetchResult(url, response.text, HTTP_TIER)
+
+    async def _fetch_browser(self, url: str) -> FetchResult:
+        stats = self._stats[BROWSER_TIER]
+        start = time.perf_counter()
+        html = await self.browser.get_html_content(url)
+        if html is None:
+            # The browser already retried and classified the failure itself
+            stats.record(time.perf_counter() - start, "blocked")
+            return FetchResult(url, tier=BROWSER_TIER, blocked="browser", error="blocked (browser)")
+        stats.record(time.perf_counter() - start, "ok")
+        return FetchResult(url, html, BROWSER_TIER)
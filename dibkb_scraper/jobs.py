@@ -0,0 +1,516 @@
+import asyncio
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from .async_amazon import AsyncAmazonScraper
+
+logger = logging.getLogger(__name__)
+
+PENDING, LEASED, DONE, DEAD = 0, 1, 2, 3
+STATE_NAMES = {PENDING: "pending", LEASED: "leased", DONE: "done", DEAD: "dead"}
+
+
+class Job(NamedTuple):
+    asin: str
+    # Number of times the job has been leased, including this lease
+    attempts: int
+    # Identifies this lease; ack, nack and extend with a stale token do nothing
+    token: str
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """
+    Work queue of ASINs with leases, visibility timeouts, retries and priorities.
+
+    Workers `lease` a batch of jobs, each hidden from other workers for
+    `visibility_timeout` seconds, then `ack` the ones that succeeded and
+    `nack` the ones that failed. A failed job becomes available again after
+    an exponential backoff, and after `max_attempts` leases it is dead. If a
+    worker crashes, its leases expire and the jobs are handed out again.
+    Higher priority jobs are leased first. Putting an ASIN that is already
+    pending or leased does nothing; a done or dead ASIN is queued again.
+
+    Implementations: SqliteJobQueue (one machine, many processes) and
+    RedisJobQueue (many machines).
+    """
+
+    def __init__(
+        self,
+        visibility_timeout: float = 300.0,
+        max_attempts: int = 5,
+        backoff: float = 30.0,
+        max_backoff: float = 3600.0,
+    ):
+        """
+        Args:
+            visibility_timeout: Seconds a leased job stays hidden before it is handed out again
+            max_attempts: Leases after which a failing job is dead
+            backoff: Delay in seconds before the first retry, doubled for every further attempt
+            max_backoff: Longest retry delay in seconds
+        """
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def retry_delay(self, attempts: int) -> float:
+        return min(self.max_backoff, self.backoff * 2 ** max(0, attempts - 1))
+
+    def put(self, asins: Iterable[str], priority: int = 0) -> int:
+        """Queue ASINs and return how many were added."""
+        raise NotImplementedError
+
+    def lease(self, count: int = 1, worker: Optional[str] = None, timeout: Optional[float] = None) -> List[Job]:
+        """
+        Lease up to `count` available jobs, highest priority first.
+
+        Args:
+            count: Most jobs to lease
+            worker: Name recorded on the lease, defaults to host:pid
+            timeout: Visibility timeout for these leases, defaults to the queue's
+        """
+        raise NotImplementedError
+
+    def ack(self, job: Job) -> bool:
+        """Mark a leased job done. Returns False if the lease was lost."""
+        raise NotImplementedError
+
+    def nack(self, job: Job, error: Optional[str] = None) -> bool:
+        """Fail a leased job, to be retried after a backoff. Returns False if the lease was lost."""
+        raise NotImplementedError
+
+    def extend(self, job: Job, timeout: Optional[float] = None) -> bool:
+        """Push a lease's expiry `timeout` seconds from now. Returns False if the lease was lost."""
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each state."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteJobQueue(JobQueue):
+    """
+    JobQueue in a SQLite database, shared by any number of processes on one machine.
+
+    Leases are taken in IMMEDIATE transactions, so two workers never get
+    the same job. The database must be on a local disk; use RedisJobQueue
+    to spread work over several machines.
+
+    Usage:
+        queue = SqliteJobQueue("jobs.sqlite3")
+        queue.put(read_asins("asins.txt"))
+        for job in queue.lease(10):
+            ...
+            queue.ack(job)
+    """
+
+    def __init__(self, path: str = "jobs.sqlite3", **options: Any):
+        """
+        Args:
+            path: SQLite database file, created if missing
+            **options: Lease and retry settings, see JobQueue
+        """
+        super().__init__(**options)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not cross a fork, so each process opens its own
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "asin TEXT PRIMARY KEY, priority INTEGER NOT NULL, state INTEGER NOT NULL, "
+                "attempts INTEGER NOT NULL, available_at REAL NOT NULL, token TEXT, worker TEXT, "
+                "error TEXT, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_available ON jobs (state, priority DESC, available_at)")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def put(self, asins: Iterable[str], priority: int = 0) -> int:
+        now = time.time()
+        rows = [(asin, priority, PENDING, now, now) for asin in dict.fromkeys(asins)]
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT INTO jobs (asin, priority, state, attempts, available_at, updated_at) "
+                "VALUES (?, ?, ?, 0, ?, ?) "
+                "ON CONFLICT (asin) DO UPDATE SET priority = excluded.priority, state = excluded.state, "
+                "attempts = 0, available_at = excluded.available_at, token = NULL, worker = NULL, error = NULL, "
+                f"updated_at = excluded.updated_at WHERE jobs.state IN ({DONE}, {DEAD})",
+                rows,
+            )
+            return conn.total_changes - before
+
+    def lease(self, count: int = 1, worker: Optional[str] = None, timeout: Optional[float] = None) -> List[Job]:
+        now = time.time()
+        expires = now + (self.visibility_timeout if timeout is None else timeout)
+        worker = worker or default_worker_id()
+        with self._transaction() as conn:
+            # Expired leases of jobs that have used up their attempts are dead, not retried
+            conn.execute(
+                "UPDATE jobs SET state = ?, error = COALESCE(error, 'lease expired'), updated_at = ? "
+                "WHERE state = ? AND available_at <= ? AND attempts >= ?",
+                (DEAD, now, LEASED, now, self.max_attempts),
+            )
+            rows = conn.execute(
+                "SELECT asin, attempts FROM jobs WHERE state IN (?, ?) AND available_at <= ? "
+                "ORDER BY priority DESC, available_at LIMIT ?",
+                (PENDING, LEASED, now, count),
+            ).fetchall()
+            jobs = [Job(asin, attempts + 1, uuid.uuid4().hex) for asin, attempts in rows]
+            conn.executemany(
+                "UPDATE jobs SET state = ?, attempts = ?, available_at = ?, token = ?, worker = ?, updated_at = ? "
+                "WHERE asin = ?",
+                [(LEASED, job.attempts, expires, job.token, worker, now, job.asin) for job in jobs],
+            )
+        return jobs
+
+    def _update_leased(self, job: Job, assignments: str, params: tuple) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE asin = ? AND state = ? AND token = ?",
+                (*params, time.time(), job.asin, LEASED, job.token),
+            )
+            return cursor.rowcount == 1
+
+    def ack(self, job: Job) -> bool:
+        return self._update_leased(job, "state = ?, token = NULL, error = NULL", (DONE,))
+
+    def nack(self, job: Job, error: Optional[str] = None) -> bool:
+        if job.attempts >= self.max_attempts:
+            return self._update_leased(job, "state = ?, token = NULL, error = ?", (DEAD, error))
+        available_at = time.time() + self.retry_delay(job.attempts)
+        return self._update_leased(
+            job, "state = ?, token = NULL, error = ?, available_at = ?", (PENDING, error, available_at)
+        )
+
+    def extend(self, job: Job, timeout: Optional[float] = None) -> bool:
+        expires = time.time() + (self.visibility_timeout if timeout is None else timeout)
+        return self._update_leased(job, "available_at = ?", (expires,))
+
+    def counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(STATE_NAMES.values(), 0)
+        with self._lock:
+            for state, count in self._connection().execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"):
+                counts[STATE_NAMES[state]] = count
+        return counts
+
+    def failures(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Dead jobs with their last error, most recent first."""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT asin, attempts, error, updated_at FROM jobs WHERE state = ? ORDER BY updated_at DESC LIMIT ?",
+                (DEAD, limit),
+            ).fetchall()
+        return [dict(zip(("asin", "attempts", "error", "updated_at"), row)) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+# Redis keys, relative to the queue name:
+#   :jobs     hash asin -> JSON {priority, attempts, state, token, worker, error}
+#   :ready    zset of available jobs, scored by -priority
+#   :delayed  zset of jobs waiting out a retry backoff, scored by when they become available
+#   :leased   zset of leased jobs, scored by lease expiry
+#   :dead     zset of dead jobs, scored by when they died
+#   :done     counter of acknowledged jobs (done jobs are removed from :jobs)
+_REDIS_PUT = """
+local added = 0
+for i = 2, #ARGV do
+    local raw = redis.call('HGET', KEYS[1], ARGV[i])
+    local state = raw and cjson.decode(raw).state
+    if state ~= 'pending' and state ~= 'leased' then
+        redis.call('HSET', KEYS[1], ARGV[i], cjson.encode({priority = tonumber(ARGV[1]), attempts = 0, state = 'pending'}))
+        redis.call('ZADD', KEYS[2], -tonumber(ARGV[1]), ARGV[i])
+        redis.call('ZREM', KEYS[5], ARGV[i])
+        added = added + 1
+    end
+end
+return added
+"""
+
+_REDIS_LEASE = """
+local now, count, expires, max_attempts = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+for _, asin in ipairs(redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now)) do
+    local job = cjson.decode(redis.call('HGET', KEYS[1], asin))
+    redis.call('ZREM', KEYS[3], asin)
+    job.state = 'pending'
+    redis.call('HSET', KEYS[1], asin, cjson.encode(job))
+    redis.call('ZADD', KEYS[2], -job.priority, asin)
+end
+for _, asin in ipairs(redis.call('ZRANGEBYSCORE', KEYS[4], '-inf', now)) do
+    local job = cjson.decode(redis.call('HGET', KEYS[1], asin))
+    redis.call('ZREM', KEYS[4], asin)
+    job.token = nil
+    if job.attempts >= max_attempts then
+        job.state = 'dead'
+        job.error = job.error or 'lease expired'
+        redis.call('ZADD', KEYS[5], now, asin)
+    else
+        job.state = 'pending'
+        redis.call('ZADD', KEYS[2], -job.priority, asin)
+    end
+    redis.call('HSET', KEYS[1], asin, cjson.encode(job))
+end
+local leased = {}
+for i, asin in ipairs(redis.call('ZRANGE', KEYS[2], 0, count - 1)) do
+    local job = cjson.decode(redis.call('HGET', KEYS[1], asin))
+    redis.call('ZREM', KEYS[2], asin)
+    job.state = 'leased'
+    job.attempts = job.attempts + 1
+    job.token = ARGV[6] .. ':' .. i
+    job.worker = ARGV[5]
+    redis.call('HSET', KEYS[1], asin, cjson.encode(job))
+    redis.call('ZADD', KEYS[4], expires, asin)
+    table.insert(leased, asin)
+    table.insert(leased, job.attempts)
+    table.insert(leased, job.token)
+end
+return leased
+"""
+
+# ARGV: asin, token, action ('ack', 'nack', 'dead' or 'extend'), time, error
+_REDIS_SETTLE = """
+local raw = redis.call('HGET', KEYS[1], ARGV[1])
+if not raw then return 0 end
+local job = cjson.decode(raw)
+if job.state ~= 'leased' or job.token ~= ARGV[2] then return 0 end
+local action, at = ARGV[3], tonumber(ARGV[4])
+if action == 'extend' then
+    redis.call('ZADD', KEYS[4], at, ARGV[1])
+    return 1
+end
+redis.call('ZREM', KEYS[4], ARGV[1])
+if action == 'ack' then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    redis.call('INCR', KEYS[6])
+    return 1
+end
+job.token = nil
+job.error = ARGV[5]
+if action == 'dead' then
+    job.state = 'dead'
+    redis.call('ZADD', KEYS[5], at, ARGV[1])
+else
+    job.state = 'pending'
+    redis.call('ZADD', KEYS[3], at, ARGV[1])
+end
+redis.call('HSET', KEYS[1], ARGV[1], cjson.encode(job))
+return 1
+"""
+
+
+class RedisJobQueue(JobQueue):
+    """
+    JobQueue in Redis, for workers spread over many machines.
+
+    Every operation is a single Lua script, so leases stay exclusive however
+    many workers pull at once. Any client with redis-py's interface works,
+    e.g. a redis.Redis for Redis, Valkey or KeyDB, or a local stand-in such
+    as fakeredis for development. Requires the redis package when no client
+    is passed.
+
+    Usage:
+        queue = RedisJobQueue(url="redis://queue-host:6379/0", name="catalogue")
+    """
+
+    def __init__(self, client: Any = None, url: str = "redis://localhost:6379/0", name: str = "dibkb", **options: Any):
+        """
+        Args:
+            client: Redis client to use; one is created from `url` if omitted
+            url: Redis URL, used when no client is passed
+            name: Prefix of every key of this queue
+            **options: Lease and retry settings, see JobQueue
+        """
+        super().__init__(**options)
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("RedisJobQueue requires redis: pip install redis")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.name = name
+        self._keys = [f"{name}:{key}" for key in ("jobs", "ready", "delayed", "leased", "dead", "done")]
+        self._put = client.register_script(_REDIS_PUT)
+        self._lease = client.register_script(_REDIS_LEASE)
+        self._settle = client.register_script(_REDIS_SETTLE)
+
+    def put(self, asins: Iterable[str], priority: int = 0) -> int:
+        asins = list(dict.fromkeys(asins))
+        if not asins:
+            return 0
+        return int(self._put(keys=self._keys, args=[priority, *asins]))
+
+    def lease(self, count: int = 1, worker: Optional[str] = None, timeout: Optional[float] = None) -> List[Job]:
+        now = time.time()
+        expires = now + (self.visibility_timeout if timeout is None else timeout)
+        flat = self._lease(
+            keys=self._keys,
+            args=[now, count, expires, self.max_attempts, worker or default_worker_id(), uuid.uuid4().hex],
+        )
+        flat = [item.decode() if isinstance(item, bytes) else item for item in flat]
+        return [Job(flat[i], int(flat[i + 1]), flat[i + 2]) for i in range(0, len(flat), 3)]
+
+    def _settle_job(self, job: Job, action: str, at: float, error: Optional[str] = None) -> bool:
+        return bool(self._settle(keys=self._keys, args=[job.asin, job.token, action, at, error or ""]))
+
+    def ack(self, job: Job) -> bool:
+        return self._settle_job(job, "ack", time.time())
+
+    def nack(self, job: Job, error: Optional[str] = None) -> bool:
+        now = time.time()
+        if job.attempts >= self.max_attempts:
+            return self._settle_job(job, "dead", now, error)
+        return self._settle_job(job, "nack", now + self.retry_delay(job.attempts), error)
+
+    def extend(self, job: Job, timeout: Optional[float] = None) -> bool:
+        return self._settle_job(job, "extend", time.time() + (self.visibility_timeout if timeout is None else timeout))
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each state; "done" counts every ack, as done jobs are not kept."""
+        jobs, ready, delayed, leased, dead, done = self._keys
+        pipe = self.client.pipeline()
+        for key in (ready, delayed, leased, dead):
+            pipe.zcard(key)
+        pipe.get(done)
+        ready_count, delayed_count, leased_count, dead_count, done_count = pipe.execute()
+        return {
+            "pending": ready_count + delayed_count,
+            "leased": leased_count,
+            "done": int(done_count or 0),
+            "dead": dead_count,
+        }
+
+
+class QueueWorker:
+    """
+    Pulls batches of ASINs from a JobQueue, scrapes them and settles the jobs.
+
+    Each leased batch goes through the scraper's scrape_many. Successful
+    products are written to the sink and acknowledged once the sink has
+    flushed them at the end of the batch, so a worker that dies mid-batch
+    leaves its jobs to be reclaimed; failed ones are nacked and retried by
+    the queue after a backoff. Run one worker per process, on as many
+    processes and machines as needed: they share only the queue. Keep
+    `batch_size` small enough that a batch finishes well within the queue's
+    visibility timeout.
+
+    Usage:
+        queue = SqliteJobQueue("jobs.sqlite3")
+        async with AsyncAmazonScraper(concurrency=20) as scraper:
+            with JsonlSink("products.jsonl") as sink:
+                await QueueWorker(queue, scraper, sink, batch_size=20).run()
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        scraper: AsyncAmazonScraper,
+        sink: Optional[Any] = None,
+        batch_size: int = 10,
+        poll_interval: float = 5.0,
+        worker: Optional[str] = None,
+    ):
+        """
+        Args:
+            queue: Queue to pull jobs from
+            scraper: Scraper doing the fetch, extract and validate stages
+            sink: Where successful responses are written (JsonlSink or ProductStore)
+            batch_size: Jobs leased at a time
+            poll_interval: Seconds to wait before polling an empty queue again
+            worker: Name recorded on leases, defaults to host:pid
+        """
+        self.queue = queue
+        self.scraper = scraper
+        self.sink = sink
+        self.batch_size = max(1, batch_size)
+        self.poll_interval = poll_interval
+        self.worker = worker or default_worker_id()
+        self.processed = 0
+        self.failed = 0
+        self.lost = 0
+
+    async def run_batch(self) -> int:
+        """Lease, scrape and settle one batch. Returns the number of jobs leased."""
+        jobs = {job.asin: job for job in self.queue.lease(self.batch_size, self.worker)}
+        succeeded: List[Job] = []
+        async for response in self.scraper.scrape_many(list(jobs), concurrency=self.batch_size):
+            job = jobs[response.asin]
+            self.processed += 1
+            if response.error:
+                self.failed += 1
+                self._settled(job, self.queue.nack(job, response.error))
+            else:
+                if self.sink is not None:
+                    self.sink.write(response)
+                succeeded.append(job)
+        if succeeded:
+            # Only ack what the sink has durably written, so a crash before
+            # the flush leaves the jobs leased and another worker reclaims them
+            if self.sink is not None:
+                self.sink.flush()
+            for job in succeeded:
+                self._settled(job, self.queue.ack(job))
+        return len(jobs)
+
+    def _settled(self, job: Job, settled: bool) -> None:
+        if not settled:
+            # The lease expired mid-batch and the job went to another worker
+            self.lost += 1
+            logger.warning("Lease on %s expired before it was settled", job.asin)
+
+    async def run(self, stop_when_empty: bool = True) -> int:
+        """
+        Work through the queue and return the number of jobs processed.
+
+        Args:
+            stop_when_empty: Return once nothing is pending or leased; otherwise keep polling forever
+        """
+        while True:
+            if await self.run_batch():
+                continue
+            counts = self.queue.counts()
+            if stop_when_empty and not counts["pending"] and not counts["leased"]:
+                return self.processed
+            await asyncio.sleep(self.poll_interval)
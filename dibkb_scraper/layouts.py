@@ -0,0 +1,161 @@
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+
+from .dom_index import DomIndex
+
+MOBILE_BREADCRUMB_CLASS = "_seo-breadcrumb-mobile-card_style_breadcrumbInlineLinks__KBCjn"
+
+
+def _has_class_containing(index: DomIndex, fragment: str) -> bool:
+    # get_tags matches this class by substring, so an exact lookup isn't enough
+    return fragment in index.by_class or any(fragment in cls for cls in index.by_class)
+
+
+# Elements that decide which strategy an extractor can use, in fingerprint bit
+# order. Only append to this table: reordering it changes every fingerprint.
+# Each test is a necessary condition for the strategy of the same name to
+# match, so a page without the landmark can skip that strategy's scans.
+LANDMARKS: Dict[str, Callable[[DomIndex], bool]] = {
+    "productTitle": lambda index: "productTitle" in index.by_id,
+    "title": lambda index: "title" in index.by_id,
+    "breadcrumbs": lambda index: "a-unordered-list a-horizontal a-size-small" in index.by_class,
+    "mobile_breadcrumbs": lambda index: _has_class_containing(index, MOBILE_BREADCRUMB_CLASS),
+    "detail_bullets": lambda index: "detailBullets_feature_div" in index.by_id,
+    "list_items": lambda index: "a-unordered-list a-nostyle a-vertical a-spacing-none" in index.by_class,
+    "detail_table": lambda index: "productDetails_detailBullets_sections1" in index.by_id,
+    "rating_out_of": lambda index: "rating-out-of-text" in index.by_hook,
+    "average_stars": lambda index: "average-stars-rating-text" in index.by_hook,
+    "histogram_title": lambda index: "reviewCountTextLinkedHistogram" in index.by_class,
+    "review_text": lambda index: "review-text-content" in index.by_class,
+    "review_body": lambda index: "review-body" in index.by_hook,
+}
+
+# Alternative strategies of each extractor, in the order it tries them. Each
+# name is both a LANDMARKS entry and the path the extractor reports.
+STRATEGIES: Dict[str, Tuple[str, ...]] = {
+    "get_product_title": ("productTitle", "title"),
+    "get_tags": ("breadcrumbs", "mobile_breadcrumbs"),
+    "get_product_details": ("detail_bullets", "list_items", "detail_table"),
+    "get_all_reviews": ("review_text", "review_body"),
+}
+
+
+class PageLayout:
+    """
+    Which landmarks a parsed page has, and the fingerprint they make.
+
+    Pages built from the same template share a fingerprint, a short hex
+    bitmask of LANDMARKS. Built from a DomIndex with one dictionary lookup
+    per landmark, so it costs next to nothing once the index exists.
+    """
+
+    __slots__ = ("landmarks", "fingerprint")
+
+    def __init__(self, index: DomIndex):
+        bits = 0
+        landmarks = []
+        for bit, (name, test) in enumerate(LANDMARKS.items()):
+            if test(index):
+                bits |= 1 << bit
+                landmarks.append(name)
+        self.landmarks: FrozenSet[str] = frozenset(landmarks)
+        self.fingerprint = f"{bits:0{(len(LANDMARKS) + 3) // 4}x}"
+
+    def viable(self, strategy: str) -> bool:
+        """False if the page lacks the landmark the strategy needs, so it can't match."""
+        return strategy not in LANDMARKS or strategy in self.landmarks
+
+
+class LayoutStats:
+    """
+    Learns which strategy each extractor wins with on every page layout.
+
+    Scrapers sharing a LayoutStats report each page's fingerprint and the
+    strategy that produced each field. Once a layout has been seen
+    `min_samples` times, its most frequent strategy per extractor is its
+    expected one; a page that wins with another strategy counts as
+    strategy drift, and a fingerprint first seen after `warmup` pages
+    counts as a new layout. Both show up in `snapshot()` and, when the
+    scraper has a MetricsCollector, as `layout_drift` counters.
+
+    Strategy order itself never changes: a later strategy can't be tried
+    before an earlier one that could also match without changing the
+    output. What the layout buys is skipping every strategy whose
+    landmark the page lacks, instead of scanning for it.
+
+    Thread-safe; share one instance across scrapers like a MetricsCollector.
+
+    Usage:
+        layouts = LayoutStats()
+        for asin, html in pages:
+            AmazonScraper.from_html(asin, html, layouts=layouts).get_all_details()
+        print(layouts.snapshot())
+    """
+
+    def __init__(self, warmup: int = 100, min_samples: int = 20):
+        """
+        Args:
+            warmup: Pages after which an unseen fingerprint counts as a new layout
+            min_samples: Wins a layout needs before its leading strategy is expected
+        """
+        self.warmup = warmup
+        self.min_samples = min_samples
+        self.pages = 0
+        self._pages: Counter = Counter()
+        self._landmarks: Dict[str, FrozenSet[str]] = {}
+        self._wins: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+        self.new_layouts = 0
+        self.strategy_changes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def observe(self, layout: PageLayout) -> bool:
+        """Count a page of this layout; True if it is a layout first seen after warmup."""
+        with self._lock:
+            self.pages += 1
+            new = layout.fingerprint not in self._landmarks
+            if new:
+                self._landmarks[layout.fingerprint] = layout.landmarks
+            self._pages[layout.fingerprint] += 1
+            if new and self.pages > self.warmup:
+                self.new_layouts += 1
+                return True
+            return False
+
+    def _expected(self, fingerprint: str, extractor: str) -> Optional[str]:
+        # The strategy the extractor usually wins with on this layout, None while still learning
+        wins = self._wins.get((fingerprint, extractor))
+        if not wins or sum(wins.values()) < self.min_samples:
+            return None
+        return wins.most_common(1)[0][0]
+
+    def record(self, fingerprint: str, extractor: str, strategy: str) -> bool:
+        """Count the strategy an extractor won with; True if the layout usually wins another way."""
+        with self._lock:
+            expected = self._expected(fingerprint, extractor)
+            self._wins[fingerprint, extractor][strategy] += 1
+            if expected is not None and expected != strategy:
+                self.strategy_changes[extractor] += 1
+                return True
+            return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Pages, landmarks and strategy wins per layout, plus the drift counters."""
+        with self._lock:
+            layouts = {
+                fingerprint: {
+                    "pages": pages,
+                    "landmarks": sorted(self._landmarks[fingerprint]),
+                    "strategies": {
+                        extractor: dict(wins)
+                        for (layout, extractor), wins in self._wins.items()
+                        if layout == fingerprint
+                    },
+                }
+                for fingerprint, pages in self._pages.most_common()
+            }
+            return {
+                "pages": self.pages,
+                "layouts": layouts,
+                "drift": {"new_layouts": self.new_layouts, "strategy_changes": dict(self.strategy_changes)},
+            }
@@ -0,0 +1,193 @@
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, Any]) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _series(key: LabelKey, suffix: str = "") -> str:
+    name, labels = key
+    if not labels:
+        return name + suffix
+    values = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+    return f"{name}{suffix}{{{values}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsCollector:
+    """
+    Receives timings and counts from AmazonScraper and PlaywrightScraper.
+
+    Scrapers only report to a collector when one is passed in, so
+    instrumentation costs nothing by default. Subclasses override `observe`
+    and `increment`; this base class drops everything.
+
+    Reported metrics:
+        fetch (timing, count): page fetches by `source` and `outcome`
+        parse (timing): HTML parsing by `backend`
+        extractor (timing): each get_* call by `extractor`
+        extractor_path (count): which fallback branch an extractor took, by `extractor` and `path`
+        extractor_errors (count): exceptions swallowed by an extractor
+        embedded_fallbacks (count): embedded JSON read from the page tree instead of the raw HTML
+        blocked (count): CAPTCHA and bot-detection responses by `source` and `reason`
+        render (timing, count): browser renders by `outcome`
+        render_retries (count): browser render attempts retried
+        review_pages (count): review listing pages fetched by ReviewScraper, by `outcome`
+        layout (count): parsed pages by layout `fingerprint`, with a LayoutStats
+        layout_drift (count): layouts first seen after warmup and pages won by an unusual strategy, by `kind`
+    """
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        """Record a duration in seconds."""
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Add to a counter."""
+
+
+class _Summary:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class InMemoryCollector(MetricsCollector):
+    """
+    Keeps counters and timing summaries (count, total, max) in memory.
+
+    Usage:
+        metrics = InMemoryCollector()
+        AmazonScraper(asin, metrics=metrics).get_all_details()
+        print(metrics.snapshot())
+    """
+
+    def __init__(self):
+        self._counters: Dict[LabelKey, float] = {}
+        self._timings: Dict[LabelKey, _Summary] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            summary = self._timings.get(key)
+            if summary is None:
+                summary = self._timings[key] = _Summary()
+            summary.count += 1
+            summary.total += seconds
+            summary.max = max(summary.max, seconds)
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Counters and timings keyed by series, e.g. `extractor{extractor="get_ratings"}`."""
+        with self._lock:
+            return {
+                "counters": {_series(key): value for key, value in self._counters.items()},
+                "timings": {
+                    _series(key): {
+                        "count": s.count,
+                        "total": s.total,
+                        "mean": s.total / s.count if s.count else 0.0,
+                        "max": s.max,
+                    }
+                    for key, s in self._timings.items()
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+
+class PrometheusCollector(InMemoryCollector):
+    """
+    In-memory collector that renders the Prometheus text exposition format.
+
+    Counters become `<prefix><name>_total` and timings become summaries
+    `<prefix><name>_seconds` with `_sum` and `_count` series.
+
+    Usage:
+        metrics = PrometheusCollector()
+        ...
+        body = metrics.render()  # serve on /metrics
+    """
+
+    def __init__(self, prefix: str = "dibkb_"):
+        """
+        Args:
+            prefix: Prepended to every metric name
+        """
+        super().__init__()
+        self.prefix = prefix
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timings = sorted(self._timings.items(), key=lambda item: item[0])
+
+        declared = set()
+        for (name, labels), value in counters:
+            metric = f"{self.prefix}{name}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{_series((metric, labels))} {value:g}")
+
+        for (name, labels), s in timings:
+            metric = f"{self.prefix}{name}_seconds"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} summary")
+            lines.append(f"{_series((metric, labels), '_sum')} {s.total!r}")
+            lines.append(f"{_series((metric, labels), '_count')} {s.count}")
+        return "\n".join(lines) + "\n"
+
+
+class CallbackCollector(MetricsCollector):
+    """
+    Forwards every measurement to a callable, e.g. to feed StatsD or tracing spans.
+
+    The callback is called as `callback(kind, name, value, labels)` with
+    `kind` either "timing" or "count".
+    """
+
+    def __init__(self, callback: Callable[[str, str, float, Dict[str, Any]], None]):
+        self.callback = callback
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        self.callback("timing", name, seconds, labels)
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        self.callback("count", name, value, labels)
+
+
+def instrumented(method: Callable) -> Callable:
+    """Report a scraper method's duration to the scraper's collector, if it has one."""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.metrics is None:
+            return method(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.metrics.observe("extractor", time.perf_counter() - start, extractor=name)
+
+    return wrapper
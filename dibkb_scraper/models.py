@@ -1,5 +1,4 @@
-from typing import Any, List, Optional, Dict
-from dataclasses import dataclass
+from typing import List, Optional, Dict
 from pydantic import BaseModel
 
 class StarRating(BaseModel):
@@ -7,16 +6,16 @@ class StarRating(BaseModel):
     percentage: Optional[int] = None
 
 class RatingStats(BaseModel):
-    one_star: StarRating = None
-    two_star: StarRating = None
-    three_star: StarRating = None
-    four_star: StarRating = None
-    five_star: StarRating = None
+    one_star: Optional[StarRating] = None
+    two_star: Optional[StarRating] = None
+    three_star: Optional[StarRating] = None
+    four_star: Optional[StarRating] = None
+    five_star: Optional[StarRating] = None
 
 class Ratings(BaseModel):
     rating: Optional[float] = None
     review_count: Optional[int] = None
-    rating_stats : RatingStats = None
+    rating_stats: Optional[RatingStats] = None
 
 class RatingPercentage(BaseModel):
     one_star: Optional[int] = None
@@ -26,33 +25,43 @@ class RatingPercentage(BaseModel):
     five_star: Optional[int] = None
 
 class Description(BaseModel):
-    highlights: List[str] = None
+    highlights: Optional[List[str]] = None
 
 class Specifications(BaseModel):
-    technical: Dict[str, str] = None
-    additional: Dict[str, str] = None
-    details: Dict[str, str] = None
+    technical: Optional[Dict[str, str]] = None
+    additional: Optional[Dict[str, str]] = None
+    details: Optional[Dict[str, str]] = None
 
 class Competitor(BaseModel):
     asin: str
     title: str
     img_id: str
-    price: float
+    price: Optional[float] = None
     
 class Product(BaseModel):
     title: Optional[str] = None
     image: Optional[List[str]] = None
-    price: float = None
-    categories: List[str] = None
-    description: Description = None
-    specifications: Specifications = None
-    ratings: Dict[str,Any] = None
-    reviews: List[str] = None
-    related_products: List[Competitor] = None
+    price: Optional[float] = None
+    categories: Optional[List[str]] = None
+    description: Optional[Description] = None
+    specifications: Optional[Specifications] = None
+    ratings: Optional[Ratings] = None
+    reviews: Optional[List[str]] = None
+    related_products: Optional[List[Competitor]] = None
 
 
-class AmazonProductResponse(BaseModel):
-    product: Product
-    error: Optional[str] = None 
+class Review(BaseModel):
+    asin: Optional[str] = None
+    review_id: Optional[str] = None
+    author: Optional[str] = None
+    rating: Optional[float] = None
+    title: Optional[str] = None
+    date: Optional[str] = None
+    body: Optional[str] = None
+    verified: bool = False
 
 
+class AmazonProductResponse(BaseModel):
+    asin: Optional[str] = None
+    product: Product
+    error: Optional[str] = None
@@ -0,0 +1,310 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+
+# Page regions the extractors read; a lean parse only materializes these
+LEAN_REGION_IDS = {
+    "productTitle",
+    "title",
+    "feature-bullets",
+    "detailBullets_feature_div",
+    "productDetails_techSpec_section_1",
+    "productDetails_detailBullets_sections1",
+}
+LEAN_REGION_CLASSES = {
+    "twister-plus-buying-options-price-data",
+    "prodDetTable",
+    "_cr-ratings-histogram_style_histogram-column-space__RKUAd",
+    "reviewCountTextLinkedHistogram",
+    "review-text-content",
+    "a-carousel-card",
+    "a-expander-partial-collapse-content",
+}
+LEAN_REGION_CLASS_STRINGS = {
+    "a-unordered-list a-horizontal a-size-small",
+    "a-unordered-list a-nostyle a-vertical a-spacing-none",
+}
+LEAN_REGION_HOOKS = {
+    "rating-out-of-text",
+    "average-stars-rating-text",
+    "total-review-count",
+    "review-body",
+}
+
+
+def is_lean_region(name: str, attrs: Dict[str, Any]) -> bool:
+    """Whether a tag with this name and attributes starts a region the extractors read"""
+    if name == "script":
+        return not attrs.get("src")
+    if name == "img" and "data-a-dynamic-image" in attrs:
+        return True
+    if attrs.get("id") in LEAN_REGION_IDS or attrs.get("data-hook") in LEAN_REGION_HOOKS:
+        return True
+    classes = attrs.get("class")
+    if not classes:
+        return False
+    if isinstance(classes, str):
+        classes = classes.split()
+    return (
+        not LEAN_REGION_CLASSES.isdisjoint(classes)
+        or " ".join(classes) in LEAN_REGION_CLASS_STRINGS
+    )
+
+
+class _LeanStrainer(SoupStrainer):
+    """
+    Keeps only top-level tags for which is_lean_region() holds, with their
+    whole subtree; everything else is discarded while parsing.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+    # beautifulsoup4 >= 4.13
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        return is_lean_region(name, dict(attrs or {}))
+
+    def allow_string_creation(self, string) -> bool:
+        return False
+
+    # beautifulsoup4 < 4.13
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return is_lean_region(markup_name, dict(markup_attrs or {}))
+
+    def search(self, markup):
+        return None
+
+
+class ParserBackend:
+    """
+    Turns page HTML into a document the extractors can query.
+
+    A document only needs the small part of the BeautifulSoup API the
+    extractors use: `find`, `find_all`, `get`, `text`, `string`, `name` and
+    `prettify`.
+    """
+    name: str = ""
+    lean: bool = False
+
+    def parse(self, html: str) -> Any:
+        raise NotImplementedError
+
+
+class SoupBackend(ParserBackend):
+    """
+    BeautifulSoup with one of its tree builders (`html.parser` or `lxml`).
+
+    With `lean=True` only the regions the extractors read are materialized
+    (see is_lean_region); styles, navigation, footers and the rest of the
+    page never become tree nodes.
+    """
+
+    def __init__(self, features: str = "html.parser", lean: bool = False):
+        self.name = features
+        self.features = features
+        self.lean = lean
+
+    def parse(self, html: str) -> BeautifulSoup:
+        try:
+            if self.lean:
+                return BeautifulSoup(html, self.features, parse_only=_LeanStrainer())
+            return BeautifulSoup(html, self.features)
+        except FeatureNotFound:
+            raise ImportError(f"The {self.features} backend requires {self.features}: pip install {self.features}")
+
+
+class SelectolaxBackend(ParserBackend):
+    """
+    selectolax's C (lexbor) parser, wrapped so the extractors can query it like a soup.
+
+    The tree lives in native memory, so `lean` is accepted for symmetry but
+    does not filter anything.
+    """
+    name = "selectolax"
+
+    def __init__(self, lean: bool = False):
+        self.lean = lean
+
+    def parse(self, html: str) -> "SelectolaxNode":
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except ImportError:
+            raise ImportError("The selectolax backend requires selectolax: pip install selectolax")
+        tree = LexborHTMLParser(html)
+        return SelectolaxNode(tree.root, tree=tree)
+
+
+# Strings inside these tags are not part of an ancestor's `.text` in BeautifulSoup
+_STRING_CONTAINERS = {"script", "style", "template", "rt", "rp"}
+
+# Attributes BeautifulSoup splits into a list of values
+_MULTI_VALUED = {"class", "rel", "rev", "accept-charset", "headers", "accesskey", "dropzone"}
+
+
+class SelectolaxNode:
+    """
+    Read-only BeautifulSoup-style view of a selectolax node.
+
+    Only the subset of the Tag API used by the extractors is provided, with
+    the same matching and text semantics as BeautifulSoup.
+    """
+    __slots__ = ("_node", "_tree", "_attrs")
+
+    def __init__(self, node: Any, tree: Any = None):
+        self._node = node
+        self._tree = tree
+        self._attrs: Optional[Dict[str, Any]] = None
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __repr__(self) -> str:
+        return self._node.html or ""
+
+    @property
+    def name(self) -> str:
+        return self._node.tag
+
+    @property
+    def attrs(self) -> Dict[str, Any]:
+        if self._attrs is None:
+            attrs = {}
+            for key, value in self._node.attributes.items():
+                if value is None:
+                    value = ""
+                if key in _MULTI_VALUED:
+                    value = value.split()
+                attrs[key] = value
+            self._attrs = attrs
+        return self._attrs
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.attrs.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.attrs[key]
+
+    @property
+    def text(self) -> str:
+        if self._node.tag in _STRING_CONTAINERS:
+            return "".join(
+                child.text(deep=False)
+                for child in self._node.iter(include_text=True)
+                if child.is_text_node
+            )
+        return "".join(self._strings(self._node))
+
+    def get_text(self) -> str:
+        return self.text
+
+    @property
+    def string(self) -> Optional[str]:
+        children = list(self._node.iter(include_text=True))
+        if len(children) != 1:
+            return None
+        child = children[0]
+        if child.is_text_node:
+            return child.text(deep=False)
+        if child.is_element_node:
+            return SelectolaxNode(child).string
+        return None
+
+    def find_all(
+        self,
+        name: Union[str, bool, None] = None,
+        attrs: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> List["SelectolaxNode"]:
+        attrs = dict(attrs or {})
+        if "class_" in kwargs:
+            attrs["class"] = kwargs.pop("class_")
+        attrs.update(kwargs)
+        return [
+            SelectolaxNode(node)
+            for node in self._descendants()
+            if self._matches(node, name, attrs)
+        ]
+
+    def find(
+        self,
+        name: Union[str, bool, None] = None,
+        attrs: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> Optional["SelectolaxNode"]:
+        matches = self.find_all(name, attrs, **kwargs)
+        return matches[0] if matches else None
+
+    def prettify(self) -> str:
+        return self._tree.html if self._tree is not None else self._node.html
+
+    def _descendants(self) -> Iterator[Any]:
+        nodes = self._node.traverse(include_text=False)
+        if self._tree is None:
+            # A tag's descendants exclude the tag itself; a document's include its root
+            next(nodes, None)
+        for node in nodes:
+            if node.is_element_node:
+                yield node
+
+    @classmethod
+    def _strings(cls, node: Any) -> Iterator[str]:
+        for child in node.iter(include_text=True):
+            if child.is_text_node:
+                yield child.text(deep=False)
+            elif child.is_element_node and child.tag not in _STRING_CONTAINERS:
+                yield from cls._strings(child)
+
+    @staticmethod
+    def _value_matches(value: Any, expected: Any) -> bool:
+        if callable(expected):
+            if isinstance(value, list):
+                return any(expected(v) for v in value) or expected(" ".join(value))
+            return expected(value)
+        if isinstance(value, list):
+            return expected in value or " ".join(value) == expected
+        return value == expected
+
+    def _matches(self, node: Any, name: Union[str, bool, None], attrs: Dict[str, Any]) -> bool:
+        if isinstance(name, str) and node.tag != name:
+            return False
+        if not attrs:
+            return True
+        node_attrs = SelectolaxNode(node).attrs
+        for key, expected in attrs.items():
+            value = node_attrs.get(key)
+            if expected is True:
+                if value is None:
+                    return False
+            elif expected is None:
+                if value is not None:
+                    return False
+            elif value is None:
+                if not (callable(expected) and expected(None)):
+                    return False
+            elif not self._value_matches(value, expected):
+                return False
+        return True
+
+
+BACKENDS: Dict[str, Callable[..., ParserBackend]] = {
+    "html.parser": lambda lean=False: SoupBackend("html.parser", lean=lean),
+    "lxml": lambda lean=False: SoupBackend("lxml", lean=lean),
+    "selectolax": SelectolaxBackend,
+}
+
+
+def get_backend(backend: Union[str, ParserBackend, None] = None, lean: bool = False) -> ParserBackend:
+    """
+    Resolve a backend name (see BACKENDS) or instance; defaults to `html.parser`.
+
+    `lean` only applies when a name is given; instances keep their own setting.
+    """
+    if backend is None:
+        backend = "html.parser"
+    if isinstance(backend, ParserBackend):
+        return backend
+    try:
+        return BACKENDS[backend](lean=lean)
+    except KeyError:
+        raise ValueError(f"Unknown parser backend {backend!r}, expected one of {sorted(BACKENDS)}")
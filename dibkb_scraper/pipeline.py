@@ -0,0 +1,128 @@
+import io
+import os
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Optional, TextIO, Union
+
+from .async_amazon import AsyncAmazonScraper
+from .models import AmazonProductResponse
+from .serialization import dumps
+from .store import ProductStore
+
+
+def read_asins(source: Union[str, TextIO]) -> Iterator[str]:
+    """
+    Lazily read ASINs, one per line, from a path or an open text file.
+
+    Blank lines and lines starting with `#` are skipped.
+    """
+    handle = open(source, encoding="utf-8") if isinstance(source, str) else source
+    try:
+        for line in handle:
+            asin = line.strip()
+            if asin and not asin.startswith("#"):
+                yield asin
+    finally:
+        if isinstance(source, str):
+            handle.close()
+
+
+class JsonlSink:
+    """
+    Append-only JSON Lines (NDJSON) writer for scraped responses.
+
+    Each response is written as a single line as soon as it arrives, and the
+    file is flushed every `flush_every` records, so a crash loses at most
+    that many results and nothing is held in memory.
+
+    Usage:
+        with JsonlSink("products.jsonl") as sink:
+            await Pipeline(scraper, sink).run(asins)
+    """
+
+    def __init__(self, path: str, flush_every: int = 100, fsync: bool = False):
+        """
+        Args:
+            path: Output file, created if missing and always appended to
+            flush_every: Number of records between flushes
+            fsync: Also fsync the file on every flush
+        """
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self.fsync = fsync
+        self.written = 0
+        self._file: Optional[io.BufferedWriter] = open(path, "ab")
+
+    def __enter__(self) -> "JsonlSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, response: AmazonProductResponse) -> None:
+        self._file.write(dumps(response) + b"\n")
+        self.written += 1
+        if self.written % self.flush_every == 0:
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+
+class Pipeline:
+    """
+    Streaming bulk scrape: ASIN source -> fetch -> extract -> validate -> sink.
+
+    ASINs are pulled from the source only as results are consumed, at most
+    `window` products are in flight, and results go straight to the sink, so
+    memory stays flat however long the input is.
+
+    Usage:
+        async with AsyncAmazonScraper() as scraper:
+            with JsonlSink("products.jsonl") as sink:
+                count = await Pipeline(scraper, sink, window=50).run(read_asins("asins.txt"))
+    """
+
+    def __init__(
+        self,
+        scraper: AsyncAmazonScraper,
+        sink: Optional[Union[JsonlSink, ProductStore]] = None,
+        window: Optional[int] = None,
+    ):
+        """
+        Args:
+            scraper: Scraper doing the fetch, extract and validate stages
+            sink: Where responses are written (JsonlSink or ProductStore); None to only stream them
+            window: Maximum products in flight, defaults to the scraper's concurrency
+        """
+        self.scraper = scraper
+        self.sink = sink
+        self.window = window
+        self.processed = 0
+        self.failed = 0
+
+    async def stream(
+        self, asins: Union[Iterable[str], AsyncIterable[str]]
+    ) -> AsyncIterator[AmazonProductResponse]:
+        """Yield each response, after it has been written to the sink."""
+        async for response in self.scraper.scrape_many(asins, concurrency=self.window):
+            if self.sink is not None:
+                self.sink.write(response)
+            self.processed += 1
+            if response.error:
+                self.failed += 1
+            yield response
+
+    async def run(self, asins: Union[Iterable[str], AsyncIterable[str]]) -> int:
+        """Drain the pipeline into the sink and return the number of products processed."""
+        async for _ in self.stream(asins):
+            pass
+        if self.sink is not None:
+            self.sink.flush()
+        return self.processed
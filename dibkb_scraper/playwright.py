@@ -1,197 +1,483 @@
+import asyncio
+import logging
 import random
-from playwright_stealth import stealth_async
-from playwright.async_api import async_playwright
-from fake_useragent import UserAgent
-from typing import Dict
+import time
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+from .cache import ResponseCache
+from .metrics import MetricsCollector
+from .ratelimit import AdaptiveRateLimiter
+from .utils import HEADER_PROVIDER, detect_block
+
+logger = logging.getLogger(__name__)
+
+
+# Resource types never needed to read product data from the rendered DOM
+DEFAULT_BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+
+# Third-party ad, analytics and tracking hosts (subdomains included)
+DEFAULT_BLOCKED_DOMAINS = (
+    "amazon-adsystem.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googletagmanager.com",
+    "google-analytics.com",
+    "facebook.net",
+    "scorecardresearch.com",
+)
+
+# Regions every product page has; by default a page is ready once all of them
+# are present. Comma-separated alternatives cover the desktop and mobile layouts.
+DEFAULT_READY_SELECTORS = (
+    "div.twister-plus-buying-options-price-data",
+    "#productTitle, #title",
+)
+
+# Regions only some products have, loading after the scroll. They are waited
+# for alongside the ready selectors, but for at most `optional_timeout` once
+# those are in, so a product without reviews doesn't wait out ready_timeout.
+DEFAULT_OPTIONAL_SELECTORS = (
+    "._cr-ratings-histogram_style_histogram-column-space__RKUAd",
+    "div.review-text-content, [data-hook=review-body]",
+    "li.a-carousel-card",
+)
+
+READY_MODES = ("all", "any")
+
+
+class _PooledPage:
+    """A stealth-patched browser context and page, reused across URLs."""
+    __slots__ = ("context", "page", "viewport", "uses", "cookie_domains")
+
+    def __init__(self, context: Any, page: Any, viewport: Dict[str, int]):
+        self.context = context
+        self.page = page
+        self.viewport = viewport
+        self.uses = 0
+        self.cookie_domains = set()
+
 
 class PlaywrightScraper:
     """
     A singleton class for managing Playwright browser instances and web scraping.
+
+    Rendering goes through a bounded pool of warm, stealth-patched contexts.
+    Each context keeps one page that is navigated from URL to URL and is
+    recycled after `max_page_uses` renders, or straight away after a CAPTCHA,
+    bot-detection page or navigation error. `concurrency` caps how many
+    get_html_content calls render at once; extra calls wait for a free page.
+
+    Requests for blocked resource types (images, media, fonts by default) and
+    blocked third-party domains are aborted. Navigation returns at
+    DOMContentLoaded, and instead of a fixed delay a render finishes as soon
+    as all of the ready selectors (or any one, with ready_mode="any") are in
+    the DOM, waiting at most `ready_timeout` milliseconds. Optional selectors
+    get at most `optional_timeout` more milliseconds after that.
     """
     _instance = None
     _browser = None
     _playwright = None
-    
+    metrics: Optional[MetricsCollector] = None
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(PlaywrightScraper, cls).__new__(cls)
             cls._initialized = False
+            cls._init_lock = None
         return cls._instance
-    
-    async def initialize(self):
-        """Initialize the browser if not already initialized."""
-        if self._initialized:
-            return
-        
-        try:
-            self._playwright = await async_playwright().start()
-            self._browser = await self._playwright.chromium.launch(
-                headless=True,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-features=IsolateOrigins,site-per-process',
-                    '--disable-site-isolation-trials',
-                ]
-            )
+
+    @classmethod
+    def standalone(cls) -> "PlaywrightScraper":
+        """
+        A new instance with its own browser, separate from the shared one.
+
+        BrowserFarm uses these to run several browsers in one process.
+        """
+        instance = super(PlaywrightScraper, cls).__new__(cls)
+        instance._initialized = False
+        instance._init_lock = None
+        return instance
+
+    def is_connected(self) -> bool:
+        """Whether the browser is running and reachable."""
+        return bool(self._initialized and self._browser is not None and self._browser.is_connected())
+
+    async def initialize(
+        self,
+        concurrency: int = 4,
+        warm_contexts: Optional[int] = None,
+        max_page_uses: int = 50,
+        blocked_resource_types: Iterable[str] = DEFAULT_BLOCKED_RESOURCE_TYPES,
+        blocked_domains: Iterable[str] = DEFAULT_BLOCKED_DOMAINS,
+        ready_selectors: Iterable[str] = DEFAULT_READY_SELECTORS,
+        ready_timeout: int = 3000,
+        ready_mode: str = "all",
+        optional_selectors: Iterable[str] = DEFAULT_OPTIONAL_SELECTORS,
+        optional_timeout: int = 500,
+        limiter: Optional[AdaptiveRateLimiter] = None,
+        metrics: Optional[MetricsCollector] = None
+    ):
+        """
+        Initialize the browser and context pool if not already initialized.
+
+        Args:
+            concurrency: Maximum number of pages rendering at once, and the pool size
+            warm_contexts: Contexts to create up front, defaults to `concurrency`
+            max_page_uses: Renders after which a context is closed and replaced
+            blocked_resource_types: Playwright resource types to abort (e.g. "image", "script")
+            blocked_domains: Hosts whose requests are aborted, including their subdomains
+            ready_selectors: CSS selectors the page must contain before it is read
+            ready_timeout: Maximum milliseconds to wait for the ready selectors
+            ready_mode: "all" waits for every ready selector, "any" for the first one
+            optional_selectors: CSS selectors of regions only some pages have
+            optional_timeout: Maximum milliseconds to keep waiting for the optional
+                selectors once the ready selectors are in
+            limiter: Shared rate limiter navigations wait on and report back to
+            metrics: Collector for render latency and outcomes, CAPTCHAs and retries
+        """
+        if ready_mode not in READY_MODES:
+            raise ValueError(f"Unknown ready_mode {ready_mode!r}, expected one of {READY_MODES}")
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+        async with self._init_lock:
+            if self._initialized:
+                return
+
+            try:
+                # Imported here so that importing this module stays cheap
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(
+                    headless=True,
+                    args=[
+                        '--disable-blink-features=AutomationControlled',
+                        '--disable-features=IsolateOrigins,site-per-process',
+                        '--disable-site-isolation-trials',
+                    ]
+                )
+            except Exception as e:
+                logger.error("Failed to initialize browser: %s", e)
+                return
+
+            self.concurrency = max(1, concurrency)
+            self.max_page_uses = max_page_uses
+            self.blocked_resource_types = frozenset(blocked_resource_types)
+            self.blocked_domains = tuple(d.lower().lstrip(".") for d in blocked_domains)
+            self.ready_selectors = tuple(ready_selectors)
+            self.ready_mode = ready_mode
+            self.ready_timeout = ready_timeout
+            self.optional_selectors = tuple(optional_selectors)
+            self.optional_timeout = optional_timeout
+            self.limiter = limiter
+            self.metrics = metrics
+            self._slots = asyncio.Semaphore(self.concurrency)
+            self._idle: "asyncio.LifoQueue[_PooledPage]" = asyncio.LifoQueue()
+            self._open_pages = 0
             self._initialized = True
-            print("Browser initialized successfully")
-        except Exception as e:
-            print(f"Failed to initialize browser: {e}")
-    
+
+            warm = self.concurrency if warm_contexts is None else min(warm_contexts, self.concurrency)
+            for _ in range(warm):
+                try:
+                    self._idle.put_nowait(await self._new_page())
+                    self._open_pages += 1
+                except Exception as e:
+                    logger.warning("Error creating context: %s", e)
+                    break
+            logger.info("Browser initialized successfully")
+
     async def close(self):
-        """Close the browser and playwright instance."""
+        """Close the context pool, the browser and playwright instance."""
+        if self._initialized:
+            while not self._idle.empty():
+                await self._close_page(self._idle.get_nowait())
+
         if self._browser:
             await self._browser.close()
             self._browser = None
-        
+
         if self._playwright:
             await self._playwright.stop()
             self._playwright = None
-        
+
         self._initialized = False
-        print("Browser closed")
-    
-    async def get_html_content(self, url: str, max_retries: int = 3):
+        logger.info("Browser closed")
+
+    async def _new_page(self) -> _PooledPage:
+        """Create a stealth-patched context and page with a random viewport and user agent."""
+        viewport = {
+            'width': random.randint(1920, 2560),
+            'height': random.randint(1080, 1440),
+        }
+        user_agent = HEADER_PROVIDER.user_agent()
+        headers = {
+            'User-Agent': user_agent,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'DNT': '1',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+            'Sec-Fetch-Dest': 'document',
+            'Sec-Fetch-Mode': 'navigate',
+            'Sec-Fetch-Site': 'none',
+            'Sec-Fetch-User': '?1',
+            'Cache-Control': 'max-age=0',
+        }
+
+        context = await self._browser.new_context(
+            viewport=viewport,
+            user_agent=user_agent,
+            ignore_https_errors=True,
+            extra_http_headers=headers,
+            locale='en-US',
+            timezone_id='America/New_York',
+            geolocation={'latitude': 40.730610, 'longitude': -73.935242},  # New York coordinates
+            permissions=['geolocation']
+        )
+        try:
+            from playwright_stealth import stealth_async
+            if self.blocked_resource_types or self.blocked_domains:
+                await context.route("**/*", self._route)
+            page = await context.new_page()
+            await stealth_async(page)
+        except Exception:
+            await context.close()
+            raise
+        return _PooledPage(context, page, viewport)
+
+    def _is_blocked(self, request: Any) -> bool:
+        if request.resource_type in self.blocked_resource_types:
+            return True
+        host = (urlsplit(request.url).hostname or "").lower()
+        return any(host == d or host.endswith("." + d) for d in self.blocked_domains)
+
+    async def _route(self, route: Any):
+        if self._is_blocked(route.request):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _wait_until_ready(self, page: Any):
+        def wait(selector: str) -> asyncio.Future:
+            return asyncio.ensure_future(page.wait_for_selector(selector, state="attached", timeout=self.ready_timeout))
+
+        # Optional regions are waited for from the start, so whatever loads
+        # alongside the ready ones costs nothing extra
+        optional = [wait(selector) for selector in self.optional_selectors]
+        try:
+            if not self.ready_selectors:
+                await page.wait_for_timeout(self.ready_timeout)
+            else:
+                if self.ready_mode == "any":
+                    selectors = [", ".join(self.ready_selectors)]
+                else:
+                    selectors = self.ready_selectors
+                # The waits run side by side, so together they take at most ready_timeout;
+                # a timed out wait is not an error, the extractors fall back to None
+                await asyncio.gather(*(wait(selector) for selector in selectors), return_exceptions=True)
+            if optional:
+                await asyncio.wait(optional, timeout=self.optional_timeout / 1000)
+        finally:
+            for task in optional:
+                task.cancel()
+            await asyncio.gather(*optional, return_exceptions=True)
+
+    async def _acquire_page(self) -> _PooledPage:
+        # Callers hold a concurrency slot, so with the pool capped at
+        # `concurrency` pages there is always an idle page or room for a new one
+        try:
+            return self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        self._open_pages += 1
+        try:
+            return await self._new_page()
+        except Exception:
+            self._open_pages -= 1
+            raise
+
+    async def _release_page(self, pooled: _PooledPage, recycle: bool = False):
+        pooled.uses += 1
+        if recycle or pooled.uses >= self.max_page_uses or not self._initialized:
+            self._open_pages -= 1
+            await self._close_page(pooled)
+        else:
+            self._idle.put_nowait(pooled)
+
+    async def _close_page(self, pooled: _PooledPage):
+        try:
+            await pooled.context.close()
+        except Exception as e:
+            logger.warning("Error closing context: %s", e)
+
+    async def _add_cookies(self, pooled: _PooledPage, url: str):
+        # Add cookie handling for specific sites, once per context and domain
+        if "amazon" not in url:
+            return
+        domain = ".amazon.in" if "amazon.in" in url else ".amazon.com"
+        if domain in pooled.cookie_domains:
+            return
+        await pooled.context.add_cookies([
+            {
+                "name": "session-id",
+                "value": str(random.randint(10000000, 99999999)),
+                "domain": domain,
+                "path": "/"
+            },
+            {
+                "name": "i18n-prefs",
+                "value": "USD",
+                "domain": domain,
+                "path": "/"
+            }
+        ])
+        pooled.cookie_domains.add(domain)
+
+    async def get_html_content(
+        self,
+        url: str,
+        max_retries: int = 3,
+        cache: Optional[ResponseCache] = None,
+        cache_ttl: Optional[float] = None
+    ):
         """
         Navigate to a URL and return the HTML content of the page.
-        
+
         Args:
             url: The URL to navigate to
             max_retries: Maximum number of retries on connection failure
-            
+            cache: Response cache consulted before rendering; rendered pages are stored in it
+            cache_ttl: Maximum age in seconds of a cached page, defaults to the cache's TTL
+
         Returns:
             The HTML content of the page
         """
+        if cache is not None:
+            html_content = cache.get(url, ttl=cache_ttl)
+            if html_content is not None:
+                return html_content
+
         if not self._browser or not self._initialized:
             await self.initialize()
             if not self._initialized:
                 return None
-        
+
+        async with self._slots:
+            start = time.perf_counter()
+            html_content = await self._render(url, max_retries)
+            if self.metrics is not None:
+                outcome = "ok" if html_content is not None else "failed"
+                self.metrics.observe("render", time.perf_counter() - start, outcome=outcome)
+                self.metrics.increment("render", outcome=outcome)
+
+        if html_content is not None and cache is not None:
+            cache.set(url, html_content)
+        return html_content
+
+    async def _render(self, url: str, max_retries: int) -> Optional[str]:
         retries = 0
         while retries < max_retries:
             try:
-                # Define random viewport dimensions and common headers
-                viewport_width = random.randint(1920, 2560)
-                viewport_height = random.randint(1080, 1440)
-                ua = UserAgent()
-                user_agent = ua.random
-                headers = {
-                    'User-Agent': user_agent,
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
-                    'Accept-Language': 'en-US,en;q=0.9',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Sec-Fetch-Dest': 'document',
-                    'Sec-Fetch-Mode': 'navigate',
-                    'Sec-Fetch-Site': 'none',
-                    'Sec-Fetch-User': '?1',
-                    'Cache-Control': 'max-age=0',
-                }
-
-                # Create browser context
                 try:
-                    context = await self._browser.new_context(
-                        viewport={'width': viewport_width, 'height': viewport_height},
-                        user_agent=user_agent,
-                        ignore_https_errors=True,
-                        extra_http_headers=headers,
-                        locale='en-US',
-                        timezone_id='America/New_York',
-                        geolocation={'latitude': 40.730610, 'longitude': -73.935242},  # New York coordinates
-                        permissions=['geolocation']
-                    )
+                    pooled = await self._acquire_page()
                 except Exception as e:
-                    print(f"Error creating context: {e}")
+                    logger.warning("Error creating context: %s", e)
                     retries += 1
+                    self._record_retry("context")
                     continue
-                
-                # Add cookie handling for specific sites
-                if "amazon" in url:
-                    await context.add_cookies([
-                        {
-                            "name": "session-id",
-                            "value": str(random.randint(10000000, 99999999)),
-                            "domain": ".amazon.in" if "amazon.in" in url else ".amazon.com",
-                            "path": "/"
-                        },
-                        {
-                            "name": "i18n-prefs",
-                            "value": "USD",
-                            "domain": ".amazon.in" if "amazon.in" in url else ".amazon.com",
-                            "path": "/"
-                        }
-                    ])
-                
-                page = await context.new_page()
-                await stealth_async(page)
-                
-                # Add random mouse movements to appear more human-like
-                await page.mouse.move(random.randint(0, viewport_width), random.randint(0, viewport_height))
-                
-                # Navigate to the URL with timeout, catching connection errors
+                page = pooled.page
+
                 try:
-                    response = await page.goto(url, timeout=30000)
-                except Exception as e:
-                    print(f"Navigation error: {e}")
-                    await context.close()
-                    retries += 1
-                    continue
-                
-                # Check if we got blocked or redirected to CAPTCHA
-                current_url = page.url
-                if "captcha" in current_url.lower() or "robot" in current_url.lower():
-                    print(f"Hit CAPTCHA or bot detection at {current_url}")
-                    await context.close()
-                    if retries < max_retries - 1:
+                    await self._add_cookies(pooled, url)
+
+                    # Add random mouse movements to appear more human-like
+                    await page.mouse.move(
+                        random.randint(0, pooled.viewport['width']),
+                        random.randint(0, pooled.viewport['height'])
+                    )
+
+                    # Navigate to the URL with timeout, catching connection errors
+                    try:
+                        if self.limiter:
+                            await self.limiter.acquire_async(url)
+                        response = await page.goto(url, timeout=30000, wait_until="domcontentloaded")
+                    except Exception as e:
+                        logger.warning("Navigation error: %s", e)
+                        await self._release_page(pooled, recycle=True)
                         retries += 1
+                        self._record_retry("navigation")
                         continue
-                    return None
-                
-                # Scroll down a bit to trigger any lazy loading
-                await page.evaluate("""
-                    window.scrollTo({
-                        top: 1000,
-                        behavior: 'smooth'
-                    });
-                """)
-                
-                # Wait a bit more for any dynamic content
-                await page.wait_for_timeout(3000)
-                
-                # Get the HTML content
-                html_content = await page.content()
-                
-                # Close the context when done
-                await context.close()
-                
+
+                    # Check if we got blocked or redirected to CAPTCHA
+                    current_url = page.url
+                    blocked = detect_block(response.status if response else None, current_url)
+                    if blocked:
+                        logger.warning("Hit CAPTCHA or bot detection at %s (%s)", current_url, blocked)
+                        self._record_block(blocked)
+                        if self.limiter:
+                            self.limiter.record(url, blocked=True)
+                        await self._release_page(pooled, recycle=True)
+                        if retries < max_retries - 1:
+                            retries += 1
+                            self._record_retry("blocked")
+                            continue
+                        return None
+
+                    # Scroll down a bit to trigger any lazy loading
+                    await page.evaluate("""
+                        window.scrollTo({
+                            top: 1000,
+                            behavior: 'smooth'
+                        });
+                    """)
+
+                    # Wait until the data the extractors need is present
+                    await self._wait_until_ready(page)
+
+                    # Get the HTML content
+                    html_content = await page.content()
+                except Exception:
+                    await self._release_page(pooled, recycle=True)
+                    raise
+
                 # Check if response looks like a bot detection page
-                if len(html_content) < 5000 and ("robot" in html_content.lower() or 
-                                                "captcha" in html_content.lower() or
-                                                "blocked" in html_content.lower() or
-                                                "verify" in html_content.lower()):
-                    print("Got bot detection page response")
+                blocked = detect_block(body=html_content)
+                if self.limiter:
+                    self.limiter.record(url, blocked=blocked is not None)
+                if blocked:
+                    logger.warning("Got bot detection page response (%s)", blocked)
+                    self._record_block(blocked)
+                    await self._release_page(pooled, recycle=True)
                     if retries < max_retries - 1:
                         retries += 1
+                        self._record_retry("blocked")
                         continue
                     return None
-                
+
+                await self._release_page(pooled)
                 return html_content
-                
+
             except Exception as e:
-                print(f"Error getting HTML content: {e}")
+                logger.warning("Error getting HTML content: %s", e)
                 retries += 1
                 if retries >= max_retries:
                     return None
-                print(f"Retrying... (attempt {retries}/{max_retries})")
-        
+                self._record_retry("error")
+                logger.info("Retrying... (attempt %d/%d)", retries, max_retries)
+
         return None
 
+    def _record_block(self, reason: str):
+        if self.metrics is not None:
+            self.metrics.increment("blocked", source="browser", reason=reason)
+
+    def _record_retry(self, reason: str):
+        if self.metrics is not None:
+            self.metrics.increment("render_retries", reason=reason)
+
 # Example usage:
 # async def main():
 #     scraper = PlaywrightScraper()
-#     await scraper.initialize()
-#     html = await scraper.get_html_content("https://example.com")
-#     print(html)
-#     await scraper.close()
\ No newline at end of file
+#     await scraper.initialize(concurrency=8)
+#     htmls = await asyncio.gather(*(scraper.get_html_content(url) for url in urls))
+#     await scraper.close()
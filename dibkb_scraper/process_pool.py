@@ -0,0 +1,107 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .amazon import AmazonScraper
+from .parsers import ParserBackend
+
+
+def extract_html(
+    asin: str, html: str, parser: Union[str, ParserBackend, None] = None, lean: bool = False
+) -> Tuple[Dict[str, Any], float]:
+    """
+    Parse a page and run every extractor on it.
+
+    Runs in worker processes, so it takes and returns only plain, picklable values.
+
+    Returns:
+        The get_all_details dictionary and the seconds spent parsing and extracting
+    """
+    start = time.perf_counter()
+    details = AmazonScraper.from_html(asin, html, parser, lean=lean, keep_tree=False).get_all_details()
+    return details, time.perf_counter() - start
+
+
+class ProcessPoolExtractor:
+    """
+    Runs parsing and extraction in a pool of worker processes.
+
+    BeautifulSoup parsing and the get_* extractors are CPU bound and hold the
+    GIL. Running them here keeps the event loop free for I/O and lets
+    extraction scale across every core. At most `max_pending` pages are in
+    the pool at once. Callers beyond that wait, which pushes back on the
+    fetch stage instead of queueing HTML in memory.
+
+    Usage:
+        with ProcessPoolExtractor(workers=8) as extractor:
+            async with AsyncAmazonScraper(concurrency=64, extractor=extractor) as scraper:
+                async for response in scraper.scrape_many(asins):
+                    ...
+                print(scraper.stage_metrics())
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None, mp_context: Any = None):
+        """
+        Args:
+            workers: Number of worker processes, defaults to the number of CPUs
+            max_pending: Pages allowed in the pool at once, defaults to twice the workers
+            mp_context: multiprocessing context for the pool (e.g. "spawn" or "forkserver" context)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 2
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=mp_context)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.in_pool = 0
+        self.max_depth = 0
+        self.completed = 0
+        self.parse_seconds = 0.0
+
+    def __enter__(self) -> "ProcessPoolExtractor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    async def extract(
+        self, asin: str, html: str, parser: Union[str, ParserBackend, None] = None, lean: bool = False
+    ) -> Dict[str, Any]:
+        """Extract all details for a page in a worker process."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        self.waiting += 1
+        self.max_depth = max(self.max_depth, self.waiting + self.in_pool)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_pool += 1
+        try:
+            loop = asyncio.get_running_loop()
+            details, elapsed = await loop.run_in_executor(self._executor, extract_html, asin, html, parser, lean)
+        finally:
+            self.in_pool -= 1
+            self._slots.release()
+
+        self.completed += 1
+        self.parse_seconds += elapsed
+        return details
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depths and throughput of the parsing stage."""
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "parse_waiting": self.waiting,
+            "parse_in_pool": self.in_pool,
+            "parse_max_depth": self.max_depth,
+            "parsed": self.completed,
+            "mean_parse_seconds": self.parse_seconds / self.completed if self.completed else 0.0,
+        }
@@ -0,0 +1,125 @@
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlsplit
+
+
+class _Bucket:
+    __slots__ = ("rate", "tokens", "updated", "last_decrease")
+
+    def __init__(self, rate: float, tokens: float, now: float):
+        self.rate = rate
+        self.tokens = tokens
+        self.updated = now
+        self.last_decrease = 0.0
+
+
+class AdaptiveRateLimiter:
+    """
+    Per-host token bucket whose rate adapts AIMD-style.
+
+    Every clean response raises the host's rate by `increase` requests per
+    second, up to `max_rate`. A blocked response (503/429, CAPTCHA redirect,
+    bot-detection page) multiplies it by `decrease`, down to `min_rate`, and
+    empties the bucket, so the next caller waits a full interval at the new
+    rate; callers already sleeping on a reservation keep it. When many
+    concurrent requests get blocked together the rate is only cut once per
+    refill interval, so a single burst of errors doesn't collapse it.
+
+    One limiter is meant to be shared by every fetch path in the process;
+    it is safe to use from threads (`acquire`) and from asyncio (`acquire_async`).
+
+    Usage:
+        limiter = AdaptiveRateLimiter(initial_rate=2, max_rate=10)
+        scraper = AmazonScraper(asin, limiter=limiter)
+        async_scraper = AsyncAmazonScraper(limiter=limiter)
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = 2.0,
+        min_rate: float = 0.2,
+        max_rate: float = 20.0,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+        burst: float = 1.0,
+    ):
+        """
+        Args:
+            initial_rate: Starting requests per second for each host
+            min_rate: Lowest rate a host is cut back to
+            max_rate: Highest rate a host is raised to
+            increase: Requests per second added after each clean response
+            decrease: Factor the rate is multiplied by after a blocked response
+            burst: Maximum number of requests that may start back to back
+        """
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = burst
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return (urlsplit(url).hostname or url).lower()
+
+    def _bucket(self, host: str, now: float) -> _Bucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _Bucket(self.initial_rate, self.burst, now)
+        return bucket
+
+    def _reserve(self, url: str) -> float:
+        """Take a token for the URL's host and return how long to wait before using it."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(self._host(url), now)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+            bucket.tokens -= 1
+            if bucket.tokens >= 0:
+                return 0.0
+            return -bucket.tokens / bucket.rate
+
+    def acquire(self, url: str) -> None:
+        """Block until a request to the URL's host may start."""
+        wait = self._reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, url: str) -> None:
+        """Wait, without blocking the event loop, until a request to the URL's host may start."""
+        # Imported here: a running event loop has already loaded it, and sync
+        # callers don't pay for importing asyncio with the package
+        import asyncio
+        wait = self._reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record(self, url: str, blocked: bool) -> None:
+        """Adapt the host's rate to the outcome of a request."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(self._host(url), now)
+            if not blocked:
+                bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+                return
+            if now - bucket.last_decrease < 1.0 / bucket.rate:
+                return
+            bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+            bucket.tokens = min(bucket.tokens, 0.0)
+            bucket.last_decrease = now
+
+    def rate(self, url: str) -> float:
+        """Current requests per second for the URL's host."""
+        with self._lock:
+            bucket = self._buckets.get(self._host(url))
+            return bucket.rate if bucket else self.initial_rate
+
+    def rates(self) -> Dict[str, float]:
+        """Current requests per second of every host seen so far."""
+        with self._lock:
+            return {host: bucket.rate for host, bucket in self._buckets.items()}
@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import math
+import re
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, List, NamedTuple, Optional, Set, Union
+
+from .async_amazon import AsyncAmazonScraper
+from .models import Review
+from .parsers import ParserBackend, get_backend
+from .utils import asin_reader
+
+logger = logging.getLogger(__name__)
+
+# Reviews Amazon lists on one page of /product-reviews/
+REVIEWS_PER_PAGE = 10
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)?")
+_WITH_REVIEWS = re.compile(r"([\d,]+)\s+with reviews")
+
+
+def reviews_url(asin: str, page: int = 1) -> str:
+    return f"https://www.amazon.in/product-reviews/{asin}/?pageNumber={page}"
+
+
+class ReviewPage(NamedTuple):
+    number: int
+    reviews: List[Review]
+    # Reviews with text across all pages, when the page states it
+    total: Optional[int]
+    # Whether the pagination links offer a next page, None without pagination
+    has_next: Optional[bool]
+
+
+def _text(node: Any) -> Optional[str]:
+    return node.text.strip() if node else None
+
+
+def _rating(text: Optional[str]) -> Optional[float]:
+    match = _NUMBER.search(text or "")
+    return float(match.group().replace(",", ".")) if match else None
+
+
+def _title(node: Any) -> Optional[str]:
+    """
+    Title text of a review, without the star rating that newer layouts put
+    inside the same link.
+    """
+    if not node:
+        return None
+    spans = [span.text.strip() for span in node.find_all("span") if span.text.strip()]
+    return spans[-1] if spans else node.text.strip()
+
+
+def parse_review(node: Any, asin: Optional[str] = None) -> Review:
+    """Read one `data-hook="review"` element into a Review."""
+    stars = node.find("i", attrs={"data-hook": "review-star-rating"}) or node.find(
+        "i", attrs={"data-hook": "cmps-review-star-rating"}
+    )
+    title = node.find("a", attrs={"data-hook": "review-title"}) or node.find(
+        "span", attrs={"data-hook": "review-title"}
+    )
+    return Review(
+        asin=asin,
+        review_id=node.get("id"),
+        author=_text(node.find("span", class_="a-profile-name")),
+        rating=_rating(_text(stars)),
+        title=_title(title),
+        date=_text(node.find("span", attrs={"data-hook": "review-date"})),
+        body=_text(node.find("span", attrs={"data-hook": "review-body"})),
+        verified=node.find("span", attrs={"data-hook": "avp-badge"}) is not None,
+    )
+
+
+def parse_review_page(
+    html: str, asin: Optional[str] = None, page: int = 1, parser: Union[str, ParserBackend, None] = None
+) -> ReviewPage:
+    """
+    Parse a review listing page (or a product page's review section).
+
+    Args:
+        html: Page HTML
+        asin: ASIN stored on each Review
+        page: Page number, stored on the result
+        parser: Parser backend name or instance, as for AmazonScraper
+    """
+    soup = get_backend(parser).parse(html)
+    reviews = [parse_review(node, asin) for node in soup.find_all("div", attrs={"data-hook": "review"})]
+
+    total = None
+    count = soup.find("div", attrs={"data-hook": "cr-filter-info-review-rating-count"})
+    match = _WITH_REVIEWS.search(_text(count) or "")
+    if match:
+        total = int(match.group(1).replace(",", ""))
+
+    last = soup.find("li", class_="a-last")
+    has_next = None if not last else last.find("a") is not None
+    return ReviewPage(page, reviews, total, has_next)
+
+
+class ReviewScraper:
+    """
+    Streams the reviews of products from their paginated review listings.
+
+    The first page of each product says how many reviews there are, and the
+    remaining pages, up to `max_pages`, are then fetched concurrently. When
+    the count is missing, pages are fetched until one has no reviews or no
+    "Next page" link. Pages go through the AsyncAmazonScraper's fetcher, so
+    they share its connection pool, rate limiter, cache and browser
+    fallback. Reviews are yielded as each page arrives, not in page order,
+    and reviews repeated across pages are yielded once.
+
+    Usage:
+        async with AsyncAmazonScraper(concurrency=20) as scraper:
+            async for review in ReviewScraper(scraper, max_pages=20).reviews(asin):
+                print(review.rating, review.title)
+    """
+
+    def __init__(
+        self,
+        scraper: AsyncAmazonScraper,
+        max_pages: int = 10,
+        concurrency: int = 5,
+        parser: Union[str, ParserBackend, None] = None,
+    ):
+        """
+        Args:
+            scraper: Scraper whose fetcher downloads the pages
+            max_pages: Most review pages fetched per ASIN
+            concurrency: Most pages of one ASIN in flight at once
+            parser: Parser backend, defaults to the scraper's
+        """
+        self.scraper = scraper
+        self.max_pages = max(1, max_pages)
+        self.concurrency = max(1, concurrency)
+        self.parser = parser if parser is not None else scraper.parser
+        self.pages_fetched = 0
+        self.pages_failed = 0
+
+    async def fetch_page(self, asin: str, page: int = 1) -> Optional[ReviewPage]:
+        """Fetch and parse one review page, or return None if it could not be fetched."""
+        result = await self.scraper.fetcher.fetch(reviews_url(asin, page))
+        metrics = self.scraper.metrics
+        if result.html is None:
+            self.pages_failed += 1
+            logger.warning("Error fetching review page %d of %s: %s", page, asin, result.error)
+            if metrics is not None:
+                metrics.increment("review_pages", outcome="failed")
+            return None
+        self.pages_fetched += 1
+        parsed = parse_review_page(result.html, asin, page, self.parser)
+        if metrics is not None:
+            metrics.increment("review_pages", outcome="ok" if parsed.reviews else "empty")
+        return parsed
+
+    async def reviews(self, asin: str) -> AsyncIterator[Review]:
+        """Yield the reviews of one product as their pages arrive."""
+        first = await self.fetch_page(asin, 1)
+        if first is None:
+            return
+        seen: Set[Any] = set()
+        for review in self._new(first, seen):
+            yield review
+
+        last = self.max_pages
+        if first.total is not None:
+            last = min(last, math.ceil(first.total / REVIEWS_PER_PAGE))
+        elif not first.reviews or first.has_next is False:
+            last = 1
+
+        next_page = 2
+        pending: Set[asyncio.Task] = set()
+        try:
+            while True:
+                while next_page <= last and len(pending) < self.concurrency:
+                    pending.add(asyncio.ensure_future(self.fetch_page(asin, next_page)))
+                    next_page += 1
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page = task.result()
+                    if page is None:
+                        continue
+                    if not page.reviews or page.has_next is False:
+                        # Past the end: don't start later pages
+                        last = min(last, page.number)
+                    for review in self._new(page, seen):
+                        yield review
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def reviews_many(
+        self, asins: Union[Iterable[str], AsyncIterable[str]], concurrency: int = 4
+    ) -> AsyncIterator[Review]:
+        """
+        Yield the reviews of many products, with up to `concurrency` products
+        in progress at once (each with its own page window).
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * REVIEWS_PER_PAGE * concurrency)
+        next_asin = asin_reader(asins)
+        # Async generators can't be advanced by two workers at once
+        reading = asyncio.Lock()
+        done = object()
+
+        async def worker() -> None:
+            try:
+                while True:
+                    async with reading:
+                        asin = await next_asin()
+                    if asin is None:
+                        break
+                    async for review in self.reviews(asin):
+                        await queue.put(review)
+            except Exception as e:
+                await queue.put(e)
+                return
+            await queue.put(done)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(max(1, concurrency))]
+        try:
+            running = len(workers)
+            while running:
+                item = await queue.get()
+                if item is done:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            for task in workers:
+                task.cancel()
+
+    @staticmethod
+    def _new(page: ReviewPage, seen: Set[Any]) -> Iterable[Review]:
+        for review in page.reviews:
+            key = review.review_id or (review.author, review.date, review.body)
+            if key not in seen:
+                seen.add(key)
+                yield review
@@ -0,0 +1,132 @@
+import gc
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from pydantic import ValidationError
+
+from .amazon import failed_page_details
+from .models import AmazonProductResponse
+
+try:
+    from pydantic import TypeAdapter
+except ImportError:  # pydantic v1
+    TypeAdapter = None
+
+_list_adapter: Optional[Any] = None
+
+
+def _responses_adapter() -> Any:
+    """Validator and serializer for List[AmazonProductResponse], built once per process."""
+    global _list_adapter
+    if _list_adapter is None:
+        _list_adapter = TypeAdapter(List[AmazonProductResponse])
+    return _list_adapter
+
+
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+_gc_was_enabled = False
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Pause the cyclic garbage collector while a batch of models is built.
+
+    Every model allocates several objects, so a large batch triggers
+    collections that repeatedly traverse all the models built so far,
+    which costs more than the validation itself. The models hold no
+    reference cycles, so skipping those collections loses nothing; the
+    collector simply resumes on its usual schedule afterwards.
+
+    The collector switch is process-wide, so overlapping pauses from
+    several threads or tasks are counted: the first one disables the
+    collector and the last one to finish restores its earlier state.
+    """
+    global _gc_pauses, _gc_was_enabled
+    with _gc_lock:
+        if _gc_pauses == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_was_enabled:
+                gc.enable()
+
+
+def _failed(data: Dict[str, Any], error: ValidationError) -> AmazonProductResponse:
+    return AmazonProductResponse(
+        asin=data.get("asin"), **failed_page_details(f"Invalid product data: {str(error)}")
+    )
+
+
+def validate_many(items: Iterable[Dict[str, Any]]) -> List[AmazonProductResponse]:
+    """
+    Validate many response dictionaries (get_all_details output plus `asin`) in one call.
+
+    The whole list goes through one cached validator with the garbage
+    collector paused, which is much cheaper than building the models one
+    by one. If some items are invalid, only those are replaced by failed
+    responses carrying the validation error, as AsyncAmazonScraper.scrape
+    does for a single product.
+
+    Usage:
+        responses = validate_many({"asin": asin, **details} for asin, details in results)
+    """
+    items = list(items)
+    with _gc_paused():
+        if TypeAdapter is None:
+            return [_validate_one(item) for item in items]
+        try:
+            return _responses_adapter().validate_python(items)
+        except ValidationError as e:
+            bad = {error["loc"][0] for error in e.errors() if error["loc"]}
+        good = iter(_responses_adapter().validate_python([item for i, item in enumerate(items) if i not in bad]))
+        return [_validate_one(item) if i in bad else next(good) for i, item in enumerate(items)]
+
+
+def _validate_one(item: Dict[str, Any]) -> AmazonProductResponse:
+    try:
+        return AmazonProductResponse(**item)
+    except ValidationError as e:
+        return _failed(item, e)
+
+
+def dumps(response: AmazonProductResponse) -> bytes:
+    """Serialize one response to compact JSON bytes."""
+    if TypeAdapter is None:
+        return response.json().encode()
+    return response.__pydantic_serializer__.to_json(response)
+
+
+def loads(data: bytes) -> AmazonProductResponse:
+    """Validate one response straight from JSON bytes or str."""
+    if TypeAdapter is None:
+        return AmazonProductResponse.parse_raw(data)
+    return AmazonProductResponse.model_validate_json(data)
+
+
+def dumps_many(responses: List[AmazonProductResponse]) -> bytes:
+    """
+    Serialize responses to a JSON array in one call.
+
+    loads_many(dumps_many(responses)) == responses, and dumps_many of that
+    result is byte-for-byte the same.
+    """
+    if TypeAdapter is None:
+        return b"[" + b",".join(dumps(response) for response in responses) + b"]"
+    return _responses_adapter().dump_json(responses)
+
+
+def loads_many(data: bytes) -> List[AmazonProductResponse]:
+    """Validate a JSON array of responses straight from bytes, without building dicts first."""
+    with _gc_paused():
+        if TypeAdapter is None:
+            import json
+            return [AmazonProductResponse.parse_obj(item) for item in json.loads(data)]
+        return _responses_adapter().validate_json(data)
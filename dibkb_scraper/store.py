@@ -0,0 +1,281 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .amazon import DETAIL_FIELDS
+from .models import AmazonProductResponse
+
+# Most ASINs per IN (...) lookup, well under SQLite's bound parameter limit
+_LOOKUP_CHUNK = 500
+
+_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _encode(value: Any) -> bytes:
+    """
+    Canonical JSON of a section, so equal values always hash the same.
+
+    Always json, never orjson, so hashes don't change with the installed extras.
+    """
+    return _ENCODER.encode(value).encode("utf-8")
+
+
+def _decode(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob))
+
+
+def _dump(response: AmazonProductResponse) -> Dict[str, Any]:
+    """
+    The product fields a response actually carries.
+
+    Fields that were never extracted (see the `fields` of get_all_details)
+    are unset on the model and left out, so they don't overwrite stored
+    values with None.
+    """
+    product = response.product
+    if hasattr(product, "model_dump"):
+        carried = product.model_fields_set
+        values = product.model_dump()
+    else:
+        carried = product.__fields_set__
+        values = product.dict()
+    return {field: value for field, value in values.items() if field in carried}
+
+
+class ProductStore:
+    """
+    Latest product data and per-section change history in one SQLite file.
+
+    Every product field (see DETAIL_FIELDS) is stored as its own section
+    with a hash of its canonical JSON. An upsert only writes the sections
+    whose hash changed, and appends each changed value with its timestamp
+    to a history table, so an unchanged product costs one lookup and a
+    price change stores just the new price. Values are zlib-compressed.
+    Failed responses never overwrite good data; they only record the error.
+
+    A store can be used as a Pipeline sink: `write` buffers responses and
+    `flush` upserts them in one transaction.
+
+    Usage:
+        with ProductStore("products.sqlite3") as store:
+            store.upsert_many(responses)
+            for asin, changes in store.changed_since(last_sync):
+                push(asin, changes)
+    """
+
+    def __init__(self, path: str = "products.sqlite3", batch_size: int = 500, compression_level: int = 6):
+        """
+        Args:
+            path: SQLite database file, created if missing
+            batch_size: Responses buffered by `write` before they are upserted
+            compression_level: zlib compression level (1-9) of stored values
+        """
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.compression_level = compression_level
+        self._buffer: List[AmazonProductResponse] = []
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS products ("
+            "asin TEXT PRIMARY KEY, error TEXT, checked_at REAL NOT NULL, changed_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sections ("
+            "asin TEXT NOT NULL, section TEXT NOT NULL, hash BLOB NOT NULL, value BLOB NOT NULL, "
+            "changed_at REAL NOT NULL, PRIMARY KEY (asin, section)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sections_changed_at ON sections (changed_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            "asin TEXT NOT NULL, section TEXT NOT NULL, value BLOB NOT NULL, changed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS history_asin ON history (asin, section, changed_at)")
+
+    def __enter__(self) -> "ProductStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _stored_hashes(self, asins: List[str]) -> Dict[Tuple[str, str], bytes]:
+        hashes: Dict[Tuple[str, str], bytes] = {}
+        for i in range(0, len(asins), _LOOKUP_CHUNK):
+            chunk = asins[i:i + _LOOKUP_CHUNK]
+            rows = self._conn.execute(
+                f"SELECT asin, section, hash FROM sections WHERE asin IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for asin, section, digest in rows:
+                hashes[asin, section] = digest
+        return hashes
+
+    def upsert(
+        self, response: AmazonProductResponse, sections: Optional[Iterable[str]] = None, timestamp: Optional[float] = None
+    ) -> List[str]:
+        """Store one response and return the names of the sections that changed."""
+        return self.upsert_many([response], sections, timestamp).get(response.asin, [])
+
+    def upsert_many(
+        self,
+        responses: Iterable[AmazonProductResponse],
+        sections: Optional[Iterable[str]] = None,
+        timestamp: Optional[float] = None,
+    ) -> Dict[str, List[str]]:
+        """
+        Store many responses in one transaction.
+
+        Args:
+            responses: Responses with an `asin`; for a repeated ASIN the last one wins
+            sections: Product fields to compare and store, defaults to all of
+                DETAIL_FIELDS. Fields a response doesn't carry are always skipped,
+                so responses from get_all_details(fields=...) only touch those fields
+            timestamp: Time recorded for the changes, defaults to now
+
+        Returns:
+            The changed section names of every product that changed
+        """
+        sections = DETAIL_FIELDS if sections is None else tuple(sections)
+        unknown = set(sections) - set(DETAIL_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown sections {sorted(unknown)}, expected some of {list(DETAIL_FIELDS)}")
+        now = time.time() if timestamp is None else timestamp
+        latest = {response.asin: response for response in responses if response.asin}
+
+        with self._lock:
+            stored = self._stored_hashes(list(latest))
+            products, section_rows, history_rows = [], [], []
+            changes: Dict[str, List[str]] = {}
+            for asin, response in latest.items():
+                changed: List[str] = []
+                if not response.error:
+                    product = _dump(response)
+                    for section in sections:
+                        if section not in product:
+                            continue
+                        encoded = _encode(product[section])
+                        digest = hashlib.blake2b(encoded, digest_size=16).digest()
+                        if stored.get((asin, section)) == digest:
+                            continue
+                        value = zlib.compress(encoded, self.compression_level)
+                        section_rows.append((asin, section, digest, value, now))
+                        history_rows.append((asin, section, value, now))
+                        changed.append(section)
+                if changed:
+                    changes[asin] = changed
+                products.append((asin, response.error, now, now if changed else None))
+
+            with self._transaction():
+                self._conn.executemany(
+                    "INSERT INTO products (asin, error, checked_at, changed_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (asin) DO UPDATE SET error = excluded.error, checked_at = excluded.checked_at, "
+                    "changed_at = COALESCE(excluded.changed_at, products.changed_at)",
+                    products,
+                )
+                self._conn.executemany("INSERT OR REPLACE INTO sections VALUES (?, ?, ?, ?, ?)", section_rows)
+                self._conn.executemany("INSERT INTO history VALUES (?, ?, ?, ?)", history_rows)
+        return changes
+
+    def write(self, response: AmazonProductResponse) -> None:
+        """Buffer a response, upserting the buffer once it holds `batch_size` of them."""
+        self._buffer.append(response)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            buffered, self._buffer = self._buffer, []
+            self.upsert_many(buffered)
+
+    def get(self, asin: str) -> Optional[Dict[str, Any]]:
+        """
+        Latest stored state of a product.
+
+        Returns:
+            Dictionary with the stored sections under "product" plus "error",
+            "checked_at" and "changed_at", or None for an unknown ASIN
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT error, checked_at, changed_at FROM products WHERE asin = ?", (asin,)
+            ).fetchone()
+            if row is None:
+                return None
+            sections = self._conn.execute("SELECT section, value FROM sections WHERE asin = ?", (asin,)).fetchall()
+        product = {section: _decode(value) for section, value in sections}
+        error, checked_at, changed_at = row
+        return {"product": product, "error": error, "checked_at": checked_at, "changed_at": changed_at}
+
+    def changed_since(
+        self, since: float, sections: Optional[Iterable[str]] = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield (asin, {section: new value}) for every product with sections changed after `since`.
+
+        Only the changed sections are included, so syncing moves deltas
+        instead of whole documents. Products come in ASIN order.
+        """
+        query = "SELECT asin, section, value FROM sections WHERE changed_at > ?"
+        params: List[Any] = [since]
+        if sections is not None:
+            sections = list(sections)
+            query += f" AND section IN ({','.join('?' * len(sections))})"
+            params.extend(sections)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY asin", params).fetchall()
+
+        asin, delta = None, {}
+        for row_asin, section, value in rows:
+            if row_asin != asin:
+                if delta:
+                    yield asin, delta
+                asin, delta = row_asin, {}
+            delta[section] = _decode(value)
+        if delta:
+            yield asin, delta
+
+    def history(self, asin: str, section: Optional[str] = None) -> List[Tuple[float, str, Any]]:
+        """Every stored change of a product, oldest first, as (timestamp, section, value)."""
+        query = "SELECT changed_at, section, value FROM history WHERE asin = ?"
+        params: List[Any] = [asin]
+        if section is not None:
+            query += " AND section = ?"
+            params.append(section)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY changed_at, rowid", params).fetchall()
+        return [(changed_at, name, _decode(value)) for changed_at, name, value in rows]
+
+    def price_history(self, asin: str) -> List[Tuple[float, Optional[float]]]:
+        """(timestamp, price) for every price change of a product, oldest first."""
+        return [(changed_at, value) for changed_at, _, value in self.history(asin, "price")]
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self.flush()
+            with self._lock:
+                self._conn.close()
+            self._conn = None
@@ -1,6 +1,7 @@
+import itertools
 import re
-from typing import Dict,List
-from fake_useragent import UserAgent
+import threading
+from typing import AsyncIterable,Dict,Iterable,List,Optional,Union
 def filter_unicode(input_string)->str:
     return input_string.encode('ascii', 'ignore').decode()
 
@@ -16,23 +17,6 @@ def extract_text(text: str) -> str:
     return cleaned
 
 
-def make_headers()->Dict[str,str]:
-    ua=UserAgent()
-    return {
-        "User-Agent": ua.random,
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.5",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Connection": "keep-alive",
-        "Upgrade-Insecure-Requests": "1",
-        "Sec-Fetch-Dest": "document",
-        "Sec-Fetch-Mode": "navigate",
-        "Sec-Fetch-Site": "none",
-        "Sec-Fetch-User": "?1",
-        "Referer": "https://www.google.com/",
-        "Alt-Used": "www.amazon.in"
-    }
-
 AMAZON_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
@@ -49,6 +33,48 @@ AMAZON_HEADERS = {
 } 
 
 
+class HeaderProvider:
+    """
+    Process-wide source of browser-like request headers.
+
+    fake_useragent is imported and its data set loaded once, on first use;
+    after that user agents come from a precomputed pool in rotation, so
+    building headers costs a dict copy.
+    """
+
+    def __init__(self, pool_size: int = 16):
+        self.pool_size = pool_size
+        self._pool: Optional[List[str]] = None
+        self._cycle = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        try:
+            from fake_useragent import UserAgent
+            ua = UserAgent()
+            pool = list(dict.fromkeys(ua.random for _ in range(self.pool_size)))
+        except Exception:
+            pool = []
+        self._pool = pool or [AMAZON_HEADERS["User-Agent"]]
+        self._cycle = itertools.cycle(self._pool)
+
+    def user_agent(self) -> str:
+        with self._lock:
+            if self._cycle is None:
+                self._load()
+            return next(self._cycle)
+
+    def headers(self) -> Dict[str, str]:
+        return {**AMAZON_HEADERS, "User-Agent": self.user_agent()}
+
+
+HEADER_PROVIDER = HeaderProvider()
+
+
+def make_headers()->Dict[str,str]:
+    return HEADER_PROVIDER.headers()
+
+
 def extract_image_id(images:List[str])->List[str]:
     img_ids = [
         image.split("/I/")[-1].split("._")[0]
@@ -56,4 +82,48 @@ def extract_image_id(images:List[str])->List[str]:
         if len(image.split("/I/")) > 1
     ]
     valid_ids = [img_id for img_id in img_ids if len(img_id) == 11]
-    return valid_ids
\ No newline at end of file
+    return valid_ids
+
+# Status codes Amazon answers with when it throttles or blocks a client
+BLOCK_STATUS_CODES = {429, 503}
+
+
+def detect_block(status_code: Optional[int]=None, url: str="", body: Optional[str]=None) -> Optional[str]:
+    """
+    Shared bot-detection check for fetched pages.
+
+    Returns:
+        A short reason when the response looks throttled, redirected to a
+        CAPTCHA or like a bot-detection page, otherwise None
+    """
+    if status_code in BLOCK_STATUS_CODES:
+        return f"status {status_code}"
+    lowered_url = url.lower()
+    if "captcha" in lowered_url or "robot" in lowered_url:
+        return "captcha redirect"
+    if body:
+        if "/errors/validateCaptcha" in body:
+            return "captcha page"
+        if len(body) < 5000:
+            lowered = body.lower()
+            if "robot" in lowered or "captcha" in lowered or "blocked" in lowered or "verify" in lowered:
+                return "bot detection page"
+    return None
+
+
+def asin_reader(asins: Union[Iterable[str], AsyncIterable[str]]):
+    """Return a coroutine function yielding the next ASIN, or None when exhausted."""
+    if hasattr(asins, "__aiter__"):
+        source = asins.__aiter__()
+
+        async def next_asin() -> Optional[str]:
+            try:
+                return await source.__anext__()
+            except StopAsyncIteration:
+                return None
+    else:
+        iterator = iter(asins)
+
+        async def next_asin() -> Optional[str]:
+            return next(iterator, None)
+    return next_asin
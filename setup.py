@@ -5,7 +5,7 @@ setup(
     version="0.3.4",
     packages=find_packages(),
     install_requires=[
-        "httpx",
+        "httpx[http2]",
         "beautifulsoup4",
         "bs4",
         "pydantic",
@@ -13,6 +13,18 @@ setup(
         "playwright_stealth",
         "pytest-playwright"
     ],
+    extras_require={
+        "lxml": ["lxml"],
+        "selectolax": ["selectolax"],
+        "orjson": ["orjson"],
+        "redis": ["redis"],
+        "psutil": ["psutil"],
+        # fakeredis runs RedisJobQueue's Lua scripts through lupa
+        "test": ["pytest", "fakeredis", "lupa"],
+    },
+    entry_points={
+        "console_scripts": ["dibkb-scraper=dibkb_scraper.cli:main"],
+    },
     author="Dibas K Borborah",
     author_email="dibas9110@gmail.com",
     description="A scraper for Amazon product details and reviews using ASIN",
@@ -17,7 +17,7 @@ async def main():
     print(soup)
     print("--------------------------------")
     scraper = AmazonScraper(asin,soup)
-    print(scraper.get_competitors())
+    print(scraper.get_related_products())
     print("--------------------------------")
 if __name__ == "__main__":
     asyncio.run(main())
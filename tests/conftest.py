@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES_DIR = os.path.join(ROOT, "benchmarks", "pages")
+
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def load_page():
+    """Reads a saved product page from benchmarks/pages by file name."""
+
+    def load(name="desktop.html"):
+        with open(os.path.join(PAGES_DIR, name), encoding="utf-8") as f:
+            return f.read()
+
+    return load
+
+
+def pytest_addoption(parser):
+    parser.addoption("--run-benchmarks", action="store_true", help="Also run the wall-clock budget tests")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: wall-clock budget test, skipped without --run-benchmarks")
+
+
+def pytest_collection_modifyitems(config, items):
+    # Absolute timings depend on the machine, so they only run when asked for
+    if config.getoption("--run-benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="wall-clock budget; run with --run-benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,27 @@
+import pytest
+
+from dibkb_scraper import AmazonScraper
+
+
+def test_released_page_refuses_fields_it_did_not_extract(load_page):
+    html = load_page()
+    expected = AmazonScraper.from_html("A1", html).get_all_details()["product"]
+    scraper = AmazonScraper.from_html("A1", html, keep_tree=False)
+
+    assert scraper.get_all_details(["title"]) == {"product": {"title": expected["title"]}}
+    # Stored results stay available after the release
+    assert scraper.get_all_details(["title"]) == {"product": {"title": expected["title"]}}
+    assert scraper.get_product_title() == expected["title"]
+
+    with pytest.raises(RuntimeError, match=r"\['price', 'ratings'\]"):
+        scraper.get_all_details(["title", "price", "ratings"])
+    with pytest.raises(RuntimeError, match="get_selling_price"):
+        scraper.get_selling_price()
+
+
+def test_keep_tree_false_extracts_everything_in_one_call(load_page):
+    html = load_page()
+    expected = AmazonScraper.from_html("A1", html).get_all_details()
+    scraper = AmazonScraper.from_html("A1", html, keep_tree=False)
+    assert scraper.get_all_details() == expected
+    assert scraper.get_all_details() == expected
@@ -0,0 +1,44 @@
+import asyncio
+
+import httpx
+import pytest
+
+from dibkb_scraper import AdaptiveRateLimiter, AsyncAmazonScraper, ResponseCache, TieredFetcher
+
+
+def handler(request):
+    asin = request.url.path.rsplit("/", 1)[-1]
+    if asin == "TIMEOUT":
+        raise httpx.ReadTimeout("", request=request)
+    if asin == "MISSING":
+        return httpx.Response(404, text="<html>" + "gone " * 2000 + "</html>")
+    return httpx.Response(503, text="Service Unavailable")
+
+
+def test_failed_fetch_reports_why():
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            scraper = AsyncAmazonScraper(client=client)
+            return {asin: (await scraper.scrape(asin)).error for asin in ("TIMEOUT", "MISSING", "THROTTLED")}
+
+    assert asyncio.run(run()) == {
+        "TIMEOUT": "Failed to fetch page: ReadTimeout",
+        "MISSING": "Failed to fetch page: status 404",
+        "THROTTLED": "Failed to fetch page: blocked (status 503)",
+    }
+
+
+def test_fetcher_rejects_options_it_would_ignore(tmp_path):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            fetcher = TieredFetcher(client=client)
+            cache = ResponseCache(str(tmp_path))
+            with pytest.raises(ValueError, match="cache, limiter would be ignored with fetcher="):
+                AsyncAmazonScraper(client=client, fetcher=fetcher, cache=cache, limiter=AdaptiveRateLimiter())
+            cache.close()
+            with pytest.raises(ValueError, match="cache_ttl"):
+                AsyncAmazonScraper(client=client, fetcher=fetcher, cache_ttl=60)
+            scraper = AsyncAmazonScraper(client=client, fetcher=fetcher)
+            return (await scraper.scrape("THROTTLED")).error
+
+    assert asyncio.run(run()) == "Failed to fetch page: blocked (status 503)"
@@ -0,0 +1,114 @@
+import asyncio
+import sys
+
+import pytest
+
+from dibkb_scraper import browser_farm
+from dibkb_scraper.browser_farm import BrowserFarm
+
+
+class FakePlaywright:
+    """Stands in for a standalone PlaywrightScraper; `crash_on` URLs kill the browser mid-render."""
+
+    launched = []
+    crash_on = set()
+    start_fails = False
+
+    def __init__(self):
+        self.connected = False
+        self.rendered = []
+        self.closed = False
+
+    @classmethod
+    def standalone(cls):
+        browser = cls()
+        cls.launched.append(browser)
+        return browser
+
+    async def initialize(self, **options):
+        self.options = options
+        self.connected = not self.start_fails
+
+    def is_connected(self):
+        return self.connected
+
+    async def get_html_content(self, url, max_retries=3):
+        await asyncio.sleep(0.01)
+        if url in self.crash_on:
+            self.connected = False
+            return None
+        self.rendered.append(url)
+        return f"<html>{url}</html>"
+
+    async def close(self):
+        self.closed = True
+        self.connected = False
+
+
+@pytest.fixture
+def fake_playwright(monkeypatch):
+    class Fake(FakePlaywright):
+        launched = []
+        crash_on = set()
+
+    monkeypatch.setattr(browser_farm, "PlaywrightScraper", Fake)
+    return Fake
+
+
+def render_all(farm, urls, **options):
+    async def run():
+        await farm.initialize(**options)
+        try:
+            return await asyncio.gather(*(farm.get_html_content(url) for url in urls))
+        finally:
+            # Let restarts scheduled by the last renders finish before reading stats
+            await asyncio.sleep(0.05)
+
+    return asyncio.run(run())
+
+
+def test_renders_go_to_the_least_loaded_browser(fake_playwright):
+    farm = BrowserFarm(size=3, restart_after=None)
+    pages = render_all(farm, [f"u{i}" for i in range(6)], concurrency=1)
+
+    assert pages == [f"<html>u{i}</html>" for i in range(6)]
+    assert [browser.renders for browser in farm.browsers] == [2, 2, 2]
+    assert len(fake_playwright.launched) == 3
+    assert fake_playwright.launched[0].options["concurrency"] == 1
+
+
+def test_browser_is_recycled_after_restart_after_renders(fake_playwright):
+    farm = BrowserFarm(size=1, restart_after=2)
+    render_all(farm, [f"u{i}" for i in range(5)], concurrency=1)
+
+    [stats] = farm.stats()
+    assert (stats["renders"], stats["restarts"], stats["ready"]) == (5, 2, True)
+    assert [len(browser.rendered) for browser in fake_playwright.launched] == [2, 2, 1]
+    assert all(browser.closed for browser in fake_playwright.launched[:2])
+
+
+def test_render_lost_to_a_crash_is_retried_elsewhere(fake_playwright):
+    fake_playwright.crash_on = {"crash"}
+    farm = BrowserFarm(size=2, restart_after=None)
+    [page] = render_all(farm, ["crash"], concurrency=1)
+
+    # Both browsers crash on this URL: it is retried once, then given up
+    assert page is None
+    stats = farm.stats()
+    assert [s["failures"] for s in stats] == [1, 1]
+    assert [s["restarts"] for s in stats] == [1, 1]
+    assert all(s["ready"] for s in stats)
+    assert len(fake_playwright.launched) == 4
+
+
+def test_farm_without_running_browsers_returns_none(fake_playwright):
+    fake_playwright.start_fails = True
+    farm = BrowserFarm(size=2)
+    assert render_all(farm, ["u1"]) == [None]
+    assert not any(s["ready"] for s in farm.stats())
+
+
+def test_max_memory_needs_psutil(fake_playwright, monkeypatch):
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    with pytest.raises(ImportError, match="psutil"):
+        asyncio.run(BrowserFarm(max_memory_mb=100).initialize())
@@ -0,0 +1,54 @@
+import os
+
+import httpx
+
+from dibkb_scraper import AmazonScraper, ResponseCache
+
+
+def test_batched_touches_keep_hot_entries_through_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=100_000, touch_batch=4, size_check_every=8)
+    for i in range(60):
+        # Random hex barely compresses, so each entry is about 5 KB
+        cache.set(f"https://example.com/{i}", os.urandom(2500).hex())
+        assert cache.get("https://example.com/0") is not None
+
+    assert cache.size_bytes() <= 100_000
+    assert cache.get("https://example.com/1") is None
+    cache.close()
+
+    reopened = ResponseCache(str(tmp_path), max_bytes=100_000)
+    assert reopened.get("https://example.com/0") is not None
+    reopened.close()
+
+
+def test_empty_cache_still_stores_fetched_pages(tmp_path, monkeypatch, load_page):
+    page = load_page()
+    requests = []
+
+    def get(url, **options):
+        requests.append(url)
+        return httpx.Response(200, text=page, request=httpx.Request("GET", url))
+
+    monkeypatch.setattr(httpx, "get", get)
+    cache = ResponseCache(str(tmp_path))
+    # An empty cache has len() 0, which must not read as "no cache"
+    assert len(cache) == 0
+    first = AmazonScraper("B0TEST", cache=cache).get_all_details()
+    assert AmazonScraper("B0TEST", cache=cache).get_all_details() == first
+    assert len(requests) == 1
+    cache.close()
+
+
+def test_overwriting_an_entry_keeps_the_running_total(tmp_path):
+    # A high size_check_every leaves the total to the running count alone
+    cache = ResponseCache(str(tmp_path), max_bytes=30_000, size_check_every=1000)
+    body = os.urandom(2500).hex()
+    for _ in range(20):
+        cache.set("https://example.com/same", body)
+        assert cache._total == cache.size_bytes()
+    cache.set("https://example.com/other", os.urandom(2500).hex())
+    assert cache._total == cache.size_bytes()
+
+    # Rewrites of one URL never push the cache over max_bytes
+    assert len(cache) == 2
+    cache.close()
@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+
+from dibkb_scraper import cli
+from dibkb_scraper.fetcher import FetchResult, TieredFetcher
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+with open(os.path.join(ROOT, "benchmarks", "pages", "desktop.html"), encoding="utf-8") as f:
+    PAGE = f.read()
+
+
+def serve(monkeypatch, failing):
+    async def fetch(self, url):
+        if any(url.endswith(asin) for asin in failing):
+            return FetchResult(url, error="HTTP 503")
+        return FetchResult(url, PAGE, "http")
+
+    monkeypatch.setattr(TieredFetcher, "fetch", fetch)
+
+
+def test_resumed_run_retries_failures_without_duplicate_lines(tmp_path, monkeypatch):
+    source = tmp_path / "asins.txt"
+    source.write_text("A1\nA2\nA3\n")
+    output = str(tmp_path / "products.jsonl")
+    args = [str(source), "-o", output, "-q"]
+
+    serve(monkeypatch, failing={"A2"})
+    assert cli.main(args) == 0
+    serve(monkeypatch, failing=set())
+    assert cli.main(args) == 0
+    assert cli.main(args) == 0
+
+    with open(output, encoding="utf-8") as f:
+        asins = [json.loads(line)["asin"] for line in f]
+    assert sorted(asins) == ["A1", "A2", "A3"]
+    with open(output + ".done", encoding="utf-8") as f:
+        assert sorted(f.read().split()) == ["A1", "A2", "A3"]
+
+
+def test_failed_browser_start_closes_what_was_opened(tmp_path, monkeypatch):
+    from dibkb_scraper.playwright import PlaywrightScraper
+
+    closed = []
+
+    async def initialize(self, **options):
+        raise RuntimeError("browser failed to launch")
+
+    async def close_browser(self):
+        closed.append("browser")
+
+    def spy(name, close):
+        def wrapper(self):
+            closed.append(name)
+            close(self)
+
+        return wrapper
+
+    monkeypatch.setattr(PlaywrightScraper, "initialize", initialize)
+    monkeypatch.setattr(PlaywrightScraper, "close", close_browser)
+    monkeypatch.setattr(cli.ResponseCache, "close", spy("cache", cli.ResponseCache.close))
+    monkeypatch.setattr(cli.JsonlSink, "close", spy("sink", cli.JsonlSink.close))
+    monkeypatch.setattr(cli.Checkpoint, "close", spy("checkpoint", cli.Checkpoint.close))
+
+    source = tmp_path / "asins.txt"
+    source.write_text("A1\n")
+    args = [str(source), "-o", str(tmp_path / "products.jsonl"), "-q", "--tier", "browser", "--cache", str(tmp_path)]
+    with pytest.raises(RuntimeError, match="browser failed to launch"):
+        cli.main(args)
+    assert closed == ["browser", "cache", "sink", "checkpoint"]
@@ -0,0 +1,47 @@
+import pytest
+
+from dibkb_scraper import AmazonProductResponse, AmazonScraper, CompactProduct
+from dibkb_scraper.compact import SHARED_TUPLES, _canonical, _share
+
+PAGES = ["desktop.html", "desktop_no_histogram.html", "mobile.html", "sparse.html"]
+
+
+@pytest.mark.parametrize("page", PAGES)
+def test_round_trip_is_lossless(load_page, page):
+    details = AmazonScraper.from_html("A1", load_page(page)).get_all_details()
+    response = AmazonProductResponse(asin="A1", **details)
+
+    compact = CompactProduct.from_details("A1", details)
+    assert compact.to_details() == {"error": None, **details}
+    assert compact.to_response() == response
+    assert CompactProduct.from_response(response) == compact
+    assert hash(compact) == hash(CompactProduct.from_response(response))
+
+
+def test_unusual_ratings_survive_the_round_trip():
+    details = {
+        "product": {
+            "title": "Odd",
+            "ratings": {"rating": 4.1, "rating_stats": {"five_star": {"count": 3, "percentage": 60}}},
+            "specifications": {"technical": {"Colour": "Black"}, "additional": None, "details": {}},
+        },
+        "error": None,
+    }
+    compact = CompactProduct.from_details("A1", details)
+    assert compact.raw_ratings is not None
+    assert compact.to_details()["product"]["ratings"] == details["product"]["ratings"]
+    assert compact.to_details()["product"]["specifications"] == details["product"]["specifications"]
+
+
+def test_failed_response_round_trip():
+    response = AmazonProductResponse(asin="A1", product={}, error="Failed to fetch page: status 404")
+    assert CompactProduct.from_response(response).to_response() == response
+
+
+def test_equal_tuples_are_shared_and_the_cache_is_bounded():
+    first = _share(["Electronics", "Headphones"])
+    assert _share(["Electronics", "Headphones"]) is first
+
+    for i in range(SHARED_TUPLES + 100):
+        _share([f"category {i}"])
+    assert _canonical.cache_info().currsize <= SHARED_TUPLES
@@ -0,0 +1,48 @@
+"""
+Extraction output of every parser backend, with and without lean parsing,
+against the checked-in expected output of the saved pages in benchmarks/pages.
+
+After an intended output change, regenerate the expected files with:
+    PYTHONPATH=. python tests/test_conformance.py
+"""
+import json
+import os
+
+import pytest
+
+from dibkb_scraper.amazon import AmazonScraper
+from dibkb_scraper.parsers import BACKENDS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES_DIR = os.path.join(ROOT, "benchmarks", "pages")
+EXPECTED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "expected")
+PAGES = sorted(name for name in os.listdir(PAGES_DIR) if name.endswith(".html"))
+
+
+def details(name, backend="html.parser", lean=False):
+    with open(os.path.join(PAGES_DIR, name), encoding="utf-8") as f:
+        html = f.read()
+    return AmazonScraper.from_html("FIXTURE", html, backend, lean=lean).get_all_details()
+
+
+def expected_path(name):
+    return os.path.join(EXPECTED_DIR, name.replace(".html", ".json"))
+
+
+@pytest.mark.parametrize("lean", [False, True], ids=["full", "lean"])
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+@pytest.mark.parametrize("name", PAGES)
+def test_output_matches_expected(name, backend, lean):
+    try:
+        actual = details(name, backend, lean)
+    except ImportError as e:
+        pytest.skip(str(e))
+    with open(expected_path(name), encoding="utf-8") as f:
+        assert actual == json.load(f)
+
+
+if __name__ == "__main__":
+    for name in PAGES:
+        with open(expected_path(name), "w", encoding="utf-8") as f:
+            json.dump(details(name), f, indent=2, sort_keys=True, ensure_ascii=False)
+            f.write("\n")
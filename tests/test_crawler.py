@@ -0,0 +1,80 @@
+import asyncio
+
+from dibkb_scraper import AmazonProductResponse, BloomFilter, CrawlFrontier, RelatedProductsCrawler
+from dibkb_scraper.models import Competitor, Product
+
+
+class FakeScraper:
+    """Stands in for AsyncAmazonScraper: each ASIN links to the ASINs in `links`."""
+
+    def __init__(self, links, failing=()):
+        self.links = links
+        self.failing = set(failing)
+        self.fetched = []
+
+    async def scrape_many(self, asins, concurrency=None):
+        for asin in asins:
+            self.fetched.append(asin)
+            if asin in self.failing:
+                yield AmazonProductResponse(asin=asin, product=Product(), error="Failed to fetch page")
+                continue
+            related = [Competitor(asin=child, title=child, img_id="") for child in self.links.get(asin, ())]
+            yield AmazonProductResponse(asin=asin, product=Product(title=asin, related_products=related))
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    asins = [f"B{i:09d}" for i in range(1000)]
+    for asin in asins:
+        bloom.add(asin)
+    assert all(asin in bloom for asin in asins)
+    false_positives = sum(f"C{i:09d}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_frontier_dedupes_and_claims_by_priority(tmp_path):
+    frontier = CrawlFrontier(str(tmp_path / "crawl.sqlite3"), capacity=100)
+    assert frontier.add(["A1", "A2", "A1"]) == 2
+    assert frontier.add(["A2", "A3"], depth=1) == 1
+    assert frontier.add(["A4"], depth=1, priority=5) == 1
+    assert "A3" in frontier and "Z9" not in frontier
+
+    claimed = [frontier.claim() for _ in range(4)]
+    assert claimed == [("A4", 1), ("A1", 0), ("A2", 0), ("A3", 1)]
+    assert frontier.claim() is None
+
+
+def test_frontier_resume_requeues_claimed_rows(tmp_path):
+    path = str(tmp_path / "crawl.sqlite3")
+    frontier = CrawlFrontier(path)
+    frontier.add(["A1", "A2", "A3"])
+    frontier.complete(frontier.claim()[0])
+    frontier.claim()
+    frontier.complete(frontier.claim()[0], failed=True)
+    assert frontier.counts() == {"pending": 0, "claimed": 1, "done": 1, "failed": 1}
+    frontier.close()
+
+    # The run died holding A2: reopening hands it out again, but never A1
+    frontier = CrawlFrontier(path)
+    assert frontier.counts() == {"pending": 1, "claimed": 0, "done": 1, "failed": 1}
+    assert frontier.claim() == ("A2", 0)
+    assert frontier.claim() is None
+    assert frontier.add(["A1", "A2", "A3"]) == 0
+    assert frontier.retry_failed() == 1
+    assert frontier.claim() == ("A3", 0)
+
+
+def test_crawler_follows_links_to_max_depth(tmp_path):
+    links = {"S": ["A", "B"], "A": ["B", "C"], "C": ["D"]}
+    scraper = FakeScraper(links, failing={"B"})
+    crawler = RelatedProductsCrawler(scraper, CrawlFrontier(str(tmp_path / "crawl.sqlite3")), max_depth=2)
+    crawler.seed(["S"])
+
+    async def crawl():
+        return [response.asin async for response in crawler.crawl()]
+
+    assert asyncio.run(crawl()) == ["S", "A", "B", "C"]
+    stats = crawler.stats()
+    assert (stats["done"], stats["failed"], stats["pending"]) == (3, 1, 0)
+    # D is three links from the seed, so it is never queued
+    assert "D" not in crawler.frontier
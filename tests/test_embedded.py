@@ -0,0 +1,93 @@
+import pytest
+
+from dibkb_scraper import AmazonScraper, InMemoryCollector
+from dibkb_scraper.embedded import UNKNOWN, EmbeddedJson
+from dibkb_scraper.parsers import get_backend
+
+PRICE_DIV = '<div class="a-section aok-hidden twister-plus-buying-options-price-data">'
+IMAGE_SCRIPT = '<script type="text/javascript">\nP.when(\'A\').register("ImageBlockATF"'
+FIRST_CARD = '<li class="a-carousel-card" role="listitem">'
+
+# (embedded method, getter that reads it)
+FIELDS = [
+    ("price_text", "get_selling_price"),
+    ("image_block_script", "get_product_images"),
+    ("ad_feedback_details", "get_related_products"),
+]
+
+
+def dom_result(html, getter):
+    """The getter's result from the parsed page alone, without the raw HTML."""
+    return getattr(AmazonScraper("FIXTURE", soup=get_backend("html.parser").parse(html)), getter)()
+
+
+def embedded_result(html, getter):
+    metrics = InMemoryCollector()
+    result = getattr(AmazonScraper.from_html("FIXTURE", html, metrics=metrics), getter)()
+    return result, metrics.snapshot()["counters"].get(f'embedded_fallbacks{{extractor="{getter}"}}', 0)
+
+
+@pytest.mark.parametrize("page", ["desktop.html", "desktop_no_histogram.html", "mobile.html", "sparse.html"])
+@pytest.mark.parametrize("method, getter", FIELDS)
+def test_plain_pages_are_read_without_the_dom(load_page, page, method, getter):
+    html = load_page(page)
+    assert getattr(EmbeddedJson(html), method)() is not UNKNOWN
+    result, fallbacks = embedded_result(html, getter)
+    assert result == dom_result(html, getter)
+    assert fallbacks == 0
+
+
+def replace_once(html, old, new):
+    assert old in html
+    return html.replace(old, new, 1)
+
+
+AMBIGUOUS = {
+    "price in a comment": (
+        "price_text",
+        lambda html: replace_once(html, "<body>", f'<body><!-- {PRICE_DIV}{{"stale": true}}</div> -->'),
+    ),
+    "price div with a repeated attribute": (
+        "price_text",
+        lambda html: replace_once(html, PRICE_DIV, PRICE_DIV[:-1] + ' class="other">'),
+    ),
+    "markup inside the price div": (
+        "price_text",
+        lambda html: replace_once(html, PRICE_DIV, PRICE_DIV + "<span></span>"),
+    ),
+    "image script in a comment": (
+        "image_block_script",
+        lambda html: replace_once(replace_once(html, IMAGE_SCRIPT, "<!--" + IMAGE_SCRIPT), "</head>", "--></head>"),
+    ),
+    "image marker outside any script": (
+        "image_block_script",
+        lambda html: replace_once(html, "ImageBlockATF", "ImageBlock").replace("<body>", "<body>ImageBlockATF", 1),
+    ),
+    "carousel card with a repeated attribute": (
+        "ad_feedback_details",
+        lambda html: replace_once(html, FIRST_CARD, FIRST_CARD[:-1] + ' role="other">'),
+    ),
+    "carousel card left open": (
+        "ad_feedback_details",
+        lambda html: replace_once(html, FIRST_CARD, FIRST_CARD + "<ul><li>nested</li></ul>"),
+    ),
+}
+
+
+@pytest.mark.parametrize("case", sorted(AMBIGUOUS))
+def test_ambiguous_markup_falls_back_to_the_dom(load_page, case):
+    method, mutate = AMBIGUOUS[case]
+    getter = dict(FIELDS)[method]
+    html = mutate(load_page("desktop.html"))
+
+    assert getattr(EmbeddedJson(html), method)() is UNKNOWN
+    result, fallbacks = embedded_result(html, getter)
+    assert result == dom_result(html, getter)
+    assert fallbacks == 1
+
+
+def test_pages_without_the_blobs():
+    embedded = EmbeddedJson("<html><body><p>nothing here</p></body></html>")
+    assert embedded.price_text() is None
+    assert embedded.image_block_script() is None
+    assert embedded.ad_feedback_details() == []
@@ -0,0 +1,107 @@
+import asyncio
+
+import httpx
+
+from dibkb_scraper import ResponseCache, TieredFetcher
+
+# Long enough not to be mistaken for a bot-detection page
+PAGE = "<html><body>" + "<p>product</p>" * 500 + "</body></html>"
+
+
+def site(request):
+    path = request.url.path
+    if path == "/ok":
+        return httpx.Response(200, text=PAGE)
+    if path == "/missing":
+        return httpx.Response(404, text=PAGE)
+    if path == "/throttled":
+        return httpx.Response(503, text="Service Unavailable")
+    if path == "/captcha":
+        return httpx.Response(302, headers={"Location": "/errors/validateCaptcha"})
+    if path == "/errors/validateCaptcha":
+        return httpx.Response(200, text="Type the characters you see")
+    if path == "/interstitial":
+        return httpx.Response(200, text="<html>Sorry, we just need to make sure you're not a robot.</html>")
+    raise httpx.ConnectError("connection refused", request=request)
+
+
+class FakeBrowser:
+    """Renders every URL, or none when `blocked`."""
+
+    def __init__(self, blocked=False):
+        self.blocked = blocked
+        self.rendered = []
+
+    async def get_html_content(self, url):
+        self.rendered.append(url)
+        return None if self.blocked else f"<html>rendered {url}</html>"
+
+
+def fetch_all(paths, **options):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(site), follow_redirects=True) as client:
+            fetcher = TieredFetcher(client=client, **options)
+            results = [await fetcher.fetch(f"https://www.amazon.in{path}") for path in paths]
+            return fetcher, results
+
+    return asyncio.run(run())
+
+
+def counts(stats, tier):
+    return {outcome: stats[tier][outcome] for outcome in ("requests", "ok", "blocked", "errors")}
+
+
+def test_http_success_is_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    browser = FakeBrowser()
+    fetcher, results = fetch_all(["/ok", "/ok"], browser=browser, cache=cache)
+
+    assert [(result.tier, result.html) for result in results] == [("http", PAGE), ("cache", PAGE)]
+    stats = fetcher.stats()
+    assert counts(stats, "http") == {"requests": 1, "ok": 1, "blocked": 0, "errors": 0}
+    assert counts(stats, "cache") == {"requests": 1, "ok": 1, "blocked": 0, "errors": 0}
+    assert (stats["escalations"], browser.rendered) == (0, [])
+    cache.close()
+
+
+def test_blocked_responses_escalate_to_the_browser(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    browser = FakeBrowser()
+    paths = ["/throttled", "/captcha", "/interstitial", "/throttled"]
+    fetcher, results = fetch_all(paths, browser=browser, cache=cache)
+
+    assert [result.tier for result in results] == ["browser", "browser", "browser", "cache"]
+    assert results[0].html == "<html>rendered https://www.amazon.in/throttled</html>"
+    assert len(browser.rendered) == 3
+    stats = fetcher.stats()
+    assert stats["escalations"] == 3
+    assert counts(stats, "http") == {"requests": 3, "ok": 0, "blocked": 3, "errors": 0}
+    assert counts(stats, "browser") == {"requests": 3, "ok": 3, "blocked": 0, "errors": 0}
+    cache.close()
+
+
+def test_block_reasons_without_a_browser():
+    fetcher, results = fetch_all(["/throttled", "/captcha", "/interstitial"])
+    assert [result.blocked for result in results] == ["status 503", "captcha redirect", "bot detection page"]
+    assert all(result.html is None and result.tier == "http" for result in results)
+    assert fetcher.stats()["escalations"] == 0
+
+
+def test_errors_are_not_escalated(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    browser = FakeBrowser()
+    fetcher, results = fetch_all(["/missing", "/unreachable", "/missing"], browser=browser, cache=cache)
+
+    assert [result.error for result in results] == ["status 404", "connection refused", "status 404"]
+    assert browser.rendered == []
+    stats = fetcher.stats()
+    assert counts(stats, "http") == {"requests": 3, "ok": 0, "blocked": 0, "errors": 3}
+    assert counts(stats, "cache")["requests"] == 0
+    cache.close()
+
+
+def test_browser_that_is_blocked_too():
+    browser = FakeBrowser(blocked=True)
+    fetcher, [result] = fetch_all(["/throttled"], browser=browser)
+    assert (result.tier, result.html, result.error) == ("browser", None, "blocked (browser)")
+    assert counts(fetcher.stats(), "browser") == {"requests": 1, "ok": 0, "blocked": 1, "errors": 0}
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from dibkb_scraper import AmazonProductResponse, QueueWorker, RedisJobQueue, SqliteJobQueue
+from dibkb_scraper.models import Product
+
+
+class FakeScraper:
+    """Stands in for AsyncAmazonScraper, failing the ASINs in `failing`."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+
+    async def scrape_many(self, asins, concurrency=None):
+        for asin in asins:
+            if asin in self.failing:
+                yield AmazonProductResponse(asin=asin, product=Product(), error="Failed to fetch page")
+            else:
+                yield AmazonProductResponse(asin=asin, product=Product(title=f"Title {asin}"))
+
+
+class CrashingSink:
+    """Buffers writes like JsonlSink and dies on flush, like a killed worker."""
+
+    def __init__(self):
+        self.buffered = []
+
+    def write(self, response):
+        self.buffered.append(response)
+
+    def flush(self):
+        raise KeyboardInterrupt("worker killed")
+
+
+def test_worker_crash_before_flush_leaves_jobs_leasable(tmp_path):
+    queue = SqliteJobQueue(str(tmp_path / "jobs.sqlite3"), visibility_timeout=0.05)
+    queue.put(["A1", "A2", "A3"])
+    sink = CrashingSink()
+    worker = QueueWorker(queue, FakeScraper(), sink, batch_size=3)
+
+    with pytest.raises(KeyboardInterrupt):
+        asyncio.run(worker.run_batch())
+
+    assert len(sink.buffered) == 3
+    assert queue.counts()["done"] == 0
+    asyncio.run(asyncio.sleep(0.1))
+    assert sorted(job.asin for job in queue.lease(10)) == ["A1", "A2", "A3"]
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_queue(request, tmp_path):
+    def make(**options):
+        if request.param == "sqlite":
+            return SqliteJobQueue(str(tmp_path / "jobs.sqlite3"), **options)
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        return RedisJobQueue(client=fakeredis.FakeStrictRedis(), **options)
+
+    return make
+
+
+def test_expired_lease_is_reclaimed_and_stale_token_cannot_ack(make_queue):
+    queue = make_queue(visibility_timeout=0.05)
+    queue.put(["A1"])
+    [first] = queue.lease(1, worker="crashed")
+    assert queue.lease(1) == []
+
+    asyncio.run(asyncio.sleep(0.1))
+    [second] = queue.lease(1, worker="rescuer")
+    assert (second.asin, second.attempts) == ("A1", 2)
+    assert not queue.ack(first)
+    assert queue.ack(second)
+    assert queue.counts()["done"] == 1
+
+
+def test_job_dies_after_max_attempts(make_queue):
+    queue = make_queue(max_attempts=2, backoff=0)
+    queue.put(["A1"])
+    for attempt in (1, 2):
+        [job] = queue.lease(1)
+        assert job.attempts == attempt
+        assert queue.nack(job, "HTTP 503")
+
+    assert queue.lease(1) == []
+    counts = queue.counts()
+    assert (counts["pending"], counts["dead"]) == (0, 1)
+    if isinstance(queue, SqliteJobQueue):
+        assert [(f["asin"], f["attempts"], f["error"]) for f in queue.failures()] == [("A1", 2, "HTTP 503")]
+    # Putting a dead ASIN queues it again
+    assert queue.put(["A1"]) == 1
+    assert [job.attempts for job in queue.lease(1)] == [1]
+
+
+def test_expired_lease_on_last_attempt_is_dead(make_queue):
+    queue = make_queue(max_attempts=1, visibility_timeout=0.05)
+    queue.put(["A1"])
+    queue.lease(1)
+    asyncio.run(asyncio.sleep(0.1))
+    assert queue.lease(1) == []
+    assert queue.counts()["dead"] == 1
+
+
+def test_worker_nacks_failures_and_writes_successes(tmp_path):
+    queue = SqliteJobQueue(str(tmp_path / "jobs.sqlite3"), backoff=60)
+    queue.put(["A1", "A2", "A3"])
+
+    class Sink:
+        def __init__(self):
+            self.written, self.flushed = [], []
+
+        def write(self, response):
+            self.written.append(response.asin)
+
+        def flush(self):
+            self.flushed, self.written = self.flushed + self.written, []
+
+    sink = Sink()
+    worker = QueueWorker(queue, FakeScraper(failing={"A2"}), sink, batch_size=10)
+    assert asyncio.run(worker.run_batch()) == 3
+    assert sorted(sink.flushed) == ["A1", "A3"]
+    assert (worker.failed, queue.counts()["done"], queue.counts()["pending"]) == (1, 2, 1)
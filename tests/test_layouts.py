@@ -0,0 +1,85 @@
+import pytest
+
+from dibkb_scraper import AmazonScraper, InMemoryCollector, LayoutStats, PageLayout
+from dibkb_scraper.dom_index import DomIndex
+from dibkb_scraper.layouts import MOBILE_BREADCRUMB_CLASS
+
+PAGES = ["desktop.html", "desktop_no_histogram.html", "mobile.html", "sparse.html"]
+EXPANDER_CLASS = "a-expander-content a-expander-partial-collapse-content"
+
+
+def layout_of(html):
+    return AmazonScraper.from_html("A1", html).layout
+
+
+def test_fingerprints_tell_page_templates_apart(load_page):
+    layouts = {page: layout_of(load_page(page)) for page in PAGES}
+    assert len({layout.fingerprint for layout in layouts.values()}) == len(PAGES)
+    assert layout_of(load_page("desktop.html")).fingerprint == layouts["desktop.html"].fingerprint
+
+    assert {"productTitle", "breadcrumbs"} <= layouts["desktop.html"].landmarks
+    assert {"title", "mobile_breadcrumbs"} <= layouts["mobile.html"].landmarks
+    assert not layouts["desktop.html"].viable("mobile_breadcrumbs")
+    assert layouts["mobile.html"].viable("mobile_breadcrumbs")
+    # Strategies without a landmark are always viable
+    assert layouts["sparse.html"].viable("none")
+
+
+@pytest.fixture
+def expander_scans(monkeypatch):
+    scans = []
+    find_all = DomIndex.find_all
+
+    def spy(self, *args, **kwargs):
+        if kwargs.get("class_") == EXPANDER_CLASS:
+            scans.append(args)
+        return find_all(self, *args, **kwargs)
+
+    monkeypatch.setattr(DomIndex, "find_all", spy)
+    return scans
+
+
+def test_mobile_breadcrumb_scan_is_skipped_without_its_landmark(load_page, expander_scans, monkeypatch):
+    mobile = load_page("mobile.html")
+    assert AmazonScraper.from_html("A1", mobile).get_tags() == ["Home & Kitchen", "Kitchen Tools"]
+    assert len(expander_scans) == 1
+
+    # Same expanders, but no breadcrumb links in them: the scan can't match
+    stripped = mobile.replace(MOBILE_BREADCRUMB_CLASS, "other-links")
+    expander_scans.clear()
+    assert AmazonScraper.from_html("A1", stripped).get_tags() == []
+    assert expander_scans == []
+
+    # Running the scan anyway gives the same result
+    monkeypatch.setattr(PageLayout, "viable", lambda self, strategy: True)
+    assert AmazonScraper.from_html("A1", stripped).get_tags() == []
+    assert len(expander_scans) == 1
+
+
+def test_new_layouts_count_as_drift_after_warmup(load_page):
+    layouts = LayoutStats(warmup=3, min_samples=2)
+    metrics = InMemoryCollector()
+    for page in ["desktop.html"] * 3 + ["mobile.html", "desktop.html"]:
+        AmazonScraper.from_html("A1", load_page(page), layouts=layouts, metrics=metrics).get_all_details()
+
+    snapshot = layouts.snapshot()
+    assert snapshot["pages"] == 5
+    assert snapshot["drift"]["new_layouts"] == 1
+    desktop = layout_of(load_page("desktop.html")).fingerprint
+    assert snapshot["layouts"][desktop]["pages"] == 4
+    assert snapshot["layouts"][desktop]["strategies"]["get_product_title"] == {"productTitle": 4}
+    assert metrics.snapshot()["counters"]['layout_drift{kind="new_layout"}'] == 1
+
+
+def test_strategy_changes_count_once_a_layout_is_learned():
+    layouts = LayoutStats(min_samples=3)
+    # Still learning: nothing is expected yet
+    assert not layouts.record("abc", "get_tags", "breadcrumbs")
+    assert not layouts.record("abc", "get_tags", "mobile_breadcrumbs")
+    assert not layouts.record("abc", "get_tags", "breadcrumbs")
+
+    assert not layouts.record("abc", "get_tags", "breadcrumbs")
+    assert layouts.record("abc", "get_tags", "none")
+    # Another layout keeps its own expectations
+    assert not layouts.record("def", "get_tags", "none")
+    assert layouts.snapshot()["drift"]["strategy_changes"] == {"get_tags": 1}
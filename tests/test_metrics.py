@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+
+from dibkb_scraper import AmazonScraper, CallbackCollector, InMemoryCollector, PrometheusCollector
+from dibkb_scraper.metrics import instrumented
+
+
+def test_in_memory_counts_and_timings():
+    metrics = InMemoryCollector()
+    metrics.increment("fetch", source="http", outcome="ok")
+    metrics.increment("fetch", 2, outcome="ok", source="http")
+    metrics.increment("fetch", source="cache", outcome="ok")
+    metrics.observe("parse", 0.5, backend="lxml")
+    metrics.observe("parse", 1.5, backend="lxml")
+
+    snapshot = metrics.snapshot()
+    # Label order doesn't matter
+    assert snapshot["counters"] == {
+        'fetch{outcome="ok",source="http"}': 3,
+        'fetch{outcome="ok",source="cache"}': 1,
+    }
+    assert snapshot["timings"] == {'parse{backend="lxml"}': {"count": 2, "total": 2.0, "mean": 1.0, "max": 1.5}}
+
+    metrics.reset()
+    assert metrics.snapshot() == {"counters": {}, "timings": {}}
+
+
+def test_in_memory_is_thread_safe():
+    metrics = InMemoryCollector()
+
+    def work():
+        for _ in range(10_000):
+            metrics.increment("hits")
+            metrics.observe("work", 0.001)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["hits"] == 40_000
+    assert snapshot["timings"]["work"]["count"] == 40_000
+
+
+def test_callback_collector_forwards_everything():
+    calls = []
+    metrics = CallbackCollector(lambda *call: calls.append(call))
+    metrics.observe("render", 0.25, outcome="ok")
+    metrics.increment("blocked", reason="captcha page")
+    assert calls == [
+        ("timing", "render", 0.25, {"outcome": "ok"}),
+        ("count", "blocked", 1, {"reason": "captcha page"}),
+    ]
+
+
+def test_prometheus_rendering():
+    metrics = PrometheusCollector(prefix="test_")
+    metrics.increment("blocked", reason='say "hi"')
+    metrics.observe("parse", 0.5, backend="lxml")
+    assert metrics.render().splitlines() == [
+        "# TYPE test_blocked_total counter",
+        'test_blocked_total{reason="say \\"hi\\""} 1',
+        "# TYPE test_parse_seconds summary",
+        'test_parse_seconds_sum{backend="lxml"} 0.5',
+        'test_parse_seconds_count{backend="lxml"} 1',
+    ]
+
+
+class Worker:
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    @instrumented
+    def step(self, fail=False):
+        if fail:
+            raise ValueError("boom")
+        return "done"
+
+
+def test_instrumented_times_calls_including_failures():
+    metrics = InMemoryCollector()
+    worker = Worker(metrics)
+    assert worker.step() == "done"
+    with pytest.raises(ValueError):
+        worker.step(fail=True)
+    assert metrics.snapshot()["timings"]['extractor{extractor="step"}']["count"] == 2
+
+    # Without a collector nothing is reported
+    assert Worker(None).step() == "done"
+
+
+def test_scraper_reports_extractors_and_parse(load_page):
+    metrics = InMemoryCollector()
+    AmazonScraper.from_html("A1", load_page(), "lxml", metrics=metrics).get_all_details()
+    snapshot = metrics.snapshot()
+    assert snapshot["timings"]['parse{backend="lxml"}']["count"] == 1
+    assert snapshot["timings"]['extractor{extractor="get_ratings"}']["count"] == 1
+    assert snapshot["counters"]['extractor_path{extractor="get_product_title",path="productTitle"}'] == 1
@@ -0,0 +1,119 @@
+import asyncio
+import io
+
+from dibkb_scraper import AmazonProductResponse, AsyncAmazonScraper, JsonlSink, Pipeline, read_asins
+from dibkb_scraper import pipeline as pipeline_module
+from dibkb_scraper.models import Product
+from dibkb_scraper.serialization import loads
+
+
+class StubScraper(AsyncAmazonScraper):
+    """Scrapes without the network, tracking how many products are in flight at once."""
+
+    def __init__(self, failing=(), **options):
+        super().__init__(**options)
+        self.failing = set(failing)
+        self.in_flight = 0
+        self.peak = 0
+        self.started = []
+
+    async def scrape(self, asin):
+        self.started.append(asin)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            # Later ASINs finish sooner, so results come out of input order
+            await asyncio.sleep(0.001 * (5 - len(self.started) % 5))
+        finally:
+            self.in_flight -= 1
+        if asin in self.failing:
+            return AmazonProductResponse(asin=asin, product=Product(), error="Failed to fetch page: status 503")
+        return AmazonProductResponse(asin=asin, product=Product(title=f"Title {asin}"))
+
+
+def run(pipeline, asins):
+    async def main():
+        try:
+            return await pipeline.run(asins)
+        finally:
+            await pipeline.scraper.close()
+
+    return asyncio.run(main())
+
+
+def read_lines(path):
+    with open(path, "rb") as f:
+        return [loads(line) for line in f]
+
+
+def test_read_asins_skips_blanks_and_comments():
+    source = io.StringIO("# header\nA1\n\n  A2  \n#A3\nA4\n")
+    assert list(read_asins(source)) == ["A1", "A2", "A4"]
+
+
+def test_stream_keeps_window_products_in_flight(tmp_path):
+    asins = (f"A{i}" for i in range(50))
+    scraper = StubScraper(concurrency=20, failing={"A7"})
+    with JsonlSink(str(tmp_path / "products.jsonl")) as sink:
+        pipeline = Pipeline(scraper, sink, window=4)
+        assert run(pipeline, asins) == 50
+
+    assert scraper.peak == 4
+    assert (pipeline.processed, pipeline.failed) == (50, 1)
+    written = read_lines(tmp_path / "products.jsonl")
+    assert sorted(response.asin for response in written) == sorted(f"A{i}" for i in range(50))
+
+
+def test_stream_pulls_asins_lazily():
+    pulled = []
+
+    def source():
+        for i in range(1000):
+            pulled.append(i)
+            yield f"A{i}"
+
+    async def take(count):
+        pipeline = Pipeline(StubScraper(), window=3)
+        stream = pipeline.stream(source())
+        responses = [await stream.__anext__() for _ in range(count)]
+        await stream.aclose()
+        await pipeline.scraper.close()
+        return responses
+
+    assert len(asyncio.run(take(5))) == 5
+    # Only the window's worth beyond what was consumed has been read
+    assert len(pulled) <= 5 + 3
+
+
+def test_sink_flushes_every_n_records(tmp_path, monkeypatch):
+    fsyncs = []
+    monkeypatch.setattr(pipeline_module.os, "fsync", fsyncs.append)
+    path = str(tmp_path / "products.jsonl")
+    sink = JsonlSink(path, flush_every=3, fsync=True)
+
+    for i in range(5):
+        sink.write(AmazonProductResponse(asin=f"A{i}", product=Product(title="x")))
+        on_disk = [response.asin for response in read_lines(path)]
+        assert on_disk == [f"A{j}" for j in range(3 if i >= 2 else 0)]
+    assert len(fsyncs) == 1
+
+    sink.close()
+    assert [response.asin for response in read_lines(path)] == [f"A{i}" for i in range(5)]
+    assert len(fsyncs) == 2
+
+
+def test_resumed_run_appends_after_earlier_records(tmp_path):
+    path = str(tmp_path / "products.jsonl")
+    asins = [f"A{i}" for i in range(10)]
+
+    # The first run stops after six products; the second does the rest
+    with JsonlSink(path, flush_every=1) as sink:
+        run(Pipeline(StubScraper(), sink, window=2), asins[:6])
+    first = [response.asin for response in read_lines(path)]
+    done = set(first)
+    with JsonlSink(path) as sink:
+        run(Pipeline(StubScraper(), sink, window=2), [asin for asin in asins if asin not in done])
+
+    lines = [response.asin for response in read_lines(path)]
+    assert lines[:6] == first
+    assert sorted(lines) == sorted(asins)
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+from dibkb_scraper.playwright import DEFAULT_OPTIONAL_SELECTORS, DEFAULT_READY_SELECTORS, PlaywrightScraper
+
+PRICE, TITLE = DEFAULT_READY_SELECTORS
+HISTOGRAM, REVIEWS, CAROUSEL = DEFAULT_OPTIONAL_SELECTORS
+
+
+def alternatives(selector):
+    return [part.strip() for part in selector.split(",")]
+
+
+class FakePage:
+    """Attaches the elements of each selector in `appears` after its delay in seconds."""
+
+    def __init__(self, appears):
+        self.appears = {part: delay for selector, delay in appears.items() for part in alternatives(selector)}
+        self.waited = []
+
+    async def wait_for_selector(self, selector, state="attached", timeout=30000):
+        self.waited.append(selector)
+        appears = min((self.appears[part] for part in alternatives(selector) if part in self.appears), default=None)
+        if appears is None or appears > timeout / 1000:
+            await asyncio.sleep(timeout / 1000)
+            raise TimeoutError(f"Timeout {timeout}ms exceeded waiting for {selector}")
+        await asyncio.sleep(appears)
+
+    async def wait_for_timeout(self, timeout):
+        await asyncio.sleep(timeout / 1000)
+
+
+def renderer(ready_timeout=3000, optional_timeout=100, **options):
+    scraper = PlaywrightScraper.standalone()
+    scraper.ready_selectors = options.get("ready_selectors", DEFAULT_READY_SELECTORS)
+    scraper.ready_mode = options.get("ready_mode", "all")
+    scraper.ready_timeout = ready_timeout
+    scraper.optional_selectors = options.get("optional_selectors", DEFAULT_OPTIONAL_SELECTORS)
+    scraper.optional_timeout = optional_timeout
+    return scraper
+
+
+def wait_time(scraper, page):
+    async def run():
+        start = time.perf_counter()
+        await scraper._wait_until_ready(page)
+        return time.perf_counter() - start
+
+    return asyncio.run(run())
+
+
+def test_page_without_optional_regions_skips_the_full_timeout():
+    page = FakePage({PRICE: 0.02, TITLE: 0.01})
+    elapsed = wait_time(renderer(), page)
+    # Ready selectors plus the optional grace, far below the 3 s ready_timeout
+    assert 0.1 <= elapsed < 0.5
+    assert set(page.waited) == set(DEFAULT_READY_SELECTORS + DEFAULT_OPTIONAL_SELECTORS)
+
+
+def test_optional_regions_already_loaded_cost_nothing_extra():
+    page = FakePage({PRICE: 0.02, TITLE: 0.01, HISTOGRAM: 0.01, REVIEWS: 0.02, CAROUSEL: 0.03})
+    assert wait_time(renderer(optional_timeout=1000), page) < 0.5
+
+
+def test_missing_ready_selector_waits_out_ready_timeout():
+    page = FakePage({TITLE: 0.01})
+    elapsed = wait_time(renderer(ready_timeout=200, optional_timeout=0), page)
+    assert 0.2 <= elapsed < 0.5
+
+    # With ready_mode="any" the title alone is enough
+    page = FakePage({TITLE: 0.01})
+    assert wait_time(renderer(ready_timeout=2000, optional_timeout=0, ready_mode="any"), page) < 0.5
@@ -0,0 +1,24 @@
+import asyncio
+import multiprocessing
+
+from dibkb_scraper import AmazonScraper, ProcessPoolExtractor
+
+PAGES = ["desktop.html", "mobile.html", "sparse.html"]
+
+
+def test_pool_extraction_matches_in_process(load_page):
+    pages = {name: load_page(name) for name in PAGES}
+    expected = {name: AmazonScraper.from_html(name, html).get_all_details() for name, html in pages.items()}
+
+    async def extract_all(extractor):
+        return await asyncio.gather(*(extractor.extract(name, html, "lxml", lean=True) for name, html in pages.items()))
+
+    # spawn, so the workers import the package fresh like they would on macOS and Windows
+    with ProcessPoolExtractor(workers=2, max_pending=2, mp_context=multiprocessing.get_context("spawn")) as extractor:
+        results = asyncio.run(extract_all(extractor))
+        metrics = extractor.metrics()
+
+    assert dict(zip(pages, results)) == expected
+    assert (metrics["parsed"], metrics["parse_in_pool"], metrics["parse_waiting"]) == (3, 0, 0)
+    assert metrics["parse_max_depth"] == 3
+    assert metrics["mean_parse_seconds"] > 0
@@ -0,0 +1,85 @@
+import pytest
+
+from dibkb_scraper import ratelimit
+from dibkb_scraper.ratelimit import AdaptiveRateLimiter
+
+URL = "https://www.amazon.in/dp/B0TEST"
+
+
+class FakeTime:
+    """Stands in for the time module: sleeping advances the clock instead of blocking."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(ratelimit, "time", fake)
+    return fake
+
+
+def test_bucket_allows_burst_then_paces_at_rate(clock):
+    limiter = AdaptiveRateLimiter(initial_rate=2.0, burst=2.0)
+    for _ in range(5):
+        limiter.acquire(URL)
+    assert clock.sleeps == [0.5, 0.5, 0.5]
+
+    # Idle time refills the bucket, but only up to `burst`
+    clock.now += 60
+    clock.sleeps.clear()
+    for _ in range(3):
+        limiter.acquire(URL)
+    assert clock.sleeps == [0.5]
+
+
+def test_hosts_have_separate_buckets(clock):
+    limiter = AdaptiveRateLimiter(initial_rate=1.0)
+    limiter.acquire(URL)
+    limiter.acquire("https://www.amazon.com/dp/B0TEST")
+    assert clock.sleeps == []
+    limiter.record(URL, blocked=True)
+    assert limiter.rates() == {"www.amazon.in": 0.5, "www.amazon.com": 1.0}
+
+
+def test_rate_increases_additively_up_to_max(clock):
+    limiter = AdaptiveRateLimiter(initial_rate=2.0, max_rate=2.5, increase=0.2)
+    limiter.record(URL, blocked=False)
+    assert limiter.rate(URL) == pytest.approx(2.2)
+    for _ in range(10):
+        limiter.record(URL, blocked=False)
+    assert limiter.rate(URL) == 2.5
+
+
+def test_block_cuts_rate_once_per_interval_down_to_min(clock):
+    limiter = AdaptiveRateLimiter(initial_rate=2.0, min_rate=0.4, decrease=0.5)
+    limiter.record(URL, blocked=True)
+    assert limiter.rate(URL) == 1.0
+
+    # Blocks from the same burst, within one interval of the cut, don't cut again
+    clock.now += 0.5
+    limiter.record(URL, blocked=True)
+    assert limiter.rate(URL) == 1.0
+
+    for _ in range(3):
+        clock.now += 10
+        limiter.record(URL, blocked=True)
+    assert limiter.rate(URL) == 0.4
+
+
+def test_block_empties_the_bucket(clock):
+    limiter = AdaptiveRateLimiter(initial_rate=2.0, burst=3.0)
+    limiter.acquire(URL)
+    limiter.record(URL, blocked=True)
+    # Two tokens were left, but the next request waits a full interval at the new rate
+    limiter.acquire(URL)
+    assert clock.sleeps == [1.0]
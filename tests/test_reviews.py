@@ -0,0 +1,127 @@
+import asyncio
+
+import httpx
+
+from dibkb_scraper import AsyncAmazonScraper, ReviewScraper, parse_review_page
+
+
+def review_html(review_id, rating=4.0):
+    return (
+        f'<div data-hook="review" id="{review_id}">'
+        '<span class="a-profile-name">Reader</span>'
+        f'<i data-hook="review-star-rating"><span>{rating} out of 5 stars</span></i>'
+        f'<a data-hook="review-title"><span>{rating} out of 5 stars</span><span>Title {review_id}</span></a>'
+        '<span data-hook="review-date">Reviewed in India on 1 January 2024</span>'
+        '<span data-hook="avp-badge">Verified Purchase</span>'
+        f'<span data-hook="review-body">Body of {review_id}</span>'
+        "</div>"
+    )
+
+
+def page_html(review_ids, total=None, has_next=None):
+    parts = ["<html><body>"]
+    if total is not None:
+        count = f"{total * 3} total ratings, {total:,} with reviews"
+        parts.append(f'<div data-hook="cr-filter-info-review-rating-count">{count}</div>')
+    parts.extend(review_html(review_id) for review_id in review_ids)
+    if has_next is not None:
+        parts.append('<ul class="a-pagination"><li class="a-last">')
+        parts.append('<a href="?pageNumber=next">Next page</a>' if has_next else "Next page")
+        parts.append("</li></ul>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+class ReviewSite:
+    """Serves review listings from {(asin, page): html}, answering 503 for `failing` pages."""
+
+    def __init__(self, pages, failing=()):
+        self.pages = pages
+        self.failing = set(failing)
+        self.requested = []
+
+    def __call__(self, request):
+        asin = request.url.path.split("/")[2]
+        page = int(request.url.params["pageNumber"])
+        self.requested.append((asin, page))
+        if (asin, page) in self.failing:
+            return httpx.Response(503, text="Service Unavailable")
+        return httpx.Response(200, text=self.pages.get((asin, page), page_html([])))
+
+
+def collect(site, asins, **options):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(site)) as client:
+            scraper = AsyncAmazonScraper(client=client)
+            reviews = ReviewScraper(scraper, **options)
+            if len(asins) == 1:
+                found = [review async for review in reviews.reviews(asins[0])]
+            else:
+                found = [review async for review in reviews.reviews_many(asins, concurrency=2)]
+            return reviews, found
+
+    return asyncio.run(run())
+
+
+def test_parse_review_page():
+    page = parse_review_page(page_html(["R1", "R2"], total=1234, has_next=True), "A1", page=3)
+    assert (page.number, page.total, page.has_next) == (3, 1234, True)
+    first = page.reviews[0]
+    assert (first.asin, first.review_id, first.rating, first.title) == ("A1", "R1", 4.0, "Title R1")
+    assert first.verified
+    assert parse_review_page(page_html(["R1"], has_next=False)).has_next is False
+    assert parse_review_page(page_html(["R1"])).has_next is None
+
+
+def test_stated_total_bounds_pages_and_repeats_are_dropped():
+    site = ReviewSite(
+        {
+            ("A1", 1): page_html([f"R{i}" for i in range(10)], total=25),
+            ("A1", 2): page_html([f"R{i}" for i in range(8, 18)], total=25),
+            ("A1", 3): page_html(["R18", "R19", "R20"], total=25),
+        }
+    )
+    reviews, found = collect(site, ["A1"], max_pages=10)
+
+    assert sorted(site.requested) == [("A1", 1), ("A1", 2), ("A1", 3)]
+    assert sorted(int(review.review_id[1:]) for review in found) == list(range(21))
+    assert (reviews.pages_fetched, reviews.pages_failed) == (3, 0)
+
+
+def test_without_total_pages_until_next_link_disappears():
+    site = ReviewSite(
+        {
+            ("A1", 1): page_html(["R1"], has_next=True),
+            ("A1", 2): page_html(["R2"], has_next=True),
+            ("A1", 3): page_html(["R3"], has_next=False),
+        }
+    )
+    _, found = collect(site, ["A1"], max_pages=4, concurrency=1)
+    assert [review.review_id for review in found] == ["R1", "R2", "R3"]
+    assert site.requested == [("A1", 1), ("A1", 2), ("A1", 3)]
+
+    site = ReviewSite({("A1", page): page_html([f"R{page}"], has_next=True) for page in range(1, 10)})
+    _, found = collect(site, ["A1"], max_pages=4)
+    assert len(found) == 4 and len(site.requested) == 4
+
+
+def test_failed_page_is_skipped():
+    site = ReviewSite(
+        {("A1", page): page_html([f"R{page}"], total=30) for page in (1, 2, 3)},
+        failing={("A1", 2)},
+    )
+    reviews, found = collect(site, ["A1"])
+    assert sorted(review.review_id for review in found) == ["R1", "R3"]
+    assert (reviews.pages_fetched, reviews.pages_failed) == (2, 1)
+
+    site = ReviewSite({}, failing={("A1", 1)})
+    assert collect(site, ["A1"])[1] == []
+
+
+def test_reviews_many_keeps_products_apart():
+    # The same review id on two products is two reviews
+    site = ReviewSite({(asin, 1): page_html(["R1", "R2"], has_next=False) for asin in ("A1", "A2", "A3")})
+    _, found = collect(site, ["A1", "A2", "A3"])
+    assert sorted((review.asin, review.review_id) for review in found) == [
+        (asin, review_id) for asin in ("A1", "A2", "A3") for review_id in ("R1", "R2")
+    ]
@@ -0,0 +1,84 @@
+import gc
+import threading
+
+import pytest
+
+from dibkb_scraper import AmazonScraper, dumps_many, loads_many, validate_many
+from dibkb_scraper.serialization import _gc_paused, dumps, loads
+
+
+@pytest.fixture
+def items(load_page):
+    return [
+        {"asin": name, **AmazonScraper.from_html(name, load_page(f"{name}.html")).get_all_details()}
+        for name in ("desktop", "mobile", "sparse")
+    ]
+
+
+@pytest.fixture
+def gc_enabled():
+    was_enabled = gc.isenabled()
+    gc.enable()
+    yield
+    if not was_enabled:
+        gc.disable()
+
+
+def test_round_trips_are_byte_identical(items):
+    responses = validate_many(items)
+    assert [response.asin for response in responses] == ["desktop", "mobile", "sparse"]
+
+    data = dumps_many(responses)
+    assert loads_many(data) == responses
+    assert dumps_many(loads_many(data)) == data
+    for response in responses:
+        assert loads(dumps(response)) == response
+        assert dumps(loads(dumps(response))) == dumps(response)
+
+
+def test_invalid_items_become_failed_responses_in_place(items):
+    broken = dict(items[1], product={"price": "not a number"})
+    responses = validate_many([items[0], broken, items[2]])
+
+    assert [response.asin for response in responses] == ["desktop", "mobile", "sparse"]
+    assert responses[0] == validate_many([items[0]])[0]
+    assert responses[2] == validate_many([items[2]])[0]
+    assert responses[1].error.startswith("Invalid product data:")
+    assert responses[0].error is None and responses[2].error is None
+
+
+def test_nested_gc_pauses_restore_the_collector_once(gc_enabled):
+    with _gc_paused():
+        assert not gc.isenabled()
+        with _gc_paused():
+            assert not gc.isenabled()
+        # The inner pause ending must not re-enable it under the outer one
+        assert not gc.isenabled()
+    assert gc.isenabled()
+
+
+def test_overlapping_gc_pauses_across_threads(gc_enabled):
+    first_in, second_out = threading.Event(), threading.Event()
+
+    def first():
+        with _gc_paused():
+            first_in.set()
+            second_out.wait()
+
+    thread = threading.Thread(target=first)
+    thread.start()
+    first_in.wait()
+    with _gc_paused():
+        pass
+    # The other thread still holds its pause
+    assert not gc.isenabled()
+    second_out.set()
+    thread.join()
+    assert gc.isenabled()
+
+
+def test_gc_pause_keeps_a_disabled_collector_disabled(gc_enabled):
+    gc.disable()
+    with _gc_paused():
+        pass
+    assert not gc.isenabled()
@@ -0,0 +1,21 @@
+import importlib.util
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+spec = importlib.util.spec_from_file_location("startup", os.path.join(ROOT, "benchmarks", "startup.py"))
+startup = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(startup)
+
+
+def test_optional_modules_are_not_imported_early():
+    assert startup.probe()["imported_early"] == []
+
+
+@pytest.mark.benchmark
+def test_startup_within_budget():
+    results, _ = startup.medians(runs=3)
+    over = {metric: round(value, 1) for metric, value in results.items() if value > startup.BUDGETS[metric]}
+    assert over == {}, f"over budget (ms): {over}, budgets: {startup.BUDGETS}"
@@ -0,0 +1,74 @@
+import pytest
+
+from dibkb_scraper import AmazonProductResponse, ProductStore
+
+
+def response(asin="A1", error=None, **product):
+    if error:
+        return AmazonProductResponse(asin=asin, error=error, product={})
+    return AmazonProductResponse(asin=asin, product=product)
+
+
+def test_partial_response_leaves_other_sections_alone(tmp_path):
+    store = ProductStore(str(tmp_path / "products.sqlite3"))
+    store.upsert(response(title="Widget", price=10.0, categories=["Home"]), timestamp=1)
+
+    # As scraped with get_all_details(fields=["price"]), through the sink path
+    store.write(response(price=12.0))
+    store.flush()
+
+    assert store.get("A1")["product"] == {"title": "Widget", "price": 12.0, "categories": ["Home"]}
+    assert [section for _, section, _ in store.history("A1")] == ["title", "price", "categories", "price"]
+    store.close()
+
+
+def test_upsert_stores_only_changed_sections(tmp_path):
+    with ProductStore(str(tmp_path / "products.sqlite3")) as store:
+        assert store.upsert(response(title="Widget", price=10.0), timestamp=1) == ["title", "price"]
+        assert store.upsert(response(title="Widget", price=10.0), timestamp=2) == []
+        assert store.upsert(response(title="Widget", price=9.5), timestamp=3) == ["price"]
+
+        stored = store.get("A1")
+        assert (stored["checked_at"], stored["changed_at"]) == (3, 3)
+        assert store.upsert(response(title="Widget", price=9.5), timestamp=4) == []
+        assert store.get("A1")["changed_at"] == 3
+        assert store.price_history("A1") == [(1, 10.0), (3, 9.5)]
+
+
+def test_upsert_many_restricted_to_sections(tmp_path):
+    with ProductStore(str(tmp_path / "products.sqlite3")) as store:
+        changes = store.upsert_many(
+            [response("A1", title="One", price=1.0), response("A2", title="Two", price=2.0)],
+            sections=["price"],
+            timestamp=1,
+        )
+        assert changes == {"A1": ["price"], "A2": ["price"]}
+        assert store.get("A2")["product"] == {"price": 2.0}
+        with pytest.raises(ValueError):
+            store.upsert(response(title="One"), sections=["colour"])
+
+
+def test_changed_since_yields_only_new_sections(tmp_path):
+    with ProductStore(str(tmp_path / "products.sqlite3")) as store:
+        store.upsert_many([response("A1", title="One", price=1.0), response("A2", title="Two", price=2.0)], timestamp=1)
+        store.upsert_many([response("A1", title="One", price=1.5), response("A2", title="Two", price=2.0)], timestamp=2)
+        store.upsert(response("A3", title="Three"), timestamp=3)
+
+        assert list(store.changed_since(1)) == [("A1", {"price": 1.5}), ("A3", {"title": "Three"})]
+        assert list(store.changed_since(1, sections=["title"])) == [("A3", {"title": "Three"})]
+        assert list(store.changed_since(3)) == []
+
+
+def test_failed_response_keeps_last_good_data(tmp_path):
+    with ProductStore(str(tmp_path / "products.sqlite3")) as store:
+        store.upsert(response(title="Widget", price=10.0), timestamp=1)
+        assert store.upsert(response(error="HTTP 503"), timestamp=2) == []
+
+        stored = store.get("A1")
+        assert stored["product"] == {"title": "Widget", "price": 10.0}
+        assert (stored["error"], stored["checked_at"], stored["changed_at"]) == ("HTTP 503", 2, 1)
+
+        # A later success clears the error
+        store.upsert(response(title="Widget", price=10.0), timestamp=3)
+        assert store.get("A1")["error"] is None
+        assert len(store.history("A1")) == 2